@@ -102,18 +102,37 @@ class LogList extends StatelessWidget {
                     logController.update();
                   },
                   child: ListTile(
-                    leading: eventIcon.isNotEmpty
+                    // 대표 이미지가 있으면 표시하고, 없거나 아직 업로드되지 않았으면 이벤트 아이콘 표시
+                    leading: (videoclips['poster_url'] ?? '').isNotEmpty
                         ? Padding(
                             padding:
                                 const EdgeInsets.only(left: 13.0, right: 13.0),
-                            child: Image.asset(
-                              eventIcon,
+                            child: Image.network(
+                              videoclips['poster_url']!,
                               width: 55,
                               height: 55,
-                              fit: BoxFit.contain,
+                              fit: BoxFit.cover,
+                              errorBuilder: (context, error, stackTrace) =>
+                                  eventIcon.isNotEmpty
+                                      ? Image.asset(eventIcon,
+                                          width: 55,
+                                          height: 55,
+                                          fit: BoxFit.contain)
+                                      : const SizedBox(width: 55, height: 55),
                             ),
                           )
-                        : null,
+                        : eventIcon.isNotEmpty
+                            ? Padding(
+                                padding: const EdgeInsets.only(
+                                    left: 13.0, right: 13.0),
+                                child: Image.asset(
+                                  eventIcon,
+                                  width: 55,
+                                  height: 55,
+                                  fit: BoxFit.contain,
+                                ),
+                              )
+                            : null,
                     title: Column(
                       crossAxisAlignment: CrossAxisAlignment.start,
                       children: [
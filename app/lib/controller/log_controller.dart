@@ -21,6 +21,8 @@ class LogController extends GetxController {
   Timer? _retryTimer;
   RxInt newNotificationCount = 0.obs; // 새로운 알림 수
 
+  final Map<String, String> _etags = {}; // 목록 URL별 마지막 ETag (변경 없으면 서버가 304 응답)
+
   final CameraProvider cameraProvider;
 
   LogController(this.cameraProvider);
@@ -63,6 +65,18 @@ class LogController extends GetxController {
     newNotificationCount.value++;
   }
 
+  /// 이전 ETag를 If-None-Match로 보내 목록을 조회하고, 새 ETag를 저장합니다.
+  Future<http.Response> _getList(String url) async {
+    final headers = <String, String>{};
+    final etag = _etags[url];
+    if (etag != null) headers['If-None-Match'] = etag;
+
+    final response = await http.get(Uri.parse(url), headers: headers);
+    final newEtag = response.headers['etag'];
+    if (response.statusCode == 200 && newEtag != null) _etags[url] = newEtag;
+    return response;
+  }
+
   Future<void> fetchLogs(String userId) async {
     currentUserId = userId;
     isLoading.value = true;
@@ -73,8 +87,10 @@ class LogController extends GetxController {
     final String url = 'http://$flaskIp:$flaskPort/get_user_events/$userId';
 
     try {
-      final response = await http.get(Uri.parse(url));
-      if (response.statusCode == 200) {
+      final response = await _getList(url);
+      if (response.statusCode == 304) {
+        isLoading.value = false; // 변경 없음: 기존 목록 유지
+      } else if (response.statusCode == 200) {
         List<dynamic> fetchedLogs = jsonDecode(response.body);
         logs.value = fetchedLogs.map((dynamic log) {
           return {
@@ -106,8 +122,10 @@ class LogController extends GetxController {
         'http://$flaskIp:$flaskPort/get_user_video_clips/$userId';
 
     try {
-      final response = await http.get(Uri.parse(url));
-      if (response.statusCode == 200) {
+      final response = await _getList(url);
+      if (response.statusCode == 304) {
+        isLoading.value = false; // 변경 없음: 기존 목록 유지
+      } else if (response.statusCode == 200) {
         List<dynamic> fetchedClips = jsonDecode(response.body);
         videoClips.value = fetchedClips.map((dynamic clip) {
           return {
@@ -115,7 +133,9 @@ class LogController extends GetxController {
             'timestamp': clip['timestamp']?.toString() ?? '',
             'eventname': clip['eventname']?.toString() ?? '',
             'camera_number': clip['camera_number']?.toString() ?? '',
-            'event_url': clip['event_url']?.toString() ?? ''
+            'event_url': clip['event_url']?.toString() ?? '',
+            'poster_url': clip['poster_url']?.toString() ?? '',
+            'thumbnail_url': clip['thumbnail_url']?.toString() ?? ''
           };
         }).toList();
         videocount = videoClips.length;
@@ -43,6 +43,7 @@ class SocketManager {
     socket = IO.io(serverUrl, <String, dynamic>{
       'transports': ['websocket'], // 웹소켓을 통한 통신 사용
       'autoConnect': true, // 자동으로 연결 시도
+      'query': {'user_id': currentUserId}, // 서버에서 사용자별 방에 참여시키기 위한 ID
       'extraHeaders': {'EIO': '3'} // Socket.io 버전 3 사용
     });
 
@@ -5,7 +5,7 @@ from flask_socketio import SocketIO
 from flasgger import Swagger, LazyString, LazyJSONEncoder
 from dotenv import load_dotenv
 from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
 import atexit
 import threading
@@ -14,52 +14,99 @@ db = SQLAlchemy()
 migrate = Migrate()
 socketio = SocketIO(cors_allowed_origins="*", async_mode='eventlet')
 
-def create_app():
+def create_app(config_name='config.DevelopmentConfig'):
     load_dotenv()
     app = Flask(__name__)
-    app.config.from_object('config.DevelopmentConfig')
+    app.config.from_object(config_name)
 
     db.init_app(app)
     migrate.init_app(app, db)
-    socketio.init_app(app)
+
+    # 엔진이 만들어지기 전에 연결 풀 설정과 쿼리 계측 등록
+    from .metrics import request_metrics
+    request_metrics.init_app(app)
+
+    # 멀티 워커 모드에서는 메시지 큐로 다른 워커에 연결된 클라이언트에게도 푸시 전달
+    from .cluster import init_socketio
+    from .sockets import register_handlers, start_relay
+    init_socketio(app)
+    register_handlers()
+    start_relay()
+
+    from .leader import leader
+    leader.init_app(app)
+
+    from .security import password_hasher
+    password_hasher.init_app(app)
+
+    from .storage import s3_deleter
+    s3_deleter.init_app(app)
+
+    from .ingest import event_ingestor
+    event_ingestor.init_app(app)
+
+    from .model_client import model_client
+    model_client.init_app(app)
+
+    from .config_sync import config_sync
+    config_sync.init_app(app)
+
+    from .push import push_dispatcher
+    push_dispatcher.init_app(app)
 
     with app.app_context():
         from .routes import bp as main_bp
-        from .models import EventLog
+        from .retention import run_retention
+        from .config_sync import prune_changes
+        from .stats import prune_hourly_stats
         app.register_blueprint(main_bp)
         
 
         def delete_old_logs():
+            # 테이블별 보관 기간이 지난 로그/클립을 배치 단위로 삭제
+            run_retention(app)
+            with app.app_context():
+                prune_changes()
+                prune_hourly_stats(app.config.get('STATS_HOURLY_RETENTION_DAYS', 90))
+
+        # (작업 이름, 주기(초), 함수)
+        scheduled_jobs = [('delete_old_logs', 24 * 60 * 60, delete_old_logs)]
+
+        def leader_heartbeat():
+            with app.app_context():
+                leader.heartbeat()
+                db.session.remove()
+
+        def run_due_jobs():
+            # 리더만, 마지막 실행(어느 워커에서든) 후 주기가 지난 작업을 실행
+            for name, interval, job in scheduled_jobs:
+                with app.app_context():
+                    due = leader.claim(name, interval)
+                    db.session.remove()
+                if due:
+                    job()
+
+        def shutdown_scheduler(scheduler):
+            scheduler.shutdown()
             with app.app_context():
-                try:
-                    # 테스트용: 현재 시간 기준 10초 이전 데이터 삭제
-                    cutoff_time = datetime.utcnow() - timedelta(days=7)
-                    old_logs = db.session.query(EventLog).filter(EventLog.timestamp < cutoff_time).all()
-
-                    if old_logs:
-                        print(f"{len(old_logs)}개의 오래된 로그를 삭제합니다.")
-                        for log in old_logs:
-                            print(f"삭제할 로그: ID={log.id}, Timestamp={log.timestamp}")
-                        
-                        # 실제 삭제 수행
-                        db.session.query(EventLog).filter(EventLog.timestamp < cutoff_time).delete()
-                        db.session.commit()
-                        print("오래된 데이터를 성공적으로 삭제했습니다.")
-                    else:
-                        print("삭제할 오래된 데이터가 없습니다.")
-                
-                except Exception as e:
-                    print(f"오류 발생: {e}")
+                leader.release()
 
         def start_scheduler():
             scheduler = BackgroundScheduler()
-            scheduler.add_job(delete_old_logs, 'interval', days=1)
+            if leader.enabled:
+                # 모든 워커가 리더 임대를 갱신하고, 리더만 예약 작업을 실행
+                scheduler.add_job(leader_heartbeat, 'interval', seconds=max(leader.ttl / 3, 1), next_run_time=datetime.now())
+                scheduler.add_job(run_due_jobs, 'interval', seconds=app.config.get('SCHEDULER_CHECK_INTERVAL', 60))
+            else:
+                for name, interval, job in scheduled_jobs:
+                    scheduler.add_job(job, 'interval', seconds=interval)
             scheduler.start()
             print("스케줄러가 시작되었습니다.")
-            atexit.register(lambda: scheduler.shutdown())
+            atexit.register(shutdown_scheduler, scheduler)
             print("애플리케이션이 종료될 때 스케줄러도 종료됩니다.")
 
-        # 스케줄러를 별도의 스레드에서 실행
-        threading.Thread(target=start_scheduler, daemon=True).start()
+        # 스케줄러를 별도의 스레드에서 실행 (테스트 환경에서는 실행하지 않음)
+        if not app.config.get('TESTING'):
+            threading.Thread(target=start_scheduler, daemon=True).start()
 
     return app
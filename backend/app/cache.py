@@ -0,0 +1,146 @@
+from .cluster import cluster_bus
+from collections import OrderedDict, deque
+import threading
+import uuid
+
+class UserCache:
+    """사용자 ID별 값을 프로세스 메모리에 보관하는 캐시
+
+    조회 중에 invalidate가 호출되면 조회 결과를 저장하지 않아, 무효화 이전에 읽은 오래된 값이 남지 않습니다.
+    name을 주면 무효화를 다른 워커에도 전달합니다.
+    """
+
+    def __init__(self, name=None):
+        self.name = name
+        self._values = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+        if name:
+            cluster_bus.subscribe(f"{name}.invalidate", lambda user_id: self.invalidate(user_id, broadcast=False))
+
+    def get_or_load(self, user_id, loader):
+        with self._lock:
+            if user_id in self._values:
+                return self._values[user_id]
+            generation = self._generations.get(user_id, 0)
+
+        value = loader()
+
+        with self._lock:
+            if self._generations.get(user_id, 0) == generation:
+                self._values[user_id] = value
+        return value
+
+    def invalidate(self, user_id, broadcast=True):
+        with self._lock:
+            self._values.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        if broadcast and self.name:
+            cluster_bus.publish(f"{self.name}.invalidate", user_id)
+
+    def clear(self):
+        with self._lock:
+            for user_id in list(self._values):
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self._values.clear()
+
+# 로그인 시 반환하는 사용자별 카메라 + 감지 설정 목록
+camera_config_cache = UserCache('camera_config')
+
+class UserVersions:
+    """사용자별 목록 버전과 최근 변경 내역
+
+    버전 토큰은 "프로세스ID.세대.버전" 형식이라, 서버가 재시작되거나 전체 무효화(bump_all)되면
+    이전 토큰과 일치하지 않아 클라이언트가 전체 목록을 다시 받습니다.
+    name을 주면 갱신을 다른 워커에도 전달합니다. 토큰은 워커마다 다르므로 다른 워커의 토큰으로 요청하면 전체 목록을 받고,
+    여러 워커에서 캐시 효과를 보려면 로드 밸런서의 고정 세션(sticky session)이 필요합니다.
+    """
+
+    def __init__(self, history=200, name=None):
+        self.name = name
+        self._epoch = uuid.uuid4().hex[:8]
+        self._generation = 0
+        self._versions = {}
+        self._changes = {}
+        self._history = history
+        self._lock = threading.Lock()
+        if name:
+            cluster_bus.subscribe(f"{name}.bump", lambda user_id, changes: self.bump(user_id, changes, broadcast=False))
+            cluster_bus.subscribe(f"{name}.bump_all", lambda: self.bump_all(broadcast=False))
+
+    def token(self, user_id):
+        with self._lock:
+            return f"{self._epoch}.{self._generation}.{self._versions.get(user_id, 0)}"
+
+    def bump(self, user_id, changes=(), broadcast=True):
+        """목록이 바뀐 뒤(커밋 후) 호출. changes는 (목록 종류, 'add'|'update'|'delete'|'reset', 항목) 목록"""
+        with self._lock:
+            version = self._versions.get(user_id, 0) + 1
+            self._versions[user_id] = version
+            history = self._changes.setdefault(user_id, deque(maxlen=self._history))
+            # 변경 내용을 모르는 갱신은 이어 받을 수 없도록 reset으로 기록
+            history.append((version, list(changes) or [(None, 'reset', None)]))
+        if broadcast and self.name:
+            cluster_bus.publish(f"{self.name}.bump", user_id, list(changes))
+
+    def bump_all(self, broadcast=True):
+        """모든 사용자의 목록이 바뀌었을 때 (예: 보관 기간 삭제)"""
+        with self._lock:
+            self._generation += 1
+            self._changes.clear()
+        if broadcast and self.name:
+            cluster_bus.publish(f"{self.name}.bump_all")
+
+    def changes_since(self, user_id, kind, since_token):
+        """since_token 이후 변경 목록과 현재 토큰 반환. 이어 받을 수 없으면 변경 목록 대신 None"""
+        with self._lock:
+            current = f"{self._epoch}.{self._generation}.{self._versions.get(user_id, 0)}"
+            try:
+                epoch, generation, since = since_token.split('.')
+                since, generation = int(since), int(generation)
+            except ValueError:
+                return None, current
+            if epoch != self._epoch or generation != self._generation or since > self._versions.get(user_id, 0):
+                return None, current
+
+            history = self._changes.get(user_id, ())
+            if since < self._versions.get(user_id, 0) and (not history or history[0][0] > since + 1):
+                return None, current  # 내역이 오래되어 잘림
+            changes = []
+            for version, version_changes in history:
+                if version <= since:
+                    continue
+                for change_kind, op, item in version_changes:
+                    if change_kind not in (kind, None):
+                        continue
+                    if op == 'reset':
+                        return None, current
+                    changes.append({'version': version, 'op': op, 'item': item})
+            return changes, current
+
+class ResponseCache:
+    """(사용자, 요청) 단위로 직렬화된 응답 본문을 버전 토큰과 함께 보관하는 LRU 캐시"""
+
+    def __init__(self, max_entries=10000):
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, key, token):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != token:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, token, body):
+        with self._lock:
+            self._entries[key] = (token, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+# 이벤트/클립 목록 버전과 응답 캐시
+list_versions = UserVersions(name='list_versions')
+list_response_cache = ResponseCache()
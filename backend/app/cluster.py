@@ -0,0 +1,159 @@
+from . import socketio
+from urllib.parse import urlparse
+import base64
+import fcntl
+import os
+import pickle
+import queue
+import socketio as socketio_pkg
+
+# 워커 간 내부 메시지는 Socket.IO 메시지 큐 채널에 클라이언트가 쓰지 않는 네임스페이스로 실어 보냄
+INTERNAL_NAMESPACE = '/__cluster'
+INTERNAL_EVENT = 'cluster_message'
+POLL_INTERVAL = 0.05
+
+class ClusterBus:
+    """여러 백엔드 워커 사이의 내부 알림(캐시 무효화, 설정 동기화 알림) 전달
+
+    메시지 큐가 없으면(단일 워커) publish는 아무것도 하지 않습니다.
+    보낸 워커는 이미 로컬에 반영했으므로 자신이 보낸 메시지는 처리하지 않습니다.
+    """
+
+    def __init__(self):
+        self.manager = None
+        self._handlers = {}
+
+    def subscribe(self, topic, handler):
+        self._handlers[topic] = handler
+
+    def publish(self, topic, *args):
+        if self.manager is not None:
+            self.manager.publish_internal(topic, args)
+
+    def dispatch(self, topic, args):
+        handler = self._handlers.get(topic)
+        if handler is None:
+            return
+        try:
+            handler(*args)
+        except Exception as e:
+            print(f"워커 간 메시지 처리 오류 ({topic}): {e}")
+
+cluster_bus = ClusterBus()
+
+class ClusterManagerMixin:
+    """PubSubManager에 내부 메시지 송수신을 추가 (Redis/Kombu 등 모든 백엔드에 공통 적용)"""
+
+    def publish_internal(self, topic, args):
+        self._publish({'method': 'emit', 'event': INTERNAL_EVENT, 'data': {'topic': topic, 'args': list(args)},
+                       'namespace': INTERNAL_NAMESPACE, 'room': None, 'skip_sid': None, 'callback': None,
+                       'host_id': self.host_id})
+
+    def _handle_emit(self, message):
+        if message.get('namespace') == INTERNAL_NAMESPACE:
+            if message.get('host_id') != self.host_id:
+                cluster_bus.dispatch(message['data']['topic'], message['data']['args'])
+            return
+        super()._handle_emit(message)
+
+class LocalQueueManager(ClusterManagerMixin, socketio_pkg.PubSubManager):
+    """같은 프로세스 안의 서버끼리 메시지를 주고받는 큐 (memory://, 테스트용)"""
+    name = 'memory'
+    _subscribers = {}
+
+    def __init__(self, url='memory://', channel='socketio', write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self._inbox = queue.Queue()
+        if not write_only:
+            # 리스너 시작 전에 보낸 메시지도 받도록 생성 시점에 구독
+            self._subscribers.setdefault(channel, []).append(self._inbox)
+
+    def _publish(self, data):
+        for inbox in self._subscribers.get(self.channel, []):
+            inbox.put(data)
+
+    def _listen(self):
+        while True:
+            try:
+                yield self._inbox.get_nowait()
+            except queue.Empty:
+                self.server.sleep(POLL_INTERVAL)
+
+class FileQueueManager(ClusterManagerMixin, socketio_pkg.PubSubManager):
+    """공유 파일에 메시지를 한 줄씩 추가하고 각 워커가 이어 읽는 큐 (file:///path, 한 호스트의 개발/테스트용)
+
+    파일은 계속 커지므로 운영에서는 Redis 등 실제 메시지 큐를 사용합니다.
+    """
+    name = 'file'
+
+    def __init__(self, url, channel='socketio', write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.path = urlparse(url).path
+        if channel:
+            self.path = f"{self.path}.{channel}"
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        open(self.path, 'ab').close()
+        # 생성 이후에 추가된 메시지만 읽음
+        self._offset = os.path.getsize(self.path)
+
+    def _publish(self, data):
+        line = base64.b64encode(pickle.dumps(data)) + b'\n'
+        with open(self.path, 'ab') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(line)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _listen(self):
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            while True:
+                line = f.readline()
+                if line.endswith(b'\n'):
+                    yield pickle.loads(base64.b64decode(line))
+                else:
+                    f.seek(-len(line), os.SEEK_CUR)  # 아직 쓰는 중인 줄은 다음에 다시 읽음
+                    self.server.sleep(POLL_INTERVAL)
+
+def _cluster_class(base):
+    return type(f"Cluster{base.__name__}", (ClusterManagerMixin, base), {})
+
+def build_client_manager(url, channel='flask-socketio'):
+    """메시지 큐 URL에 맞는 Socket.IO 클라이언트 관리자 생성
+
+    redis(s)://, kafka://, zmq+tcp://, 그 외(amqp:// 등)는 Kombu를 사용하고,
+    memory://와 file:///path는 외부 서비스 없이 쓰는 테스트/개발용입니다.
+    """
+    if url.startswith('memory://'):
+        return LocalQueueManager(url, channel=channel)
+    if url.startswith('file://'):
+        return FileQueueManager(url, channel=channel)
+    if url.startswith(('redis://', 'rediss://')):
+        base = socketio_pkg.RedisManager
+    elif url.startswith('kafka://'):
+        base = socketio_pkg.KafkaManager
+    elif url.startswith('zmq'):
+        base = socketio_pkg.ZmqManager
+    else:
+        base = socketio_pkg.KombuManager
+    return _cluster_class(base)(url, channel=channel)
+
+def init_socketio(app):
+    """Socket.IO 서버 초기화. SOCKETIO_MESSAGE_QUEUE가 있으면 워커 간 공유 메시지 큐 사용
+
+    다른 워커에 연결된 클라이언트에게 보내는 푸시도 큐를 거쳐 전달되고, 같은 채널로 내부 알림도 주고받습니다.
+    """
+    url = app.config.get('SOCKETIO_MESSAGE_QUEUE')
+    # 이전 create_app에서 지정한 관리자가 남지 않도록 매번 다시 지정
+    socketio.server_options.pop('client_manager', None)
+    if url:
+        cluster_bus.manager = build_client_manager(url, app.config.get('SOCKETIO_CHANNEL', 'flask-socketio'))
+        socketio.init_app(app, client_manager=cluster_bus.manager)
+        # 기본 동작은 첫 클라이언트 연결 때 큐 수신을 시작하므로, 클라이언트가 없는 워커도 내부 알림을 받도록 바로 시작
+        socketio.server.manager_initialized = True
+        cluster_bus.manager.initialize()
+        print(f"Socket.IO 메시지 큐 사용: {urlparse(url).scheme}")
+    else:
+        cluster_bus.manager = None
+        socketio.init_app(app)
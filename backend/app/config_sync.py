@@ -0,0 +1,203 @@
+from . import db
+from .models import CameraInfo, DetectionStatus, CameraConfigChange, CameraConfigVersion
+from .model_client import model_client
+from .cluster import cluster_bus
+from .leader import leader
+from datetime import datetime, timedelta
+from sqlalchemy import func, and_, tuple_
+import threading
+import time
+
+MAX_CHANGES_PER_REQUEST = 5000
+VERSION_COUNTER_ID = 1
+
+def model_camera_settings(camera, detection_status):
+    """모델 서버가 사용하는 카메라 설정 형식으로 변환"""
+    return {
+        'rtsp_url': camera.rtsp_url,
+        'fall_detection_on': bool(detection_status and detection_status.fall_detection_on),
+        'fire_detection_on': bool(detection_status and detection_status.fire_detection_on),
+        'movement_detection_on': bool(detection_status and detection_status.movement_detection_on),
+        'smoke_detection_on': bool(detection_status and detection_status.smoke_detection_on),
+        'roi_detection_on': bool(detection_status and detection_status.roi_detection_on),
+        'roi_values': {
+            'roi_x1': detection_status.roi_x1 if detection_status else 0,
+            'roi_y1': detection_status.roi_y1 if detection_status else 0,
+            'roi_x2': detection_status.roi_x2 if detection_status else 1920,
+            'roi_y2': detection_status.roi_y2 if detection_status else 1080,
+        }
+    }
+
+def camera_config_query():
+    return db.session.query(CameraInfo, DetectionStatus).outerjoin(
+        DetectionStatus,
+        and_(DetectionStatus.user_id == CameraInfo.user_id,
+             DetectionStatus.camera_number == CameraInfo.camera_number)
+    )
+
+def version_counter_query():
+    return CameraConfigVersion.query.filter_by(id=VERSION_COUNTER_ID).with_for_update()
+
+def reserve_versions(count):
+    """연속된 설정 변경 버전 count개를 발급하고 첫 버전을 반환
+
+    자동 증가 id는 커밋 순서와 다르게 발급되어(10번이 11번보다 늦게 커밋) 전송 중 10번을 건너뛸 수 있으므로,
+    카운터 행을 트랜잭션이 끝날 때까지 잠가 앞선 변경이 커밋된 뒤에만 다음 버전이 발급되도록 합니다.
+    """
+    counter = version_counter_query().first()
+    if counter is None:
+        # 마이그레이션 없이 만든 DB (테스트 등)
+        counter = CameraConfigVersion(id=VERSION_COUNTER_ID, version=current_version())
+        db.session.add(counter)
+    counter.version += count
+    return counter.version - count + 1
+
+def record_changes(changes):
+    """(user_id, camera_number, op) 설정 변경 기록 여러 개를 한 번에 추가 (호출한 쪽의 트랜잭션과 함께 커밋)
+
+    카운터는 한 번만 잠가 버전을 모아서 발급하고, 기록은 bulk insert하므로 카메라 수와 관계없이 쿼리 수가 일정합니다.
+    """
+    if not changes:
+        return
+    first = reserve_versions(len(changes))
+    db.session.bulk_insert_mappings(CameraConfigChange, [
+        {'id': first + index, 'user_id': user_id, 'camera_number': camera_number, 'op': op,
+         'created_at': datetime.utcnow()}
+        for index, (user_id, camera_number, op) in enumerate(changes)])
+
+def record_change(user_id, camera_number, op='upsert'):
+    """설정 변경 기록 하나 추가 (호출한 쪽의 트랜잭션과 함께 커밋)"""
+    record_changes([(user_id, camera_number, op)])
+
+def current_version():
+    return db.session.query(func.max(CameraConfigChange.id)).scalar() or 0
+
+def load_snapshot():
+    """전체 카메라 설정과 그 시점의 버전 (버전을 먼저 읽으므로, 이후 변경은 변경 목록으로 다시 전달됨)"""
+    version = current_version()
+    cameras = [{
+        'user_id': camera.user_id,
+        'camera_id': camera.camera_number,
+        'camera_info': model_camera_settings(camera, detection_status)
+    } for camera, detection_status in camera_config_query()]
+    return {'version': version, 'cameras': cameras}
+
+def load_changes(since, limit=MAX_CHANGES_PER_REQUEST):
+    """since 이후 변경된 카메라의 현재 설정 목록. 변경 기록이 정리되어 이어 받을 수 없으면 None"""
+    oldest = db.session.query(func.min(CameraConfigChange.id)).scalar()
+    if oldest is not None and since < oldest - 1:
+        return None
+
+    rows = CameraConfigChange.query.filter(CameraConfigChange.id > since).order_by(CameraConfigChange.id).limit(limit).all()
+    if not rows:
+        return {'from_version': since, 'to_version': since, 'changes': [], 'has_more': False}
+
+    # 같은 카메라의 여러 변경은 마지막 상태 하나로 합침
+    latest = {}
+    for row in rows:
+        latest[(row.user_id, row.camera_number)] = row.id
+
+    # 변경된 (사용자, 카메라) 쌍만 조회 (카메라 번호만으로 거르면 같은 번호의 모든 사용자 카메라를 읽음)
+    configs = {}
+    for camera, detection_status in camera_config_query().filter(
+            tuple_(CameraInfo.user_id, CameraInfo.camera_number).in_(list(latest))):
+        configs[(camera.user_id, camera.camera_number)] = model_camera_settings(camera, detection_status)
+
+    changes = []
+    for (user_id, camera_number), version in sorted(latest.items(), key=lambda item: item[1]):
+        change = {'version': version, 'user_id': user_id, 'camera_id': camera_number}
+        if (user_id, camera_number) in configs:
+            change.update(op='upsert', camera_info=configs[(user_id, camera_number)])
+        else:
+            change['op'] = 'remove'
+        changes.append(change)
+
+    return {'from_version': since, 'to_version': rows[-1].id, 'changes': changes, 'has_more': len(rows) == limit}
+
+def prune_changes(keep_days=7):
+    """오래된 변경 기록 삭제 (최신 기록 하나는 버전 유지를 위해 남김)"""
+    cutoff = datetime.utcnow() - timedelta(days=keep_days)
+    latest = current_version()
+    deleted = CameraConfigChange.query.filter(CameraConfigChange.created_at < cutoff,
+                                              CameraConfigChange.id < latest).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+class ConfigSyncPublisher:
+    """커밋된 설정 변경을 모아 버전 범위가 붙은 한 번의 요청으로 모델 서버에 전달
+
+    notify() 후 debounce 시간 동안 들어온 변경을 함께 보내고, 전송에 실패하면 다음 주기에 같은 범위부터 다시 보냅니다.
+    모델 서버는 from_version이 자신의 버전과 다르면 누락으로 보고 /model_sync/changes 또는 스냅샷으로 복구합니다.
+    여러 워커로 실행하면 notify를 모든 워커에 전달하고, 스케줄러 리더인 워커만 전송합니다.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.last_sent_version = 0
+        self._event = threading.Event()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._leading = True
+        cluster_bus.subscribe('config_sync.notify', lambda: self.notify(broadcast=False))
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('MODEL_SYNC_PUSH', True)
+        self.debounce = app.config.get('MODEL_SYNC_DEBOUNCE', 0.2)
+        self.retry_interval = app.config.get('MODEL_SYNC_RETRY_INTERVAL', 30)
+        if self.enabled:
+            # 시작 시점 이전 변경은 모델 서버가 시작할 때 스냅샷/변경 목록으로 직접 가져감
+            with app.app_context():
+                try:
+                    self.last_sent_version = current_version()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"설정 변경 버전 조회 실패 (마이그레이션 전일 수 있음): {e}")
+                    self.last_sent_version = 0
+
+    def notify(self, broadcast=True):
+        if not self.enabled:
+            return
+        if broadcast:
+            cluster_bus.publish('config_sync.notify')
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+        self._event.set()
+
+    def _run(self):
+        while True:
+            self._event.wait(timeout=self.retry_interval)
+            time.sleep(self.debounce)  # 짧은 시간 안의 변경을 한 번에 전송
+            self._event.clear()
+            try:
+                with self.app.app_context():
+                    if not leader.is_leader:
+                        self._leading = False
+                        continue
+                    if not self._leading:
+                        # 새 리더는 이전 리더가 보낸 위치를 모르므로 현재 버전부터 전송 (사이의 변경은 모델 서버가 누락으로 감지해 복구)
+                        self.last_sent_version = current_version()
+                        self._leading = True
+                    self.publish()
+                    db.session.remove()
+            except Exception as e:
+                print(f"모델 서버 설정 동기화 오류 발생: {e}")
+
+    def publish(self):
+        while True:
+            delta = load_changes(self.last_sent_version)
+            if delta is None or not delta['changes']:
+                if delta is None:
+                    self.last_sent_version = current_version()
+                return
+            if not model_client.post('/sync/changes', delta):
+                return  # 다음 주기에 같은 범위부터 다시 전송
+            self.last_sent_version = delta['to_version']
+            if not delta['has_more']:
+                return
+
+config_sync = ConfigSyncPublisher()
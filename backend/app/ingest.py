@@ -0,0 +1,325 @@
+from . import db
+from .models import EventLog, VideoClip
+from .sockets import emit_to_user
+from .cache import list_versions
+from .stats import add_event_counts, count_events
+from .push import push_dispatcher, event_notification
+from collections import deque
+from datetime import datetime, timedelta
+from sqlalchemy import and_, bindparam, case, func
+from sqlalchemy.exc import DataError, IntegrityError
+import json
+import os
+import queue
+import threading
+import time
+
+# 저널 파일이 이 크기를 넘고 모든 항목이 DB에 반영되었으면 비움
+JOURNAL_MAX_BYTES = 16 * 1024 * 1024
+LAG_WINDOW = 1000
+# 다시 시도해도 같은 결과인 오류 (잘못된 레코드). 그 외 오류(DB 연결 등)는 배치 전체를 재시도
+RECORD_ERRORS = (IntegrityError, DataError, KeyError, TypeError, ValueError)
+
+class EventIngestor:
+    """이벤트를 저널 파일에 기록(fsync)한 뒤 바로 응답하고, 워커가 모아서 일괄 저장하는 write-behind 수집기
+
+    워커는 배치마다 EventLog/VideoClip을 bulk insert하고 통계 롤업을 누적한 뒤 한 번 커밋하고, 커밋이 끝난 이벤트만 소켓으로 푸시합니다.
+    같은 사용자/카메라/이벤트 종류가 coalesce_window 안에 반복되면 기존 이벤트의 횟수(count)와 마지막 시각만 갱신하고 푸시하지 않습니다.
+    새 이벤트는 소켓 푸시와 함께 모바일 푸시 큐(push_dispatcher)에도 넣습니다.
+    커밋된 마지막 순번을 체크포인트 파일에 남겨, 재시작 시 저널에서 반영되지 않은 이벤트를 다시 처리합니다.
+    잘못된 레코드로 배치 저장이 실패하면 한 건씩 다시 저장하고, 그래도 실패한 레코드는 dead letter 파일로 옮깁니다.
+    (커밋 직후 체크포인트 기록 전에 종료되면 해당 배치가 한 번 더 저장될 수 있습니다.)
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = False
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._journal = None
+        self._seq = 0
+        self._worker = None
+        self._lags = deque(maxlen=LAG_WINDOW)
+        self._stats = {'events': 0, 'coalesced': 0, 'batches': 0, 'last_batch_size': 0, 'max_batch_size': 0,
+                       'last_lag_ms': 0.0, 'max_lag_ms': 0.0, 'errors': 0, 'dead_lettered': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('EVENT_INGEST_ASYNC', False)
+        self.batch_size = app.config.get('EVENT_INGEST_BATCH_SIZE', 500)
+        self.flush_interval = app.config.get('EVENT_INGEST_FLUSH_INTERVAL', 0.2)
+        self.coalesce_window = timedelta(seconds=app.config.get('EVENT_COALESCE_WINDOW', 0))
+        self.coalesce_max_span = timedelta(seconds=app.config.get('EVENT_COALESCE_MAX_SPAN', 600))
+        if not self.enabled:
+            return
+
+        multi_worker = app.config.get('SOCKETIO_MESSAGE_QUEUE') or app.config.get('LEADER_ELECTION')
+        if multi_worker and not app.config.get('WORKER_ID'):
+            # 여러 워커가 같은 저널/체크포인트를 쓰면 서로의 이벤트를 다시 저장하거나 저널을 비워 유실되므로 시작하지 않음
+            raise RuntimeError("멀티 워커 모드에서 비동기 이벤트 수집을 사용하려면 워커마다 다른 WORKER_ID를 지정해야 합니다.")
+
+        journal_dir = app.config.get('EVENT_INGEST_JOURNAL_DIR') or os.path.join(app.instance_path, 'ingest')
+        os.makedirs(journal_dir, exist_ok=True)
+        # 여러 워커가 같은 디렉터리를 쓰므로 워커마다 별도의 저널 사용
+        suffix = f"-{app.config['WORKER_ID']}" if app.config.get('WORKER_ID') else ''
+        self.journal_path = os.path.join(journal_dir, f'events{suffix}.journal')
+        self.checkpoint_path = os.path.join(journal_dir, f'events{suffix}.checkpoint')
+        self.dead_letter_path = os.path.join(journal_dir, f'events{suffix}.deadletter')
+
+        self._replay()
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, record):
+        """이벤트 하나를 접수. 비동기 모드면 저널에 기록 후 반환, 아니면 바로 저장"""
+        record = dict(record, received_at=time.time())
+        if not self.enabled:
+            self.write_batch([record])
+            return
+
+        with self._lock:
+            self._seq += 1
+            record['seq'] = self._seq
+            self._journal.write(json.dumps(record) + '\n')
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+        self._queue.put(record)
+
+    def stats(self):
+        lags = sorted(self._lags)
+        with self._lock:
+            stats = dict(self._stats)
+        stats['queued'] = self._queue.qsize()
+        stats['avg_batch_size'] = stats['events'] / stats['batches'] if stats['batches'] else 0.0
+        stats['p95_lag_ms'] = lags[int(len(lags) * 0.95) - 1] if lags else 0.0
+        return stats
+
+    def write_batch(self, records):
+        """이벤트 묶음을 한 트랜잭션으로 저장하고, 커밋 후 사용자에게 푸시"""
+        rows = [{
+            'user_id': record['user_id'],
+            'timestamp': datetime.fromisoformat(record['timestamp']),
+            'eventname': record['eventname'],
+            'camera_number': record['camera_number'],
+        } for record in records]
+        events, merged, targets = self._coalesce(rows)
+        db.session.bulk_insert_mappings(EventLog, events)
+        if merged:
+            self._update_merged(merged)
+        # 합쳐진 이벤트도 영상은 각각 업로드되어 S3에 있으므로, 보관 기간 삭제 대상이 되도록 클립 행은 모두 저장
+        db.session.bulk_insert_mappings(VideoClip, [dict(row, event_url=record['event_url'],
+                                                         poster_url=record.get('poster_url'),
+                                                         thumbnail_url=record.get('thumbnail_url'))
+                                                    for row, record in zip(rows, records)])
+        # 통계 롤업은 이벤트 목록과 같은 기준(새 EventLog 행 수)으로 집계. 합쳐진 반복 알림 수는 EventLog.count에만 누적
+        add_event_counts(count_events(events))
+        db.session.commit()
+
+        # 목록 버전은 사용자별로 배치당 한 번만 올림 (반복 알림이 몰려도 캐시가 알림마다 무효화되지 않도록)
+        changes = {}
+        for record, (target, is_new) in zip(records, targets):
+            event = {'user_id': record['user_id'], 'timestamp': target['timestamp'].isoformat(),
+                     'eventname': record['eventname'], 'camera_number': record['camera_number'],
+                     'count': target['count'], 'last_timestamp': target['last_timestamp'].isoformat()}
+            clip = {'user_id': record['user_id'], 'timestamp': record['timestamp'], 'eventname': record['eventname'],
+                    'camera_number': record['camera_number'], 'event_url': record['event_url'],
+                    'poster_url': record.get('poster_url'), 'thumbnail_url': record.get('thumbnail_url')}
+            changes.setdefault(record['user_id'], []).extend([('events', 'add' if is_new else 'update', event),
+                                                              ('clips', 'add', clip)])
+        for user_id, user_changes in changes.items():
+            list_versions.bump(user_id, user_changes)
+
+        for record, (_, is_new) in zip(records, targets):
+            if not is_new:
+                continue
+            emit_to_user(record['user_id'], {
+                'user_id': record['user_id'],
+                'timestamp': record['timestamp'],
+                'eventname': record['eventname'],
+                'camera_number': record['camera_number'],
+                'event_url': record['event_url']
+            }, camera_number=record['camera_number'])
+            # 앱이 연결되어 있지 않은 기기에는 모바일 푸시로 전달 (큐에 넣기만 하고 전송은 별도 워커)
+            push_dispatcher.enqueue(record['user_id'], *event_notification(record))
+        self._record_batch(records, coalesced=sum(1 for _, is_new in targets if not is_new))
+
+    def _coalesce(self, rows):
+        """(사용자, 카메라, 이벤트 종류)별로 window 안에 반복된 이벤트를 하나로 합침
+
+        새로 저장할 이벤트 목록, 횟수를 늘릴 기존 이벤트 목록, 각 행이 속한 (이벤트, 새 이벤트 여부) 목록을 반환합니다.
+        합친 이벤트가 max_span보다 길어지면 새 이벤트로 기록해, 긴 알림 폭주 중에도 주기적으로 다시 알립니다.
+        """
+        events, merged, targets = [], {}, [None] * len(rows)
+        open_events = self._open_events(rows) if self.coalesce_window and rows else {}
+        for index in sorted(range(len(rows)), key=lambda i: rows[i]['timestamp']):
+            row = rows[index]
+            key = (row['user_id'], row['camera_number'], row['eventname'])
+            current = open_events.get(key)
+            if (current is not None and row['timestamp'] - current['last_timestamp'] <= self.coalesce_window
+                    and row['timestamp'] - current['timestamp'] <= self.coalesce_max_span):
+                current['count'] += 1
+                current['last_timestamp'] = max(current['last_timestamp'], row['timestamp'])
+                if 'id' in current:
+                    current['added'] += 1
+                    merged[current['id']] = current
+                targets[index] = (current, False)
+                continue
+            event = dict(row, count=1, last_timestamp=row['timestamp'])
+            events.append(event)
+            if self.coalesce_window:
+                open_events[key] = event
+            targets[index] = (event, True)
+        return events, list(merged.values()), targets
+
+    def _open_events(self, rows):
+        """배치의 이벤트와 합칠 수 있는 최근 저장 이벤트 (키별로 가장 최근 것 하나, timestamp 조건으로 최근 파티션만 읽음)"""
+        last_timestamp = func.coalesce(EventLog.last_timestamp, EventLog.timestamp)
+        earliest = min(row['timestamp'] for row in rows)
+        query = db.session.query(EventLog.id, EventLog.user_id, EventLog.camera_number, EventLog.eventname,
+                                 EventLog.timestamp, last_timestamp, EventLog.count).filter(
+            EventLog.user_id.in_({row['user_id'] for row in rows}),
+            EventLog.timestamp >= earliest - self.coalesce_max_span,
+            EventLog.timestamp <= max(row['timestamp'] for row in rows),
+            last_timestamp >= earliest - self.coalesce_window
+        ).order_by(EventLog.timestamp)
+
+        keys = {(row['user_id'], row['camera_number'], row['eventname']) for row in rows}
+        open_events = {}
+        for id, user_id, camera_number, eventname, timestamp, last, count in query:
+            if (user_id, camera_number, eventname) in keys:
+                open_events[(user_id, camera_number, eventname)] = {
+                    'id': id, 'user_id': user_id, 'camera_number': camera_number, 'eventname': eventname,
+                    'timestamp': timestamp, 'last_timestamp': last, 'count': count or 1, 'added': 0}
+        return open_events
+
+    def _update_merged(self, merged):
+        # 다른 워커가 같은 이벤트를 갱신해도 횟수가 덮어써지지 않도록 증가분으로 갱신
+        table = EventLog.__table__
+        last_timestamp = func.coalesce(table.c.last_timestamp, table.c.timestamp)
+        db.session.execute(
+            table.update().where(and_(table.c.id == bindparam('_id'), table.c.timestamp == bindparam('_timestamp'))).values(
+                count=func.coalesce(table.c.count, 1) + bindparam('_added'),
+                last_timestamp=case([(last_timestamp < bindparam('_last_timestamp'), bindparam('_last_timestamp'))],
+                                    else_=last_timestamp)),
+            [{'_id': event['id'], '_timestamp': event['timestamp'], '_added': event['added'],
+              '_last_timestamp': event['last_timestamp']} for event in merged])
+
+    def _record_batch(self, records, coalesced=0):
+        now = time.time()
+        lag_ms = (now - min(record['received_at'] for record in records)) * 1000
+        self._lags.append(lag_ms)
+        with self._lock:
+            self._stats['events'] += len(records)
+            self._stats['coalesced'] += coalesced
+            self._stats['batches'] += 1
+            self._stats['last_batch_size'] = len(records)
+            self._stats['max_batch_size'] = max(self._stats['max_batch_size'], len(records))
+            self._stats['last_lag_ms'] = lag_ms
+            self._stats['max_lag_ms'] = max(self._stats['max_lag_ms'], lag_ms)
+
+    def _next_batch(self):
+        """첫 이벤트를 기다린 뒤 flush_interval 동안 최대 batch_size개까지 모음"""
+        batch = [self._queue.get()]
+        deadline = time.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            with self.app.app_context():
+                self._write_with_retry(batch)
+                db.session.remove()
+            # 저장하지 못해 dead letter로 옮긴 레코드도 체크포인트를 넘겨 재시작 시 다시 처리하지 않음
+            self._checkpoint(batch[-1]['seq'])
+
+    def _write_with_retry(self, batch):
+        """배치 저장. 잘못된 레코드가 있으면 한 건씩 다시 저장하고, DB 연결 오류 등은 성공할 때까지 재시도"""
+        retry_delay = 0.5
+        while True:
+            try:
+                self.write_batch(batch)
+                return
+            except RECORD_ERRORS as e:
+                db.session.rollback()
+                with self._lock:
+                    self._stats['errors'] += 1
+                if len(batch) == 1:
+                    self._dead_letter(batch[0], e)
+                    return
+                print(f"이벤트 {len(batch)}개 저장 실패, 한 건씩 다시 저장합니다: {e}")
+                for record in batch:
+                    self._write_with_retry([record])
+                return
+            except Exception as e:
+                db.session.rollback()
+                with self._lock:
+                    self._stats['errors'] += 1
+                print(f"이벤트 {len(batch)}개 저장 실패, {retry_delay}초 후 재시도: {e}")
+                time.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 30)
+
+    def _dead_letter(self, record, error):
+        """저장할 수 없는 레코드를 오류 내용과 함께 dead letter 파일에 기록"""
+        with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'record': record, 'error': repr(error), 'failed_at': time.time()}, default=str) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        with self._lock:
+            self._stats['dead_lettered'] += 1
+        print(f"이벤트 {record.get('seq')}번을 저장하지 못해 dead letter로 옮겼습니다: {error}")
+
+    def _checkpoint(self, seq):
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(str(seq))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+        # 저널의 모든 항목이 반영되었으면 저널 비우기
+        with self._lock:
+            if seq == self._seq and self._journal.tell() > JOURNAL_MAX_BYTES:
+                self._journal.truncate(0)
+                self._journal.seek(0)
+
+    def _replay(self):
+        """체크포인트 이후의 저널 항목을 큐에 다시 넣음"""
+        checkpoint = 0
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                checkpoint = int(f.read().strip() or 0)
+
+        pending = []
+        if os.path.exists(self.journal_path):
+            valid_bytes = 0
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # 기록 도중 종료된 마지막 줄
+                    valid_bytes += len(line)
+                    record = json.loads(line)
+                    if record['seq'] > checkpoint:
+                        pending.append(record)
+            # 잘린 줄 뒤에 새 항목이 이어 붙지 않도록 제거
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(valid_bytes)
+
+        # 순번은 체크포인트/저널 중 큰 값부터 이어서 발급
+        self._seq = max([checkpoint] + [record['seq'] for record in pending])
+        for record in pending:
+            self._queue.put(record)
+        if pending:
+            print(f"저널에서 반영되지 않은 이벤트 {len(pending)}개를 다시 처리합니다.")
+
+event_ingestor = EventIngestor()
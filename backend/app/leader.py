@@ -0,0 +1,94 @@
+from . import db
+from .models import SchedulerLease
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+import os
+import socket
+import time
+import uuid
+
+LEADER_LEASE = 'scheduler-leader'
+
+class LeaderElection:
+    """DB 임대 행으로 여러 워커 중 하나를 스케줄러 리더로 선출
+
+    모든 워커가 heartbeat()로 리더 임대를 갱신/획득하려 하고, 만료 전에 갱신하지 못한 리더는 다른 워커로 바뀝니다.
+    예약 작업은 리더가 작업별 실행 임대(claim)를 얻은 경우에만 실행하므로, 리더가 바뀌는 중에도 주기당 한 번만 실행됩니다.
+    멀티 워커 모드가 아니면(LEADER_ELECTION=False) 항상 리더로 동작합니다.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.ttl = 60
+        self.owner = None
+        self._leader_until = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('LEADER_ELECTION', bool(app.config.get('SOCKETIO_MESSAGE_QUEUE')))
+        self.ttl = app.config.get('SCHEDULER_LEASE_TTL', 60)
+        worker_id = app.config.get('WORKER_ID') or f"{socket.gethostname()}:{os.getpid()}"
+        self.owner = f"{worker_id}:{uuid.uuid4().hex[:6]}"
+        self._leader_until = 0
+
+    @property
+    def is_leader(self):
+        # 마지막 갱신 후 임대 기간이 지나면 DB를 다시 확인하기 전까지 리더가 아닌 것으로 취급
+        return not self.enabled or time.monotonic() < self._leader_until
+
+    def try_acquire(self, name, ttl, renew=True):
+        """임대 획득. 만료되었거나(renew=True이면 자신이 가진) 임대만 가져오고, 없으면 새로 생성"""
+        now = datetime.utcnow()
+        expired = SchedulerLease.expires_at < now
+        updated = SchedulerLease.query.filter(
+            SchedulerLease.name == name,
+            or_(expired, SchedulerLease.owner == self.owner) if renew else expired
+        ).update({'owner': self.owner, 'expires_at': now + timedelta(seconds=ttl)}, synchronize_session=False)
+        if updated:
+            db.session.commit()
+            return True
+        try:
+            db.session.add(SchedulerLease(name=name, owner=self.owner, expires_at=now + timedelta(seconds=ttl)))
+            db.session.commit()
+            return True
+        except IntegrityError:
+            db.session.rollback()  # 다른 워커가 유효한 임대를 가지고 있음
+            return False
+
+    def heartbeat(self):
+        """리더 임대 갱신/획득 (ttl보다 짧은 주기로 호출)"""
+        if not self.enabled:
+            return True
+        started = time.monotonic()
+        was_leader = self.is_leader
+        try:
+            acquired = self.try_acquire(LEADER_LEASE, self.ttl)
+        except Exception as e:
+            db.session.rollback()
+            print(f"리더 임대 갱신 오류 발생: {e}")
+            acquired = False
+        self._leader_until = started + self.ttl if acquired else 0
+        if acquired != was_leader:
+            print(f"스케줄러 리더 {'획득' if acquired else '상실'}: {self.owner}")
+        return acquired
+
+    def claim(self, job_name, interval):
+        """리더가 작업을 실행할 차례인지 확인. 마지막 실행 후 interval(초)이 지났으면 실행 임대를 얻고 True"""
+        if not self.enabled:
+            return True
+        if not self.is_leader:
+            return False
+        return self.try_acquire(f"job:{job_name}", interval, renew=False)
+
+    def release(self):
+        """종료 시 리더 임대를 만료시켜 다른 워커가 바로 이어받도록 함"""
+        if not self.enabled or not self._leader_until:
+            return
+        SchedulerLease.query.filter_by(name=LEADER_LEASE, owner=self.owner).update(
+            {'expires_at': datetime.utcnow()}, synchronize_session=False)
+        db.session.commit()
+        self._leader_until = 0
+
+leader = LeaderElection()
@@ -0,0 +1,154 @@
+from flask import g, request, has_request_context, jsonify
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from collections import deque
+import threading
+import time
+
+LATENCY_WINDOW = 500
+
+def warn_if_blocking_driver(app):
+    """eventlet 모드에서 허브를 멈추게 하는 DB 드라이버 설정 경고
+
+    C 확장 드라이버(mysqlclient)는 eventlet이 소켓을 바꿔 끼울 수 없고,
+    순수 파이썬 드라이버(PyMySQL)도 socket이 monkey patch되지 않으면 쿼리 동안 허브를 막습니다.
+    """
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    if not uri.startswith('mysql'):
+        return
+    try:
+        from eventlet import patcher
+    except ImportError:
+        return
+    if uri.startswith('mysql+mysqldb') or uri.startswith('mysql://'):
+        print("경고: mysqlclient 드라이버는 eventlet에서 쿼리 동안 모든 요청을 멈춥니다. mysql+pymysql을 사용하세요.")
+    elif not patcher.is_monkey_patched('socket'):
+        print("경고: socket이 monkey patch되지 않아 PyMySQL 쿼리가 eventlet 허브를 막습니다. "
+              "실행 스크립트에서 앱을 불러오기 전에 eventlet.monkey_patch(socket=True, select=True)를 호출하세요.")
+
+class TimedQueuePool(QueuePool):
+    """연결을 얻기까지 기다린 시간을 요청별로 기록하는 연결 풀"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if has_request_context() and 'sql_pool_wait' in g:
+                g.sql_pool_wait += time.perf_counter() - start
+
+class RequestMetrics:
+    """엔드포인트별 요청 수, 응답 시간, SQL 쿼리 수/시간, 연결 풀 대기 시간 집계
+
+    응답 시간이 SLOW_REQUEST_MS를 넘는 요청은 쿼리 수와 함께 로그로 남기고,
+    SQL_METRICS_HEADERS가 켜져 있으면 응답 헤더(X-SQL-Queries, X-SQL-Time-Ms)에 요청별 값을 넣습니다.
+    """
+
+    def __init__(self, app=None):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.slow_request_ms = app.config.get('SLOW_REQUEST_MS', 500)
+        self.add_headers = app.config.get('SQL_METRICS_HEADERS', False)
+
+        # SQLite 외에는 풀 대기 시간을 재는 연결 풀 사용 (엔진 생성 전에 설정해야 함)
+        if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+            options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+            options.setdefault('poolclass', TimedQueuePool)
+            app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+        warn_if_blocking_driver(app)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/metrics', 'metrics', self._metrics_view)
+
+        from . import db
+        with app.app_context():
+            self.engine = db.engine
+        event.listen(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(self.engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _before_request(self):
+        g.request_start = time.perf_counter()
+        g.sql_queries = 0
+        g.sql_time = 0.0
+        g.sql_pool_wait = 0.0
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and conn.info.get('query_start') and 'sql_queries' in g:
+            g.sql_queries += 1
+            g.sql_time += time.perf_counter() - conn.info['query_start'].pop()
+
+    def _after_request(self, response):
+        if 'request_start' not in g:
+            return response
+        duration_ms = (time.perf_counter() - g.request_start) * 1000
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        self.record(endpoint, duration_ms, g.sql_queries, g.sql_time * 1000, g.sql_pool_wait * 1000)
+
+        if duration_ms > self.slow_request_ms:
+            print(f"느린 요청: {request.method} {request.path} {duration_ms:.0f}ms "
+                  f"(쿼리 {g.sql_queries}개, SQL {g.sql_time * 1000:.0f}ms, 풀 대기 {g.sql_pool_wait * 1000:.0f}ms)")
+        if self.add_headers:
+            response.headers['X-SQL-Queries'] = str(g.sql_queries)
+            response.headers['X-SQL-Time-Ms'] = f"{g.sql_time * 1000:.2f}"
+        return response
+
+    def record(self, endpoint, duration_ms, queries, sql_ms, pool_wait_ms):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = {
+                    'requests': 0, 'total_ms': 0.0, 'queries': 0, 'max_queries': 0,
+                    'sql_ms': 0.0, 'pool_wait_ms': 0.0, 'max_pool_wait_ms': 0.0,
+                    'latencies': deque(maxlen=LATENCY_WINDOW),
+                }
+            stats['requests'] += 1
+            stats['total_ms'] += duration_ms
+            stats['queries'] += queries
+            stats['max_queries'] = max(stats['max_queries'], queries)
+            stats['sql_ms'] += sql_ms
+            stats['pool_wait_ms'] += pool_wait_ms
+            stats['max_pool_wait_ms'] = max(stats['max_pool_wait_ms'], pool_wait_ms)
+            stats['latencies'].append(duration_ms)
+
+    def snapshot(self):
+        endpoints = {}
+        with self._lock:
+            for endpoint, stats in self._endpoints.items():
+                requests = stats['requests']
+                latencies = sorted(stats['latencies'])
+                endpoints[endpoint] = {
+                    'requests': requests,
+                    'avg_ms': stats['total_ms'] / requests,
+                    'p95_ms': latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0],
+                    'avg_queries': stats['queries'] / requests,
+                    'max_queries': stats['max_queries'],
+                    'avg_sql_ms': stats['sql_ms'] / requests,
+                    'avg_pool_wait_ms': stats['pool_wait_ms'] / requests,
+                    'max_pool_wait_ms': stats['max_pool_wait_ms'],
+                }
+
+        pool = self.engine.pool
+        return {
+            'endpoints': endpoints,
+            'pool': {
+                'class': type(pool).__name__,
+                'size': pool.size() if hasattr(pool, 'size') else None,
+                'checked_out': pool.checkedout() if hasattr(pool, 'checkedout') else None,
+                'overflow': pool.overflow() if hasattr(pool, 'overflow') else None,
+                'status': pool.status(),
+            },
+        }
+
+    def _metrics_view(self):
+        return jsonify(self.snapshot()), 200
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,61 @@
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
+import requests
+
+class ModelServerClient:
+    """모델 서버에 설정 변경 묶음(/sync/changes)을 보내는 클라이언트
+
+    keep-alive 연결을 재사용하는 세션 하나로 전송하며, 일시적인 오류(연결 실패, 502/503/504)는 재시도합니다.
+    API 응답은 DB 커밋 직후에 나가고, 전송은 config_sync의 백그라운드 워커가 버전 순서대로 합니다.
+    """
+
+    def __init__(self, app=None):
+        self.session = None
+        self.base_url = None
+        self._lock = threading.Lock()
+        self._stats = {'sent': 0, 'failed': 0, 'last_error': None}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.base_url = f"http://{app.config['DL_MODEL_IP']}:{app.config['DL_MODEL_PORT']}"
+        self.timeout = (app.config.get('MODEL_SERVER_CONNECT_TIMEOUT', 3), app.config.get('MODEL_SERVER_READ_TIMEOUT', 10))
+
+        retry = Retry(
+            total=app.config.get('MODEL_SERVER_RETRIES', 3),
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['POST']),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+
+    def post(self, path, payload):
+        """요청을 바로 보내고 성공 여부 반환"""
+        try:
+            response = self.session.post(f"{self.base_url}{path}", json=payload, timeout=self.timeout)
+            ok = response.status_code == 200
+            error = None if ok else f"HTTP {response.status_code}"
+        except requests.exceptions.RequestException as e:
+            ok, error = False, str(e)
+
+        with self._lock:
+            if ok:
+                self._stats['sent'] += 1
+            else:
+                self._stats['failed'] += 1
+                self._stats['last_error'] = error
+        if ok:
+            print(f"모델 서버 {path} 전송 완료.")
+        else:
+            print(f"모델 서버 {path} 전송 실패: {error}")
+        return ok
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+model_client = ModelServerClient()
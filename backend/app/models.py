@@ -1,9 +1,12 @@
 from . import db
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from .security import password_hasher
 
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_name', 'name'),
+    )
     id = db.Column(db.String(50), primary_key=True)
     name = db.Column(db.String(20), nullable=False)
     email = db.Column(db.String(120), nullable=False)
@@ -11,24 +14,38 @@ class User(db.Model):
     address = db.Column(db.String(255), nullable=False)
     detailed_address = db.Column(db.String(255), nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
-    event_logs = db.relationship('EventLog', backref='user', lazy=True)
+    # event_logs/video_clips는 월별 파티션 테이블이라 외래 키 대신 조인 조건으로 관계 지정
+    event_logs = db.relationship('EventLog', primaryjoin='User.id == foreign(EventLog.user_id)', backref='user', lazy=True)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
 
+# MySQL에서는 timestamp 기준 월별 RANGE 파티션 테이블 (기본 키는 (id, timestamp), 마이그레이션에서 설정)
 class EventLog(db.Model):
     __tablename__ = 'event_logs'
+    __table_args__ = (
+        # 사용자별 목록 조회/keyset 페이지네이션, 보관 기간 삭제용 인덱스
+        db.Index('ix_event_logs_user_id_timestamp', 'user_id', 'timestamp', 'id'),
+        db.Index('ix_event_logs_timestamp', 'timestamp', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    user_id = db.Column(db.String(50), db.ForeignKey('users.id'), nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    user_id = db.Column(db.String(50), nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # 파티션 키
     eventname = db.Column(db.String(50), nullable=False)
     camera_number = db.Column(db.Integer, nullable=False)
+    # 짧은 시간 안에 반복된 같은 이벤트를 합친 횟수와 마지막 발생 시각 (timestamp는 처음 발생 시각)
+    count = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    last_timestamp = db.Column(db.DateTime, nullable=True)
 
 class CameraInfo(db.Model):
     __tablename__ = 'cameras'
+    __table_args__ = (
+        db.Index('ix_cameras_user_id_camera_number', 'user_id', 'camera_number'),
+        db.Index('ix_cameras_camera_number', 'camera_number'),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.String(50), db.ForeignKey('users.id'), nullable=False)
     camera_number = db.Column(db.Integer, nullable=False)
@@ -53,13 +70,95 @@ class DetectionStatus(db.Model):
     roi_x2 = db.Column(db.Integer, default=1920)
     roi_y2 = db.Column(db.Integer, default=1080)
 
+# event_logs와 같은 월별 파티션 테이블
 class VideoClip(db.Model):
     __tablename__ = 'video_clips'
+    __table_args__ = (
+        db.Index('ix_video_clips_user_id_timestamp', 'user_id', 'timestamp', 'id'),
+        db.Index('ix_video_clips_timestamp', 'timestamp', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    user_id = db.Column(db.String(50), db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.String(50), nullable=False)
     camera_number = db.Column(db.Integer, nullable=False)
     eventname = db.Column(db.String(50), nullable=False)
     event_url = db.Column(db.String(255), nullable=True)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
-    user = db.relationship('User', backref='video_clips', lazy=True)
+    poster_url = db.Column(db.String(255), nullable=True)  # 대표 이미지
+    thumbnail_url = db.Column(db.String(255), nullable=True)  # 썸네일 스트립
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # 파티션 키
+    user = db.relationship('User', primaryjoin='foreign(VideoClip.user_id) == User.id', backref='video_clips', lazy=True)
+
+# 보관 기간 삭제 작업 진행 상태 (중단 시 이어서 삭제하기 위해 저장)
+class RetentionProgress(db.Model):
+    __tablename__ = 'retention_progress'
+    table_name = db.Column(db.String(50), primary_key=True)
+    cutoff = db.Column(db.DateTime, nullable=True)  # 진행 중인 실행의 삭제 기준 시각
+    last_id = db.Column(db.Integer, default=0)  # 마지막으로 처리한 기본 키
+    max_id = db.Column(db.Integer, default=0)  # 이번 실행에서 처리할 마지막 기본 키
+    deleted_rows = db.Column(db.Integer, default=0)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+# 카메라/감지 설정 변경 기록 (id가 모델 서버 동기화 버전, CameraConfigVersion 카운터로 발급)
+class CameraConfigChange(db.Model):
+    __tablename__ = 'camera_config_changes'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.String(50), nullable=False)
+    camera_number = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # 'upsert' 또는 'remove'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# 설정 변경 버전 카운터 (행 하나). 발급할 때 행을 잠가 버전이 커밋 순서대로 늘어나도록 함
+class CameraConfigVersion(db.Model):
+    __tablename__ = 'camera_config_version'
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+# 이벤트 통계 롤업 (사용자/카메라/이벤트 종류별 시간·일 단위 건수, 이벤트 저장과 같은 트랜잭션에서 누적)
+class EventStat(db.Model):
+    __tablename__ = 'event_stats'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'granularity', 'period_start', 'camera_number', 'eventname',
+                            name='uq_event_stats_bucket'),
+    )
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.String(50), nullable=False)
+    granularity = db.Column(db.String(5), nullable=False)  # 'hour' 또는 'day'
+    period_start = db.Column(db.DateTime, nullable=False)
+    camera_number = db.Column(db.Integer, nullable=False)
+    eventname = db.Column(db.String(50), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+# 여러 워커 중 하나만 예약 작업을 실행하도록 하는 임대 기록 (리더 임대와 작업별 실행 임대)
+class SchedulerLease(db.Model):
+    __tablename__ = 'scheduler_leases'
+    name = db.Column(db.String(100), primary_key=True)
+    owner = db.Column(db.String(100), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
 
+# 모바일 푸시 알림을 받을 기기 토큰 (FCM 등록 토큰)
+class DeviceToken(db.Model):
+    __tablename__ = 'device_tokens'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.String(50), nullable=False, index=True)
+    token = db.Column(db.String(255), nullable=False, unique=True)
+    platform = db.Column(db.String(10), nullable=True)  # 'android' 또는 'ios'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# S3 객체 삭제 작업과 아직 삭제하지 않은 키 (DB 행 삭제와 같은 트랜잭션에서 기록해 재시작 후에도 이어서 삭제)
+class S3DeleteJob(db.Model):
+    __tablename__ = 's3_delete_jobs'
+    id = db.Column(db.String(32), primary_key=True)
+    status = db.Column(db.String(10), nullable=False, default='queued', index=True)  # queued, running, done, failed
+    total = db.Column(db.Integer, nullable=False, default=0)
+    deleted = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Text, nullable=True)  # 재시도 후에도 실패한 키와 오류 (JSON 목록)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    claimed_at = db.Column(db.DateTime, nullable=True)  # 처리 중인 워커가 마지막으로 진행을 기록한 시각
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+class S3DeleteKey(db.Model):
+    __tablename__ = 's3_delete_keys'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    job_id = db.Column(db.String(32), nullable=False, index=True)
+    key = db.Column(db.String(1024), nullable=False)
@@ -0,0 +1,89 @@
+from flask import Response, stream_with_context
+from sqlalchemy import or_
+from datetime import datetime
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(timestamp, row_id):
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        timestamp_str, row_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(timestamp_str), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+def parse_list_args(args):
+    """목록 조회 쿼리 파라미터 파싱 (잘못된 값이면 ValueError)"""
+    filters = {
+        'eventname': args.get('eventname'),
+        'camera_number': args.get('camera_number', type=int),
+        'since': None,
+        'until': None,
+    }
+    try:
+        if args.get('since'):
+            filters['since'] = datetime.fromisoformat(args['since'])
+        if args.get('until'):
+            filters['until'] = datetime.fromisoformat(args['until'])
+    except ValueError:
+        raise ValueError("Invalid since/until format")
+
+    limit = args.get('limit', type=int)
+    cursor = args.get('cursor')
+    return {
+        'filters': filters,
+        'limit': min(max(limit or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE),
+        'cursor': decode_cursor(cursor) if cursor else None,
+        'format': args.get('format', 'json'),
+        # limit/cursor/format 중 하나라도 주면 페이지 응답, 아니면 기존 목록 응답
+        'paginated': 'limit' in args or 'cursor' in args or 'format' in args,
+    }
+
+def apply_filters(query, model, filters):
+    if filters['eventname']:
+        query = query.filter(model.eventname == filters['eventname'])
+    if filters['camera_number'] is not None:
+        query = query.filter(model.camera_number == filters['camera_number'])
+    if filters['since']:
+        query = query.filter(model.timestamp >= filters['since'])
+    if filters['until']:
+        query = query.filter(model.timestamp < filters['until'])
+    return query
+
+def keyset_query(query, model, limit, cursor):
+    """(timestamp, id) 내림차순 keyset 페이지 쿼리 (다음 페이지 여부 확인을 위해 limit + 1개 조회)"""
+    if cursor:
+        timestamp, row_id = cursor
+        # 앞의 timestamp <= 조건으로 인덱스 범위 검색이 가능하도록 작성
+        query = query.filter(
+            model.timestamp <= timestamp,
+            or_(model.timestamp < timestamp, model.id < row_id)
+        )
+    return query.order_by(model.timestamp.desc(), model.id.desc()).limit(limit + 1)
+
+def keyset_page(query, model, limit, cursor):
+    """(timestamp, id) 내림차순 keyset 페이지 조회. (행 목록, 다음 커서) 반환"""
+    rows = keyset_query(query, model, limit, cursor).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+    return rows, next_cursor
+
+def ndjson_response(query, model, serialize, batch_size=1000):
+    """조건에 맞는 전체 행을 한 줄에 하나씩 JSON으로 스트리밍 (대량 내보내기용)"""
+    query = query.order_by(model.timestamp.desc(), model.id.desc()).execution_options(stream_results=True)
+
+    def generate():
+        for row in query.yield_per(batch_size):
+            yield json.dumps(serialize(row)) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
@@ -0,0 +1,117 @@
+from . import db
+from .models import VideoClip
+from .storage import s3_deleter, clip_asset_keys
+from .cache import list_versions
+from datetime import datetime
+from sqlalchemy import text
+
+# timestamp 기준 월별 RANGE 파티션 테이블 (MySQL)
+PARTITIONED_TABLES = ('event_logs', 'video_clips')
+MAXVALUE_PARTITION = 'p_max'
+URL_SCAN_BATCH = 5000
+
+def month_start(timestamp):
+    return timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+def partition_name(month):
+    """해당 월의 행을 담는 파티션 이름 (예: p202403 = 2024-03-01 이상 2024-04-01 미만)"""
+    return f"p{month:%Y%m}"
+
+def partition_definitions(months):
+    """월 목록에 대한 파티션 정의 (상한은 다음 달 1일)"""
+    return [f"PARTITION {partition_name(month)} VALUES LESS THAN ('{add_months(month, 1):%Y-%m-%d %H:%M:%S}')"
+            for month in months]
+
+def reorganize_sql(table_name, months):
+    """MAXVALUE 파티션을 나눠 새 월 파티션을 앞에 추가하는 DDL (MAXVALUE 파티션이 비어 있으면 메타데이터 작업)"""
+    definitions = partition_definitions(months) + [f"PARTITION {MAXVALUE_PARTITION} VALUES LESS THAN (MAXVALUE)"]
+    return f"ALTER TABLE {table_name} REORGANIZE PARTITION {MAXVALUE_PARTITION} INTO ({', '.join(definitions)})"
+
+def is_partitioned_backend():
+    return db.session.get_bind().dialect.name == 'mysql'
+
+def list_partitions(table_name):
+    """파티션 목록 [{name, upper_bound, rows}] (MAXVALUE 파티션의 upper_bound는 None). 파티션이 없으면 빈 목록"""
+    rows = db.session.execute(text(
+        "SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION"), {'table_name': table_name})
+    partitions = []
+    for name, description, table_rows in rows:
+        upper_bound = None if description == 'MAXVALUE' else datetime.fromisoformat(description.strip("'"))
+        partitions.append({'name': name, 'upper_bound': upper_bound, 'rows': table_rows})
+    return partitions
+
+def ensure_future_partitions(table_name, months_ahead=3):
+    """이번 달부터 months_ahead개월 뒤까지의 파티션을 미리 생성. 생성한 파티션 이름 목록 반환"""
+    if not is_partitioned_backend():
+        return []
+    partitions = list_partitions(table_name)
+    if not partitions:
+        print(f"[{table_name}] 파티션 테이블이 아닙니다. 마이그레이션을 확인하세요.")
+        return []
+
+    bounds = [partition['upper_bound'] for partition in partitions if partition['upper_bound']]
+    next_month = max(bounds) if bounds else month_start(datetime.utcnow())
+    last_month = add_months(month_start(datetime.utcnow()), months_ahead)
+    months = []
+    while next_month <= last_month:
+        months.append(next_month)
+        next_month = add_months(next_month, 1)
+    if months:
+        db.session.execute(text(reorganize_sql(table_name, months)))
+        db.session.commit()
+        print(f"[{table_name}] 파티션 추가: {', '.join(partition_name(month) for month in months)}")
+    return [partition_name(month) for month in months]
+
+def enqueue_clip_objects_before(upper_bound):
+    """upper_bound 이전 클립의 S3 객체 삭제 작업을 현재 트랜잭션에 기록 (timestamp 조건으로 해당 파티션만 읽음)"""
+    last_id = 0
+    while True:
+        rows = db.session.query(VideoClip.id, VideoClip.event_url).filter(
+            VideoClip.timestamp < upper_bound, VideoClip.id > last_id
+        ).order_by(VideoClip.id).limit(URL_SCAN_BATCH).all()
+        if not rows:
+            return
+        s3_deleter.enqueue(key for _, url in rows if url for key in clip_asset_keys(url))
+        last_id = rows[-1][0]
+
+def drop_expired_partitions(table_name, cutoff):
+    """전체 기간이 cutoff 이전인 월의 행을 파티션 단위로 삭제. 삭제한 행 수(추정) 반환
+
+    MySQL은 ALTER TABLE ... DROP PARTITION으로 행 단위 삭제 없이 처리합니다.
+    파티션이 없는 DB(SQLite 테스트)는 같은 범위(cutoff가 속한 달 이전)를 DELETE 한 번으로 삭제합니다.
+    cutoff가 속한 달의 나머지 오래된 행은 기존 배치 삭제(purge_table)가 처리합니다.
+    """
+    boundary = month_start(cutoff)
+
+    if not is_partitioned_backend():
+        if table_name == 'video_clips':
+            enqueue_clip_objects_before(boundary)
+        table = db.Model.metadata.tables[table_name]
+        deleted = db.session.execute(table.delete().where(table.c.timestamp < boundary)).rowcount
+        db.session.commit()
+        s3_deleter.notify()
+    else:
+        expired = [partition for partition in list_partitions(table_name)
+                   if partition['upper_bound'] is not None and partition['upper_bound'] <= boundary]
+        if not expired:
+            return 0
+        if table_name == 'video_clips':
+            # DDL은 트랜잭션으로 되돌릴 수 없으므로 삭제 작업을 먼저 커밋 (파티션 삭제가 실패해도 남은 객체 삭제는 무해)
+            enqueue_clip_objects_before(max(partition['upper_bound'] for partition in expired))
+            db.session.commit()
+            s3_deleter.notify()
+        deleted = sum(partition['rows'] or 0 for partition in expired)
+        db.session.execute(text(f"ALTER TABLE {table_name} DROP PARTITION "
+                                f"{', '.join(partition['name'] for partition in expired)}"))
+        db.session.commit()
+        print(f"[{table_name}] 파티션 삭제: {', '.join(partition['name'] for partition in expired)} (약 {deleted}개 행)")
+
+    if deleted:
+        list_versions.bump_all()
+    return deleted
@@ -0,0 +1,206 @@
+from . import db
+from .models import DeviceToken
+from collections import deque
+import queue
+import threading
+import time
+
+# FCM 멀티캐스트 한 번에 보낼 수 있는 최대 토큰 수
+MAX_TOKENS_PER_MULTICAST = 500
+LATENCY_WINDOW = 1000
+FCM_APP_NAME = 'push'
+
+EVENT_TITLES = {'Fall': '낙상 감지', 'Fire': '화재 감지', 'Smoke': '연기 감지', 'Movement': '움직임 감지'}
+
+def event_notification(record):
+    """저장된 이벤트의 푸시 알림 제목/본문/데이터 (FCM 데이터 값은 문자열이어야 함)"""
+    title = EVENT_TITLES.get(record['eventname'], f"{record['eventname']} 감지")
+    body = f"{record['camera_number']}번 카메라 ({record['timestamp'].replace('T', ' ')})"
+    data = {key: str(record[key]) for key in ('user_id', 'timestamp', 'eventname', 'camera_number', 'event_url')
+            if record.get(key) is not None}
+    return title, body, data
+
+class FcmTransport:
+    """firebase-admin으로 FCM 멀티캐스트 전송. 토큰별 결과는 'sent' | 'invalid'(만료/다른 프로젝트) | 'failed'"""
+
+    def __init__(self, credentials_path=None):
+        import firebase_admin
+        from firebase_admin import credentials, messaging
+        self._messaging = messaging
+        self._invalid_errors = (messaging.UnregisteredError, messaging.SenderIdMismatchError)
+        try:
+            self._app = firebase_admin.get_app(FCM_APP_NAME)
+        except ValueError:
+            credential = credentials.Certificate(credentials_path) if credentials_path else credentials.ApplicationDefault()
+            self._app = firebase_admin.initialize_app(credential, name=FCM_APP_NAME)
+
+    def send_multicast(self, tokens, title, body, data):
+        messaging = self._messaging
+        message = messaging.MulticastMessage(tokens=list(tokens), data=data,
+                                             notification=messaging.Notification(title=title, body=body))
+        try:
+            response = messaging.send_each_for_multicast(message, app=self._app)
+        except Exception as e:
+            print(f"FCM 전송 오류 발생: {e}")
+            return ['failed'] * len(tokens)
+        return ['sent' if result.success else 'invalid' if isinstance(result.exception, self._invalid_errors) else 'failed'
+                for result in response.responses]
+
+class RecordingTransport:
+    """보낸 멀티캐스트를 기록만 하는 테스트/개발용 전송 (invalid_tokens의 토큰은 만료된 것으로 응답)"""
+
+    def __init__(self):
+        self.sent = []
+        self.invalid_tokens = set()
+
+    def send_multicast(self, tokens, title, body, data):
+        self.sent.append({'tokens': list(tokens), 'title': title, 'body': body, 'data': data})
+        return ['invalid' if token in self.invalid_tokens else 'sent' for token in tokens]
+
+def create_transport(name, config):
+    if name == 'fcm':
+        return FcmTransport(config.get('FCM_CREDENTIALS'))
+    if name == 'recording':
+        return RecordingTransport()
+    return None
+
+class PushDispatcher:
+    """모바일 푸시 알림을 큐에 넣고 백그라운드 워커가 모아서 멀티캐스트로 전송
+
+    enqueue()는 큐에 넣기만 하고 바로 반환하며, 큐가 가득 차면 알림을 버리므로 요청 처리를 막지 않습니다.
+    워커는 batch_interval 동안 모은 알림의 기기 토큰을 한 번에 조회하고, 내용이 같은 알림은 토큰을 합쳐
+    최대 500개씩 멀티캐스트로 보냅니다. 만료된 토큰은 삭제하고, 접수부터 전송까지의 지연 시간을 기록합니다.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.transport = None
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._stats = {'enqueued': 0, 'dropped': 0, 'multicasts': 0, 'sent': 0, 'failed': 0, 'no_devices': 0,
+                       'invalid_tokens_removed': 0, 'errors': 0, 'max_latency_ms': 0.0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.batch_interval = app.config.get('PUSH_BATCH_INTERVAL', 0.2)
+        self.max_queue = app.config.get('PUSH_MAX_QUEUE', 10000)
+        try:
+            self.transport = create_transport(app.config.get('PUSH_TRANSPORT'), app.config)
+        except Exception as e:
+            print(f"푸시 전송 초기화 실패, 모바일 푸시를 사용하지 않습니다: {e}")
+            self.transport = None
+
+    @property
+    def enabled(self):
+        return self.transport is not None
+
+    def enqueue(self, user_id, title, body, data=None):
+        """알림 하나를 접수. 전송은 워커가 처리하고, 큐에 넣지 못하면 False"""
+        if not self.enabled:
+            return False
+        if self._queue.qsize() >= self.max_queue:
+            with self._lock:
+                self._stats['dropped'] += 1
+            return False
+        self._queue.put({'user_id': user_id, 'title': title, 'body': body, 'data': data or {},
+                         'enqueued_at': time.time()})
+        with self._lock:
+            self._stats['enqueued'] += 1
+        self._ensure_worker()
+        return True
+
+    def stats(self):
+        latencies = sorted(self._latencies)
+        with self._lock:
+            stats = dict(self._stats)
+        stats['queued'] = self._queue.qsize()
+        stats['p95_latency_ms'] = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+        return stats
+
+    def send_batch(self, notifications):
+        """알림 묶음의 기기 토큰을 한 번에 조회해 멀티캐스트로 전송하고 만료된 토큰 삭제"""
+        tokens = {}
+        for user_id, token in db.session.query(DeviceToken.user_id, DeviceToken.token).filter(
+                DeviceToken.user_id.in_({notification['user_id'] for notification in notifications})):
+            tokens.setdefault(user_id, []).append(token)
+
+        # 내용이 같은 알림은 여러 사용자의 토큰을 합쳐 한 번에 전송
+        groups = {}
+        for notification in notifications:
+            key = (notification['title'], notification['body'], tuple(sorted(notification['data'].items())))
+            group = groups.setdefault(key, {'notification': notification, 'tokens': [], 'enqueued_at': []})
+            user_tokens = tokens.get(notification['user_id'], [])
+            if not user_tokens:
+                with self._lock:
+                    self._stats['no_devices'] += 1
+                continue
+            group['tokens'].extend(user_tokens)
+            group['enqueued_at'].append(notification['enqueued_at'])
+
+        invalid = set()
+        for group in groups.values():
+            notification, group_tokens = group['notification'], list(dict.fromkeys(group['tokens']))
+            for start in range(0, len(group_tokens), MAX_TOKENS_PER_MULTICAST):
+                chunk = group_tokens[start:start + MAX_TOKENS_PER_MULTICAST]
+                results = self.transport.send_multicast(chunk, notification['title'], notification['body'],
+                                                        notification['data'])
+                invalid.update(token for token, result in zip(chunk, results) if result == 'invalid')
+                with self._lock:
+                    self._stats['multicasts'] += 1
+                    self._stats['sent'] += results.count('sent')
+                    self._stats['failed'] += results.count('failed')
+            if group_tokens:
+                self._record_latency(group['enqueued_at'])
+
+        if invalid:
+            removed = DeviceToken.query.filter(DeviceToken.token.in_(invalid)).delete(synchronize_session=False)
+            db.session.commit()
+            with self._lock:
+                self._stats['invalid_tokens_removed'] += removed
+            print(f"만료된 기기 토큰 {removed}개를 삭제했습니다.")
+
+    def _record_latency(self, enqueued_at):
+        now = time.time()
+        latencies = [(now - started) * 1000 for started in enqueued_at]
+        self._latencies.extend(latencies)
+        with self._lock:
+            self._stats['max_latency_ms'] = max([self._stats['max_latency_ms']] + latencies)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+
+    def _next_batch(self):
+        """첫 알림을 기다린 뒤 batch_interval 동안 들어온 알림을 모음"""
+        batch = [self._queue.get()]
+        deadline = time.time() + self.batch_interval
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                with self.app.app_context():
+                    self.send_batch(batch)
+                    db.session.remove()
+            except Exception as e:
+                db.session.rollback()
+                with self._lock:
+                    self._stats['errors'] += 1
+                print(f"푸시 알림 {len(batch)}개 전송 오류 발생: {e}")
+
+push_dispatcher = PushDispatcher()
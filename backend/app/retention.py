@@ -0,0 +1,110 @@
+from . import db
+from .models import EventLog, VideoClip, RetentionProgress
+from .storage import s3_deleter, clip_asset_keys
+from .cache import list_versions
+from .partitions import ensure_future_partitions, drop_expired_partitions
+from datetime import datetime, timedelta
+from sqlalchemy import func
+import time
+
+# 보관 기간 삭제 대상 테이블
+RETENTION_MODELS = {
+    'event_logs': EventLog,
+    'video_clips': VideoClip,
+}
+
+def delete_clip_objects(event_urls):
+    """삭제할 클립 행의 S3 객체(이미지 포함)를 현재 트랜잭션에 백그라운드 일괄 삭제 작업으로 기록"""
+    return s3_deleter.enqueue(key for event_url in event_urls for key in clip_asset_keys(event_url))
+
+def _start_run(progress, model, retention_days):
+    """새 삭제 실행 시작: 기준 시각과 처리할 기본 키 범위 기록"""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    min_id, max_id = db.session.query(func.min(model.id), func.max(model.id)).filter(model.timestamp < cutoff).one()
+    if max_id is None:
+        return False
+
+    progress.cutoff = cutoff
+    progress.last_id = min_id - 1
+    progress.max_id = max_id
+    progress.deleted_rows = 0
+    progress.started_at = datetime.utcnow()
+    progress.finished_at = None
+    db.session.commit()
+    return True
+
+def purge_table(table_name, retention_days, batch_size=1000, pause=0.05):
+    """보관 기간이 지난 행을 기본 키 범위 단위의 짧은 트랜잭션으로 삭제
+
+    진행 상태를 retention_progress 테이블에 배치마다 기록하므로, 중간에 중단되면 다음 실행에서 이어서 삭제합니다.
+    """
+    model = RETENTION_MODELS[table_name]
+    progress = RetentionProgress.query.get(table_name)
+    if progress is None:
+        progress = RetentionProgress(table_name=table_name)
+        db.session.add(progress)
+
+    if progress.cutoff is None or progress.finished_at is not None:
+        if not _start_run(progress, model, retention_days):
+            db.session.commit()
+            print(f"[{table_name}] 삭제할 오래된 데이터가 없습니다.")
+            return {'table': table_name, 'deleted_rows': 0, 'rows_per_second': 0.0}
+        print(f"[{table_name}] {progress.cutoff} 이전 데이터 삭제 시작 (id {progress.last_id + 1} ~ {progress.max_id})")
+    else:
+        print(f"[{table_name}] 이전 삭제 작업 이어서 진행 (id {progress.last_id + 1} ~ {progress.max_id})")
+
+    started = time.time()
+    deleted_this_run = 0
+    while progress.last_id < progress.max_id:
+        low = progress.last_id + 1
+        high = min(low + batch_size - 1, progress.max_id)
+        conditions = [model.id >= low, model.id <= high, model.timestamp < progress.cutoff]
+
+        event_urls = []
+        if model is VideoClip:
+            event_urls = [url for (url,) in db.session.query(VideoClip.event_url).filter(*conditions) if url]
+
+        deleted = db.session.query(model).filter(*conditions).delete(synchronize_session=False)
+        if event_urls:
+            delete_clip_objects(event_urls)
+        progress.last_id = high
+        progress.deleted_rows += deleted
+        db.session.commit()  # 배치마다 커밋해 잠금 시간을 짧게 유지
+        deleted_this_run += deleted
+
+        if event_urls:
+            s3_deleter.notify()
+        if pause:
+            time.sleep(pause)  # 다른 요청이 테이블을 사용할 수 있도록 양보
+
+    progress.finished_at = datetime.utcnow()
+    db.session.commit()
+    # 여러 사용자의 목록이 바뀌었으므로 캐시된 응답 전체 무효화. 배치마다 하면 삭제하는 동안 모든 사용자의
+    # ETag/변경 내역이 계속 초기화되므로 실행이 끝날 때 한 번만 (중단 후 이어서 끝낸 실행도 포함)
+    if progress.deleted_rows:
+        list_versions.bump_all()
+
+    elapsed = max(time.time() - started, 1e-6)
+    rows_per_second = deleted_this_run / elapsed
+    print(f"[{table_name}] {progress.deleted_rows}개 행 삭제 완료 ({elapsed:.1f}초, {rows_per_second:.0f} rows/sec)")
+    return {'table': table_name, 'deleted_rows': progress.deleted_rows, 'rows_per_second': rows_per_second}
+
+def run_retention(app):
+    """설정된 테이블별 보관 기간에 따라 오래된 데이터 삭제 (스케줄러 작업)
+
+    다음 달 파티션을 미리 만들고, 기간 전체가 만료된 월은 파티션째 삭제한 뒤
+    남은 오래된 행(기준 시각이 속한 달)만 배치 삭제합니다.
+    """
+    with app.app_context():
+        results = []
+        for table_name, retention_days in app.config['RETENTION_DAYS'].items():
+            try:
+                ensure_future_partitions(table_name, app.config.get('PARTITION_MONTHS_AHEAD', 3))
+                drop_expired_partitions(table_name, datetime.utcnow() - timedelta(days=retention_days))
+                results.append(purge_table(table_name, retention_days,
+                                           app.config['RETENTION_BATCH_SIZE'],
+                                           app.config['RETENTION_BATCH_PAUSE']))
+            except Exception as e:
+                db.session.rollback()
+                print(f"[{table_name}] 오류 발생: {e}")
+        return results
@@ -1,34 +1,28 @@
-from flask import Blueprint, render_template, request, jsonify, current_app, Flask
+from flask import Blueprint, render_template, request, jsonify, current_app, Flask, make_response
 from flask_socketio import emit, SocketIO
-from werkzeug.security import generate_password_hash, check_password_hash
-from .models import User, EventLog, CameraInfo, DetectionStatus, VideoClip
+from .models import User, EventLog, CameraInfo, DetectionStatus, VideoClip, EventStat, DeviceToken
 from . import db, socketio
+from .cache import camera_config_cache, list_versions, list_response_cache
+from .pagination import parse_list_args, apply_filters, keyset_page, ndjson_response
+from .storage import s3_deleter, clip_asset_keys, clip_asset_url, POSTER_SUFFIX, THUMBNAIL_SUFFIX
+from .ingest import event_ingestor
+from .model_client import model_client
+from .config_sync import config_sync, record_change, record_changes, load_snapshot, load_changes
+from .stats import load_stats, SERIES_GRANULARITIES, MAX_HOURLY_SERIES_DAYS
+from .push import push_dispatcher
 from datetime import datetime, timedelta
 import os
-import requests
+import hashlib
 from flask_cors import CORS
-import boto3
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import or_, func
+from sqlalchemy import or_, and_
 
 bp = Blueprint('main', __name__)
-def get_s3_client():
-    return boto3.client(
-        's3',
-        aws_access_key_id = current_app.config['AWS_ACCESS_KEY_ID'],
-        aws_secret_access_key=current_app.config['AWS_SECRET_ACCESS_KEY'],
-        region_name=current_app.config['AWS_REGION']
-    )
 
-def delete_file_from_s3(file_key):
-    s3 = get_s3_client()
-    bucket_name = current_app.config['S3_BUCKET_NAME']
-    print(f"Attempting to delete {file_key} from bucket {bucket_name}")
-    try:
-        s3.delete_object(Bucket=bucket_name, Key=file_key)
-        print(f"Deleted {file_key} from s3 bucket {bucket_name}")
-    except Exception as e:
-        print(f"Falied to delete {file_key} from s3: {e}")
+def user_clip_keys(user_id):
+    """사용자의 모든 클립(이미지 포함) S3 키 조회 (URL 컬럼만 읽음)"""
+    urls = db.session.query(VideoClip.event_url).filter(VideoClip.user_id == user_id)
+    return [key for (url,) in urls if url for key in clip_asset_keys(url)]
 
 # 홈 엔드포인트
 @bp.route('/')
@@ -60,6 +54,32 @@ def add_user():
 
     return jsonify({"message": "User added"}), 200
 
+def serialize_camera(camera, detection_status):
+    return {
+        'camera_number': camera.camera_number,
+        'rtsp_url': camera.rtsp_url,
+        'fall_detection_on': detection_status.fall_detection_on if detection_status else False,
+        'fire_detection_on': detection_status.fire_detection_on if detection_status else False,
+        'movement_detection_on': detection_status.movement_detection_on if detection_status else False,
+        'smoke_detection_on': detection_status.smoke_detection_on if detection_status else False,
+        'roi_detection_on': detection_status.roi_detection_on if detection_status else False,
+        'roi': {
+            'x1': detection_status.roi_x1 if detection_status else 0,
+            'y1': detection_status.roi_y1 if detection_status else 0,
+            'x2': detection_status.roi_x2 if detection_status else 1920,
+            'y2': detection_status.roi_y2 if detection_status else 1080, 
+        }
+    }
+
+def load_camera_configs(user_id):
+    """사용자의 카메라와 감지 상태를 한 번의 조인 쿼리로 조회"""
+    rows = db.session.query(CameraInfo, DetectionStatus).outerjoin(
+        DetectionStatus,
+        and_(DetectionStatus.user_id == CameraInfo.user_id,
+             DetectionStatus.camera_number == CameraInfo.camera_number)
+    ).filter(CameraInfo.user_id == user_id).all()
+    return [serialize_camera(camera, detection_status) for camera, detection_status in rows]
+
 # login 엔드포인트
 @bp.route('/login', methods=['POST'])
 def login():
@@ -76,30 +96,16 @@ def login():
     if user is None or not user.check_password(password):
         return jsonify({"error": "Invalid credentials"}), 401
 
-    camera_infos = CameraInfo.query.filter_by(user_id=id).all()
-    cameras = []
-    for camera in camera_infos:
-        detection_status = DetectionStatus.query.filter_by(user_id=id,camera_number=camera.camera_number).first()
-
-        cameras.append({
-            'camera_number': camera.camera_number,
-            'rtsp_url': camera.rtsp_url,
-            'fall_detection_on': detection_status.fall_detection_on if detection_status else False,
-            'fire_detection_on': detection_status.fire_detection_on if detection_status else False,
-            'movement_detection_on': detection_status.movement_detection_on if detection_status else False,
-            'smoke_detection_on': detection_status.smoke_detection_on if detection_status else False,
-            'roi_detection_on': detection_status.roi_detection_on if detection_status else False,
-            'roi': {
-                'x1': detection_status.roi_x1 if detection_status else 0,
-                'y1': detection_status.roi_y1 if detection_status else 0,
-                'x2': detection_status.roi_x2 if detection_status else 1920,
-                'y2': detection_status.roi_y2 if detection_status else 1080, 
-            }
-        })
+    profile = {"email": user.email, 'phone': user.phone, 'name': user.name}
+    # REPEATABLE READ에서는 사용자 조회 때 시작된 스냅샷을 계속 읽으므로, 그 사이(비밀번호 확인 중) 커밋된 카메라 변경을
+    # 놓친 값이 새 캐시 세대로 저장될 수 있음. 트랜잭션을 끝내 캐시 세대 확인 이후의 최신 값을 읽도록 함
+    db.session.commit()
+
+    cameras = camera_config_cache.get_or_load(id, lambda: load_camera_configs(id))
     return jsonify({"message" : "Login successful",
-                    "email" : user.email,
-                    'phone' : user.phone,
-                    'name' : user.name,
+                    "email" : profile['email'],
+                    'phone' : profile['phone'],
+                    'name' : profile['name'],
                     "cameras": cameras}), 200
 
 @bp.route('/get_max_camera_number',methods = ['GET'])
@@ -142,51 +148,99 @@ def log_event():
     # user_id가 없는 경우 오류 처리
     if not user_id:
         return jsonify({"error": "Missing user_id"}), 400
+    # 저널에 기록한 뒤에는 거부할 수 없으므로 저장에 필요한 값을 먼저 확인
+    if not eventname or camera_number is None:
+        return jsonify({"error": "Missing eventname or camera_number"}), 400
+    try:
+        camera_number = int(camera_number)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid camera_number"}), 400
 
-    # EventLog에 user_id를 포함하여 생성
-    new_event = EventLog(user_id=user_id, timestamp=timestamp, eventname=eventname, camera_number=camera_number)
-    db.session.add(new_event)
-
-    new_video_clip = VideoClip(
-        user_id=user_id,
-        camera_number=camera_number,
-        eventname=eventname,
-        event_url=event_url,
-        timestamp=timestamp
-    )
-    db.session.add(new_video_clip)
-    db.session.commit()
-
-    # SocketIO를 통해 이벤트 푸시
-    socketio.emit('push_message', {
+    # 저널에 기록(비동기 모드) 또는 바로 저장한 뒤 응답. DB 저장과 푸시는 수집기가 배치 단위로 처리
+    event_ingestor.submit({
         'user_id': user_id,
         'timestamp': timestamp.isoformat(),
         'eventname': eventname,
-        'camera_number':camera_number,
-        'event_url':event_url
+        'camera_number': camera_number,
+        'event_url': event_url,
+        'poster_url': clip_asset_url(event_url, POSTER_SUFFIX),
+        'thumbnail_url': clip_asset_url(event_url, THUMBNAIL_SUFFIX)
     })
 
     return jsonify({"message": "Event logged"}), 200
 
+def serialize_event(event):
+    return {"user_id": event.user_id, "timestamp": event.timestamp.isoformat(), "eventname": event.eventname, "camera_number": event.camera_number,
+            "count": event.count or 1, "last_timestamp": (event.last_timestamp or event.timestamp).isoformat()}
+
+def serialize_video_clip(video):
+    return {"user_id": video.user_id, "timestamp": video.timestamp.isoformat(), "eventname": video.eventname, "camera_number": video.camera_number, 'event_url' : video.event_url,
+            'poster_url': video.poster_url, 'thumbnail_url': video.thumbnail_url}
+
+def list_response(model, query, serialize, always_paginate=False):
+    """목록 응답 생성
+
+    limit/cursor/format 파라미터가 있으면 keyset 페이지({items, next_cursor}) 또는 NDJSON 스트림으로,
+    없으면 기존처럼 전체 목록으로 응답합니다.
+    """
+    try:
+        list_args = parse_list_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    query = apply_filters(query, model, list_args['filters'])
+
+    if list_args['format'] == 'ndjson':
+        return ndjson_response(query, model, serialize)
+
+    if not list_args['paginated'] and not always_paginate:
+        return jsonify([serialize(row) for row in query.all()]), 200
+
+    rows, next_cursor = keyset_page(query, model, list_args['limit'], list_args['cursor'])
+    return jsonify({"items": [serialize(row) for row in rows], "next_cursor": next_cursor}), 200
+
+def cached_list_response(user_id, kind, model, query, serialize):
+    """사용자 목록 버전 기반 캐시 응답
+
+    If-None-Match가 현재 ETag와 같으면 DB 조회 없이 304, 같은 요청의 캐시된 본문이 현재 버전이면 그대로 반환합니다.
+    since_version 파라미터를 주면 해당 버전 이후의 추가/삭제 항목만 반환합니다.
+    """
+    if 'since_version' in request.args:
+        changes, version = list_versions.changes_since(user_id, kind, request.args['since_version'])
+        if changes is None:
+            return jsonify({"version": version, "reset": True, "changes": []}), 200  # 전체 목록을 다시 받아야 함
+        return jsonify({"version": version, "reset": False, "changes": changes}), 200
+
+    if request.args.get('format') == 'ndjson':
+        return list_response(model, query, serialize)
+
+    token = list_versions.token(user_id)
+    etag = hashlib.md5(f"{token}|{kind}|{request.query_string.decode()}".encode()).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        cache_key = (user_id, kind, request.query_string)
+        body = list_response_cache.get(cache_key, token)
+        if body is None:
+            response = make_response(list_response(model, query, serialize))
+            if response.status_code != 200:
+                return response
+            body = response.get_data()
+            list_response_cache.put(cache_key, token, body)
+        response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['X-List-Version'] = token
+    return response
+
 # get_user_events 엔드포인트
 @bp.route('/get_user_events/<user_id>', methods=['GET'])
 def get_user_events(user_id):
-    events = EventLog.query.filter_by(user_id=user_id).all()
-    event_list = [
-        {"user_id": event.user_id, "timestamp": event.timestamp.isoformat(), "eventname": event.eventname, "camera_number": event.camera_number}
-        for event in events
-    ]
-    return jsonify(event_list), 200
+    return cached_list_response(user_id, 'events', EventLog, EventLog.query.filter_by(user_id=user_id), serialize_event)
 
-# get_user_events 엔드포인트
+# get_user_video_clips 엔드포인트
 @bp.route('/get_user_video_clips/<user_id>', methods=['GET'])
 def get_user_video_clips(user_id):
-    videoclips = VideoClip.query.filter_by(user_id=user_id).all()
-    video_list = [
-        {"user_id": video.user_id, "timestamp": video.timestamp.isoformat(), "eventname": video.eventname, "camera_number": video.camera_number, 'event_url' : video.event_url}
-        for video in videoclips
-    ]
-    return jsonify(video_list), 200
+    return cached_list_response(user_id, 'clips', VideoClip, VideoClip.query.filter_by(user_id=user_id), serialize_video_clip)
 
 # get_users 엔드포인트
 @bp.route('/get_users', methods=['GET'])
@@ -206,17 +260,22 @@ def delete_user_events():
         return jsonify({"error": "Missing user_id"}), 400
 
     user_id = data['user_id']
-    events = VideoClip.query.filter_by(user_id=user_id).all()
-
-    for event in events:
-        if event.event_url:
-            file_key = event.event_url.split('/')[-1]
-            delete_file_from_s3(file_key)
+    file_keys = user_clip_keys(user_id)
 
     VideoClip.query.filter_by(user_id=user_id).delete()
+    # S3 파일은 행 삭제와 같은 트랜잭션으로 기록한 백그라운드 작업이 일괄 삭제
+    job_id = s3_deleter.enqueue(file_keys)
     db.session.commit()
+    s3_deleter.notify()
+    list_versions.bump(user_id, [('clips', 'reset', None)])
+    return jsonify({"message": "User events deleted", "job_id": job_id, "object_count": len(file_keys)}), 200
 
-    return jsonify({"message": "User events deleted"}), 200
+@bp.route('/delete_jobs/<job_id>', methods=['GET'])
+def get_delete_job(job_id):
+    job = s3_deleter.status(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job), 200
 
 @bp.route('/delete_log', methods=['POST'])
 def delete_log():
@@ -234,32 +293,103 @@ def delete_log():
     event = VideoClip.query.filter_by(user_id=user_id, timestamp=timestamp).first()
 
     if event:
-        # S3 파일 삭제
-        if event.event_url:
-            file_key = event.event_url.split('/')[-1]
-            delete_file_from_s3(file_key)
+        file_keys = clip_asset_keys(event.event_url) if event.event_url else []
 
         # 데이터베이스에서 로그 삭제
         db.session.delete(event)
+        # S3 파일 삭제는 행 삭제와 함께 커밋되는 백그라운드 작업으로 처리
+        job_id = s3_deleter.enqueue(file_keys)
         db.session.commit()
-        return jsonify({"message": "Log deleted"}), 200
+        s3_deleter.notify()
+        list_versions.bump(user_id, [('clips', 'delete', {'timestamp': timestamp.isoformat()})])
+
+        return jsonify({"message": "Log deleted", "job_id": job_id}), 200
     else:
         return jsonify({"error": "Log not found"}), 404
     
-# logs 엔드포인트
+# 모델 서버 시작 시 전체 카메라 설정을 한 번에 가져가는 엔드포인트
+@bp.route('/model_sync/snapshot', methods=['GET'])
+def get_model_sync_snapshot():
+    return jsonify(load_snapshot()), 200
+
+# since 버전 이후 변경된 카메라 설정 (누락 복구용)
+@bp.route('/model_sync/changes', methods=['GET'])
+def get_model_sync_changes():
+    since = request.args.get('since', type=int)
+    if since is None:
+        return jsonify({"error": "Missing since"}), 400
+    delta = load_changes(since)
+    if delta is None:
+        return jsonify({"error": "Version too old, resync from snapshot"}), 410
+    return jsonify(delta), 200
+
+@bp.route('/model_server/stats', methods=['GET'])
+def get_model_server_stats():
+    return jsonify(model_client.stats()), 200
+
+@bp.route('/ingest/stats', methods=['GET'])
+def get_ingest_stats():
+    return jsonify(event_ingestor.stats()), 200
+
+@bp.route('/push/stats', methods=['GET'])
+def get_push_stats():
+    return jsonify(push_dispatcher.stats()), 200
+
+# 모바일 푸시를 받을 기기 토큰 등록 (같은 토큰으로 다시 등록하면 사용자/플랫폼 갱신)
+@bp.route('/device_tokens', methods=['POST'])
+def register_device_token():
+    data = request.get_json()
+    if not data or not data.get('user_id') or not data.get('token'):
+        return jsonify({"error": "Missing user_id or token"}), 400
+
+    device = DeviceToken.query.filter_by(token=data['token']).first()
+    if device is None:
+        device = DeviceToken(token=data['token'])
+        db.session.add(device)
+    device.user_id = data['user_id']
+    device.platform = data.get('platform')
+    db.session.commit()
+    return jsonify({"message": "Device token registered"}), 200
+
+# 로그아웃 시 기기 토큰 삭제
+@bp.route('/device_tokens', methods=['DELETE'])
+def delete_device_token():
+    data = request.get_json()
+    if not data or not data.get('token'):
+        return jsonify({"error": "Missing token"}), 400
+
+    deleted = DeviceToken.query.filter_by(token=data['token']).delete()
+    db.session.commit()
+    if not deleted:
+        return jsonify({"error": "Device token not found"}), 404
+    return jsonify({"message": "Device token deleted"}), 200
+
+# 기간별 이벤트 통계 (롤업 테이블만 조회). start/end는 ISO 형식, 기본값은 최근 7일
+@bp.route('/stats/<user_id>', methods=['GET'])
+def get_user_stats(user_id):
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in SERIES_GRANULARITIES:
+        return jsonify({"error": f"granularity must be one of {', '.join(SERIES_GRANULARITIES)}"}), 400
+    try:
+        end = datetime.fromisoformat(request.args['end']) if 'end' in request.args else datetime.utcnow()
+        start = datetime.fromisoformat(request.args['start']) if 'start' in request.args else end - timedelta(days=7)
+    except ValueError:
+        return jsonify({"error": "Invalid timestamp format"}), 400
+    if start >= end:
+        return jsonify({"error": "start must be earlier than end"}), 400
+    if granularity == 'hour' and end - start > timedelta(days=MAX_HOURLY_SERIES_DAYS):
+        return jsonify({"error": f"Hourly stats are limited to {MAX_HOURLY_SERIES_DAYS} days"}), 400
+
+    hourly_since = datetime.utcnow() - timedelta(days=current_app.config.get('STATS_HOURLY_RETENTION_DAYS', 90))
+    return jsonify(load_stats(user_id, start, end, granularity,
+                              camera_number=request.args.get('camera_number', type=int),
+                              eventname=request.args.get('eventname'),
+                              hourly_since=hourly_since)), 200
+
+# logs 엔드포인트 (전체 사용자 대상이므로 항상 페이지 단위로 응답)
 @bp.route('/logs', methods=['GET'])
 def get_logs():
-    logs = EventLog.query.all()
-    log_list = [
-        {
-            "user_id": log.user_id,
-            "timestamp": log.timestamp.isoformat(),
-            "eventname": log.eventname,
-            "camera_number": log.camera_number
-        }
-        for log in logs
-    ]
-    return jsonify(log_list), 200
+    return list_response(EventLog, EventLog.query, serialize_event, always_paginate=True)
 
 @bp.route('/receive_event', methods=['POST'])
 def receive_event():
@@ -297,54 +427,88 @@ def receive_event():
     detection_status.roi_x2 = roi_values.get('roi_x2', detection_status.roi_x2)
     detection_status.roi_y2 = roi_values.get('roi_y2', detection_status.roi_y2)
 
-    # 데이터베이스에 변경 사항 커밋
+    # 데이터베이스에 변경 사항과 변경 기록을 함께 커밋
+    record_change(user_id, camera_number)
     db.session.commit()
+    camera_config_cache.invalidate(user_id)
 
-    # CameraInfo에서 해당 camera_number에 맞는 정보를 가져옴
-    camera = CameraInfo.query.filter_by(user_id=user_id, camera_number=camera_number).first()
-
-    # 모델 서버에 전송할 데이터 준비
-    if camera:
-        camera_info = {
-            camera_number: {
-                'rtsp_url': camera.rtsp_url,
-                'fall_detection_on': detection_status.fall_detection_on,
-                'fire_detection_on': detection_status.fire_detection_on,
-                'movement_detection_on': detection_status.movement_detection_on,
-                'smoke_detection_on': detection_status.smoke_detection_on,
-                'roi_detection_on': detection_status.roi_detection_on,
-                'roi_values': {
-                    'roi_x1': detection_status.roi_x1,
-                    'roi_y1': detection_status.roi_y1,
-                    'roi_x2': detection_status.roi_x2,
-                    'roi_y2': detection_status.roi_y2
-                }
-            }
-        }
-        
-    payload = {
-        'user_id': user_id,
-        'camera_id': camera_number,
-        'camera_info': camera_info
-    }
+    # 모델 서버에는 버전이 붙은 변경 묶음으로 백그라운드 전송
+    config_sync.notify()
 
+    return jsonify({"message": "Detection status updated and event transmitted successfully"}), 200
 
-    # 모델 서버 URL
-    dl_model_ip = current_app.config['DL_MODEL_IP']
-    dl_model_port = current_app.config['DL_MODEL_PORT']
-    model_server_url = f"http://{dl_model_ip}:{dl_model_port}/event_update"
+# 일괄 설정 요청의 항목 이름과 DetectionStatus 컬럼
+DETECTION_FIELDS = {
+    'fall_detection': 'fall_detection_on',
+    'fire_detection': 'fire_detection_on',
+    'movement_detection': 'movement_detection_on',
+    'smoke_detection': 'smoke_detection_on',
+    'roi_detection': 'roi_detection_on',
+}
+ROI_FIELDS = ('roi_x1', 'roi_y1', 'roi_x2', 'roi_y2')
+
+def apply_detection_settings(detection_status, settings):
+    """요청에 포함된 항목만 변경 (생략한 항목은 기존 값 유지)"""
+    for field, column in DETECTION_FIELDS.items():
+        if field in settings:
+            setattr(detection_status, column, bool(settings[field]))
+    roi_values = settings.get('roi_values') or {}
+    for field in ROI_FIELDS:
+        if field in roi_values:
+            setattr(detection_status, field, roi_values[field])
+
+@bp.route('/bulk_update_detection', methods=['POST'])
+def bulk_update_detection():
+    """여러 카메라의 감지 설정을 한 번에 변경
+
+    settings는 모든 대상 카메라에 공통으로 적용하고, cameras의 항목별 설정이 그 위에 덮어씁니다.
+    cameras를 생략하면 사용자의 모든 카메라가 대상입니다.
+    예: {"user_id": "user1", "settings": {"fire_detection": true}}
+    한 번의 조회와 커밋으로 저장하고, 모델 서버에는 변경 묶음 하나로 전송합니다.
+    """
+    data = request.get_json()
+    if data is None:
+        return jsonify({"error": "No JSON received"}), 400
+    user_id = data.get('user_id')
+    if not user_id:
+        return jsonify({"error": "user_id is required"}), 400
+
+    common = data.get('settings') or {}
+    cameras = data.get('cameras')
+    per_camera = {}
+    if cameras is not None:
+        if not isinstance(cameras, list) or not cameras:
+            return jsonify({"error": "cameras must be a non-empty list"}), 400
+        for camera in cameras:
+            if not isinstance(camera, dict) or not isinstance(camera.get('camera_number'), int):
+                return jsonify({"error": "Each camera requires an integer camera_number"}), 400
+            per_camera[camera['camera_number']] = camera
+
+    query = DetectionStatus.query.filter_by(user_id=user_id)
+    if per_camera:
+        query = query.filter(DetectionStatus.camera_number.in_(per_camera))
+    statuses = query.all()
+
+    # 하나라도 없으면 아무것도 변경하지 않음
+    missing = sorted(set(per_camera) - {status.camera_number for status in statuses})
+    if missing:
+        return jsonify({"error": "DetectionStatus not found", "camera_numbers": missing}), 404
+    if not statuses:
+        return jsonify({"error": "No cameras found for user"}), 404
+
+    for detection_status in statuses:
+        apply_detection_settings(detection_status, common)
+        apply_detection_settings(detection_status, per_camera.get(detection_status.camera_number, {}))
+    # 커밋 후에는 객체가 만료되어 카메라마다 다시 조회하므로 미리 꺼내 둠
+    camera_numbers = sorted(status.camera_number for status in statuses)
+    # 변경 기록은 카메라 수와 관계없이 버전 발급 한 번, insert 한 번
+    record_changes([(user_id, camera_number, 'upsert') for camera_number in camera_numbers])
+    db.session.commit()
+    camera_config_cache.invalidate(user_id)
 
-    # 모델 서버에 payload 전송
-    try:
-        response = requests.post(model_server_url, json=payload, timeout=10)
-        if response.status_code == 200:
-            print("모델 서버에 이벤트 전송 완료.")
-        else:
-            print("모델 서버 이벤트 전송 실패:", response.status_code)
-    except requests.exceptions.RequestException as e:
-        print("오류 발생:", e)
+    config_sync.notify()
 
-    return jsonify({"message": "Detection status updated and event transmitted successfully"}), 200
+    return jsonify({"message": "Detection status updated", "camera_numbers": camera_numbers}), 200
 
 @bp.route('/add_camera', methods=['POST'])
 def add_camera():
@@ -374,43 +538,12 @@ def add_camera():
         roi_y2=1080
     )
     db.session.add(new_detection_status)
+    record_change(user_id, camera_number)
     db.session.commit()
+    camera_config_cache.invalidate(user_id)
 
-    # 모델 서버에 전송할 데이터 준비
-    camera_info = {
-        camera_number: {
-            'rtsp_url': rtsp_url,
-            'fall_detection_on': new_detection_status.fall_detection_on,
-            'fire_detection_on': new_detection_status.fire_detection_on,
-            'movement_detection_on': new_detection_status.movement_detection_on,
-            'smoke_detection_on' : new_detection_status.smoke_detection_on,
-            'roi_detection_on': new_detection_status.roi_detection_on,
-            'roi_values': {
-                'roi_x1': new_detection_status.roi_x1,
-                'roi_y1': new_detection_status.roi_y1,
-                'roi_x2': new_detection_status.roi_x2,
-                'roi_y2': new_detection_status.roi_y2
-            }
-        }
-    }
-    
-    payload = {
-        'user_id': user_id,
-        'camera_id' : camera_number,
-        'rtsp_url' : rtsp_url,
-        'camera_info': camera_info
-    }
-
-    # 모델 서버 URL
-    dl_model_ip = current_app.config['DL_MODEL_IP']
-    dl_model_port = current_app.config['DL_MODEL_PORT']
-    model_server_url = f"http://{dl_model_ip}:{dl_model_port}/add_camera"
-
-    response = requests.post(model_server_url, json=payload, timeout=10)
-    if response.status_code == 200:
-        print("모델 서버에 이벤트 전송 완료.")
-    else:
-        print("모델 서버 이벤트 전송 실패:", response.status_code)
+    # 모델 서버에는 버전이 붙은 변경 묶음으로 백그라운드 전송 (RTSP URL이 있으면 카메라 스레드 시작)
+    config_sync.notify()
 
     return jsonify({"message": "Camera added", "camera_number": camera_number}), 200
 
@@ -428,22 +561,11 @@ def delete_camera(camera_number):
     detection_status = DetectionStatus.query.filter_by(user_id=user_id, camera_number=camera_number).first()
     if detection_status:
         db.session.delete(detection_status)
+    record_change(user_id, camera_number, op='remove')
     db.session.commit()
+    camera_config_cache.invalidate(user_id)
 
-    # 모델 서버에 전송할 데이터 준비
-    payload = {
-        'user_id': user_id,
-        'camera_id': camera_number
-    }
-    dl_model_ip = current_app.config['DL_MODEL_IP']
-    dl_model_port = current_app.config['DL_MODEL_PORT']
-    model_server_url = f"http://{dl_model_ip}:{dl_model_port}/remove_camera"
-
-    response = requests.post(model_server_url, json=payload, timeout=10)
-    if response.status_code == 200:
-        print("모델 서버에 이벤트 전송 완료.")
-    else:
-        print("모델 서버 이벤트 전송 실패:", response.status_code)
+    config_sync.notify()
 
     return jsonify({"message": "Camera deleted and numbers reordered"}), 200
 
@@ -476,11 +598,21 @@ def update_password():
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    user.password_hash = generate_password_hash(new_password)
+    user.set_password(new_password)
     db.session.commit()
 
     return jsonify({"message": "Password updated successfully"}), 200
 
+def user_lookup_query(user_name, contact):
+    """이름(인덱스 사용)과 이메일/전화번호로 후보 사용자 조회
+
+    func.binary()로 감싸면 인덱스를 사용할 수 없으므로, DB에서는 일반 비교로 후보를 찾고
+    대소문자 구분 비교는 호출한 쪽에서 파이썬으로 수행합니다.
+    """
+    return User.query.filter(User.name == user_name).filter(
+        or_(User.email == contact, User.phone == contact)
+    )
+
 @bp.route('/find_user_id', methods=['POST'])
 def find_user_id():
     data = request.get_json()
@@ -496,14 +628,8 @@ def find_user_id():
         contact = contact.strip()
 
         # 사용자 검색 쿼리 실행 및 디버깅 로그 추가
-        user = User.query.filter(
-            func.binary(User.name) == user_name
-        ).filter(
-            or_(
-                func.binary(User.email) == contact,
-                func.binary(User.phone) == contact
-            )
-        ).first()
+        user = next((candidate for candidate in user_lookup_query(user_name, contact)
+                     if candidate.name == user_name and contact in (candidate.email, candidate.phone)), None)
 
         # 검색 결과 로그
         print(f"User found: {user}") if user else print("User not found")
@@ -544,13 +670,25 @@ def delete_user(user_id):
         if not user:
             return jsonify({"error": "User not found"}), 404
 
+        file_keys = user_clip_keys(user_id)
+
+        record_changes([(user_id, camera_number, 'remove') for (camera_number,)
+                        in db.session.query(CameraInfo.camera_number).filter_by(user_id=user_id)])
+
         # 관련된 데이터 삭제
         CameraInfo.query.filter_by(user_id=user_id).delete()
         DetectionStatus.query.filter_by(user_id=user_id).delete()
         EventLog.query.filter_by(user_id=user_id).delete()
+        EventStat.query.filter_by(user_id=user_id).delete()
         VideoClip.query.filter_by(user_id=user_id).delete()
+        DeviceToken.query.filter_by(user_id=user_id).delete()
         db.session.delete(user)
+        s3_deleter.enqueue(file_keys)
         db.session.commit()
+        s3_deleter.notify()
+        camera_config_cache.invalidate(user_id)
+        list_versions.bump(user_id)
+        config_sync.notify()
 
         return jsonify({"message": "User and related data deleted successfully"}), 200
     except Exception as e:
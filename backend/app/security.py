@@ -0,0 +1,45 @@
+from werkzeug.security import generate_password_hash, check_password_hash
+import threading
+
+try:
+    from eventlet import tpool
+    from eventlet.semaphore import BoundedSemaphore as GreenBoundedSemaphore
+except ImportError:
+    tpool = None
+
+class PasswordHasher:
+    """비밀번호 해시 생성/검증을 eventlet 허브 밖의 네이티브 스레드 풀(tpool)에서 실행
+
+    PBKDF2 해시는 CPU를 오래 사용하므로 허브에서 직접 실행하면 그동안 모든 요청과 소켓 전송이 멈춥니다.
+    동시에 실행하는 해시 수는 PASSWORD_HASH_CONCURRENCY로 제한합니다.
+    """
+
+    def __init__(self, app=None):
+        self.offload = tpool is not None
+        self._slots = self._make_semaphore(4)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.offload = tpool is not None and app.config.get('PASSWORD_HASH_OFFLOAD', True)
+        self._slots = self._make_semaphore(app.config.get('PASSWORD_HASH_CONCURRENCY', 4))
+
+    def _make_semaphore(self, size):
+        # 허브에서 기다리는 동안 다른 그린 스레드가 실행되도록 eventlet 세마포어 사용
+        if tpool is not None:
+            return GreenBoundedSemaphore(size)
+        return threading.BoundedSemaphore(size)
+
+    def _run(self, func, *args):
+        with self._slots:
+            if self.offload:
+                return tpool.execute(func, *args)
+            return func(*args)
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+password_hasher = PasswordHasher()
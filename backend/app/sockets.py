@@ -0,0 +1,102 @@
+from flask import request
+from flask_socketio import join_room, leave_room
+from . import socketio
+import json
+import queue
+import threading
+
+# 이 크기를 넘는 푸시 메시지는 필수 필드만 보내고, 앱이 목록 API로 나머지를 조회
+MAX_PUSH_PAYLOAD_BYTES = 4096
+ESSENTIAL_FIELDS = ('user_id', 'timestamp', 'eventname', 'camera_number')
+RELAY_POLL_INTERVAL = 0.01
+
+# 네이티브 스레드(수집 워커 등)에서 보낸 푸시를 eventlet 허브의 백그라운드 작업이 대신 전송하기 위한 큐
+_relay = queue.Queue()
+_relay_lock = threading.Lock()
+_relay_started = False
+
+def user_room(user_id):
+    return f"user:{user_id}"
+
+def camera_room(user_id, camera_number):
+    return f"user:{user_id}:camera:{camera_number}"
+
+def handle_connect():
+    """연결 시 쿼리 파라미터(user_id, camera_number)로 사용자/카메라 방에 참여
+
+    camera_number를 주면 해당 카메라 방에만 참여하므로, 한 클라이언트는 같은 이벤트를 한 번만 받습니다.
+    """
+    user_id = request.args.get('user_id')
+    if not user_id:
+        print(f"user_id 없이 연결된 소켓 {request.sid}: 푸시 메시지를 받지 않습니다.")
+        return
+    camera_number = request.args.get('camera_number')
+    join_room(camera_room(user_id, camera_number) if camera_number else user_room(user_id))
+
+def handle_subscribe(data):
+    room = _room_from(data)
+    if room:
+        join_room(room)
+
+def handle_unsubscribe(data):
+    room = _room_from(data)
+    if room:
+        leave_room(room)
+
+def register_handlers():
+    """create_app마다 새로 만들어지는 Socket.IO 서버에 핸들러 등록"""
+    socketio.on_event('connect', handle_connect)
+    socketio.on_event('subscribe', handle_subscribe)
+    socketio.on_event('unsubscribe', handle_unsubscribe)
+
+def _room_from(data):
+    if not isinstance(data, dict) or not data.get('user_id'):
+        return None
+    if data.get('camera_number') is not None:
+        return camera_room(data['user_id'], data['camera_number'])
+    return user_room(data['user_id'])
+
+def fit_payload(payload, max_bytes=MAX_PUSH_PAYLOAD_BYTES):
+    """직렬화 크기가 max_bytes를 넘으면 필수 필드만 남기고 truncated 표시"""
+    if len(json.dumps(payload, default=str).encode()) <= max_bytes:
+        return payload
+    trimmed = {key: payload[key] for key in ESSENTIAL_FIELDS if key in payload}
+    trimmed['truncated'] = True
+    return trimmed
+
+def emit_to_user(user_id, payload, camera_number=None, event='push_message'):
+    """해당 사용자(와 카메라 방)에 연결된 클라이언트에게만 메시지 전송
+
+    eventlet 허브가 도는 메인 스레드가 아니면 소켓에 직접 쓸 수 없으므로 릴레이 큐에 넣고 바로 반환합니다.
+    """
+    payload = fit_payload(payload)
+    if threading.current_thread() is not threading.main_thread():
+        _relay.put((user_id, payload, camera_number, event))
+        return
+    _emit(user_id, payload, camera_number, event)
+
+def _emit(user_id, payload, camera_number, event):
+    socketio.emit(event, payload, room=user_room(user_id))
+    if camera_number is not None:
+        socketio.emit(event, payload, room=camera_room(user_id, camera_number))
+
+def start_relay():
+    """릴레이 큐를 비우는 백그라운드 작업 시작 (프로세스당 한 번, 허브의 green thread로 실행)"""
+    global _relay_started
+    with _relay_lock:
+        if _relay_started:
+            return
+        _relay_started = True
+    socketio.start_background_task(_drain_relay)
+
+def _drain_relay():
+    while True:
+        try:
+            item = _relay.get_nowait()
+        except queue.Empty:
+            socketio.sleep(RELAY_POLL_INTERVAL)
+            continue
+        try:
+            _emit(*item)
+        except Exception as e:
+            print(f"푸시 메시지 전송 오류 발생: {e}")
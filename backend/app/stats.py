@@ -0,0 +1,182 @@
+from . import db
+from .models import EventLog, EventStat
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, func
+
+GRANULARITIES = ('hour', 'day')
+SERIES_GRANULARITIES = ('hour', 'day', 'week')
+MAX_HOURLY_SERIES_DAYS = 31  # 시간 단위 시계열로 조회할 수 있는 최대 기간
+
+def floor_hour(timestamp):
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+def floor_day(timestamp):
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def ceil_hour(timestamp):
+    floored = floor_hour(timestamp)
+    return floored if floored == timestamp else floored + timedelta(hours=1)
+
+def ceil_day(timestamp):
+    floored = floor_day(timestamp)
+    return floored if floored == timestamp else floored + timedelta(days=1)
+
+def bucket_start(timestamp, granularity):
+    if granularity == 'hour':
+        return floor_hour(timestamp)
+    if granularity == 'day':
+        return floor_day(timestamp)
+    return floor_day(timestamp) - timedelta(days=timestamp.weekday())  # 주 단위는 월요일 시작
+
+def count_events(rows):
+    """EventLog 행(dict) 목록을 롤업 키별 건수로 집계
+
+    롤업은 이벤트 목록과 같이 EventLog 행(합쳐진 이벤트는 1건) 수를 셉니다. 합쳐진 반복 알림 수(EventLog.count)는 세지 않습니다.
+    """
+    counts = Counter()
+    for row in rows:
+        for granularity in GRANULARITIES:
+            counts[(row['user_id'], granularity, bucket_start(row['timestamp'], granularity),
+                    row['camera_number'], row['eventname'])] += 1
+    return counts
+
+def add_event_counts(counts):
+    """롤업 건수 누적 (호출한 쪽의 트랜잭션과 함께 커밋)
+
+    MySQL은 INSERT ... ON DUPLICATE KEY UPDATE 한 번으로 처리하고,
+    그 외(SQLite)는 기존 행을 한 번에 조회해 증가시키고 없는 행만 삽입합니다.
+    """
+    if not counts:
+        return
+    rows = [{'user_id': user_id, 'granularity': granularity, 'period_start': period_start,
+             'camera_number': camera_number, 'eventname': eventname, 'count': count}
+            for (user_id, granularity, period_start, camera_number, eventname), count in counts.items()]
+
+    if db.session.get_bind().dialect.name == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        statement = insert(EventStat.__table__).values(rows)
+        db.session.execute(statement.on_duplicate_key_update(count=EventStat.__table__.c.count + statement.inserted.count))
+        return
+
+    existing = {}
+    query = db.session.query(EventStat.id, EventStat.user_id, EventStat.granularity, EventStat.period_start,
+                             EventStat.camera_number, EventStat.eventname, EventStat.count).filter(
+        EventStat.user_id.in_({row['user_id'] for row in rows}),
+        EventStat.period_start.in_({row['period_start'] for row in rows}))
+    for stat_id, *key, count in query:
+        existing[tuple(key)] = (stat_id, count)
+
+    updates, inserts = [], []
+    for row in rows:
+        key = (row['user_id'], row['granularity'], row['period_start'], row['camera_number'], row['eventname'])
+        if key in existing:
+            stat_id, count = existing[key]
+            updates.append({'id': stat_id, 'count': count + row['count']})
+        else:
+            inserts.append(row)
+    db.session.bulk_update_mappings(EventStat, updates)
+    db.session.bulk_insert_mappings(EventStat, inserts)
+
+def load_stats(user_id, start, end, granularity='day', camera_number=None, eventname=None, hourly_since=None):
+    """[start, end) 구간의 이벤트 건수를 롤업 테이블만 읽어 집계
+
+    구간 안에 완전히 포함된 날은 일 단위 행, 양 끝의 일부 구간은 시간 단위 행을 읽으므로
+    원본 이벤트 수와 관계없이 조회하는 행 수는 (일 수 + 48시간) x 카메라 x 이벤트 종류 이내입니다.
+    시간 단위 행이 정리된 시점(hourly_since) 이전 경계는 날짜 단위로 맞춥니다.
+    """
+    start, end = floor_hour(start), ceil_hour(end)
+    if hourly_since is not None:
+        if start < hourly_since:
+            start = floor_day(start)
+        if end < hourly_since:
+            end = ceil_day(end)
+
+    if granularity == 'hour':
+        segments = EventStat.granularity == 'hour'
+        segments = and_(segments, EventStat.period_start >= start, EventStat.period_start < end)
+    else:
+        day_start, day_end = ceil_day(start), floor_day(end)
+        if day_start < day_end:
+            segments = or_(
+                and_(EventStat.granularity == 'day', EventStat.period_start >= day_start, EventStat.period_start < day_end),
+                and_(EventStat.granularity == 'hour', EventStat.period_start >= start, EventStat.period_start < day_start),
+                and_(EventStat.granularity == 'hour', EventStat.period_start >= day_end, EventStat.period_start < end))
+        else:
+            segments = and_(EventStat.granularity == 'hour', EventStat.period_start >= start, EventStat.period_start < end)
+
+    query = db.session.query(EventStat.period_start, EventStat.camera_number, EventStat.eventname,
+                             EventStat.count).filter(EventStat.user_id == user_id, segments)
+    if camera_number is not None:
+        query = query.filter(EventStat.camera_number == camera_number)
+    if eventname is not None:
+        query = query.filter(EventStat.eventname == eventname)
+
+    total = 0
+    by_eventname, by_camera, series = Counter(), Counter(), {}
+    for period_start, row_camera, row_eventname, count in query:
+        total += count
+        by_eventname[row_eventname] += count
+        by_camera[row_camera] += count
+        bucket = series.setdefault(bucket_start(period_start, granularity), Counter())
+        bucket[row_eventname] += count
+
+    # 건수가 없는 구간도 0으로 채워 차트에서 바로 사용할 수 있게 함
+    step = {'hour': timedelta(hours=1), 'day': timedelta(days=1), 'week': timedelta(weeks=1)}[granularity]
+    points = []
+    period = bucket_start(start, granularity)
+    while period < end:
+        counts = series.get(period, Counter())
+        points.append({'period_start': period.isoformat(), 'count': sum(counts.values()), 'by_eventname': dict(counts)})
+        period += step
+
+    return {
+        'user_id': user_id,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'granularity': granularity,
+        'total': total,
+        'by_eventname': dict(by_eventname),
+        'by_camera': {str(camera): count for camera, count in sorted(by_camera.items())},
+        'series': points,
+    }
+
+def prune_hourly_stats(keep_days=90):
+    """오래된 시간 단위 롤업 삭제 (일 단위 롤업은 보관)"""
+    cutoff = floor_day(datetime.utcnow() - timedelta(days=keep_days))
+    deleted = EventStat.query.filter(EventStat.granularity == 'hour', EventStat.period_start < cutoff).delete(
+        synchronize_session=False)
+    db.session.commit()
+    if deleted:
+        print(f"시간 단위 통계 {deleted}건 삭제 (기준: {cutoff})")
+    return deleted
+
+def rebuild_event_stats(user_id=None, batch_size=10000):
+    """event_logs에서 롤업을 다시 계산 (롤업 도입 전 데이터 채우기, 불일치 복구용)
+
+    수집기와 같이 EventLog 행 수를 세므로(count_events), 합쳐진 이벤트의 반복 횟수는 더하지 않습니다.
+    보관 기간이 지나 삭제된 이벤트는 다시 계산할 수 없으므로, 해당 기간의 롤업도 사라집니다.
+    삭제와 같은 트랜잭션에서 읽은 최대 id까지만 다시 세고, 이후 이벤트는 수집기가 누적합니다.
+    """
+    stats = EventStat.query
+    events = db.session.query(EventLog.id, EventLog.user_id, EventLog.timestamp, EventLog.camera_number,
+                              EventLog.eventname)
+    if user_id is not None:
+        stats = stats.filter(EventStat.user_id == user_id)
+        events = events.filter(EventLog.user_id == user_id)
+    stats.delete(synchronize_session=False)
+    max_id = events.with_entities(func.max(EventLog.id)).scalar() or 0
+    db.session.commit()
+
+    last_id, total = 0, 0
+    while last_id < max_id:
+        rows = events.filter(EventLog.id > last_id, EventLog.id <= max_id).order_by(EventLog.id).limit(batch_size).all()
+        if not rows:
+            break
+        add_event_counts(count_events({'user_id': row.user_id, 'timestamp': row.timestamp,
+                                       'camera_number': row.camera_number, 'eventname': row.eventname} for row in rows))
+        db.session.commit()
+        last_id = rows[-1].id
+        total += len(rows)
+    print(f"이벤트 통계 재계산 완료: 이벤트 {total}건")
+    return total
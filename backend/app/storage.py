@@ -0,0 +1,225 @@
+from . import db
+from .models import S3DeleteJob, S3DeleteKey
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+from sqlalchemy import and_, or_
+import json
+import threading
+import time
+import uuid
+import boto3
+from botocore.config import Config as BotoConfig
+
+# delete_objects API가 한 번에 받을 수 있는 최대 키 수
+MAX_KEYS_PER_REQUEST = 1000
+JOB_RETENTION_DAYS = 7  # 끝난 작업 기록 보관 기간(일)
+
+def clip_key_from_url(event_url):
+    """클립 URL에서 S3 객체 키 추출 (예: saved_clips/Fall_20241225_034500.mp4)"""
+    return urlparse(event_url).path.lstrip('/')
+
+# 모델 서버가 클립 옆에 함께 업로드하는 대표 이미지와 썸네일 스트립 (saved_clips/Fall_20241225_034500_poster.jpg)
+POSTER_SUFFIX = '_poster.jpg'
+THUMBNAIL_SUFFIX = '_thumbs.jpg'
+
+def clip_asset_url(event_url, suffix):
+    """클립 URL에서 같은 위치의 이미지 URL 생성"""
+    return event_url[:-len('.mp4')] + suffix if event_url.endswith('.mp4') else event_url + suffix
+
+def clip_asset_keys(event_url):
+    """클립과 함께 삭제할 S3 키 목록 (영상, 대표 이미지, 썸네일 스트립)"""
+    key = clip_key_from_url(event_url)
+    return [key] + [clip_key_from_url(clip_asset_url(event_url, suffix)) for suffix in (POSTER_SUFFIX, THUMBNAIL_SUFFIX)]
+
+class S3DeletionQueue:
+    """S3 객체 삭제를 백그라운드 스레드에서 일괄 처리하는 작업 큐
+
+    enqueue()는 삭제할 키를 작업 테이블에 호출한 쪽의 트랜잭션으로 기록만 하므로, DB 행 삭제와 함께 커밋되거나 함께 취소됩니다.
+    커밋 후 notify()로 워커를 깨우면 하나의 boto3 클라이언트로 delete_objects(최대 1000개)를 호출하고, 일부 실패한 키는 재시도한 뒤
+    처리한 키를 테이블에서 지웁니다. 재시작하거나 처리 중인 워커가 종료되어도 남은 키를 이어서 삭제하고(S3 삭제는 반복해도 안전),
+    작업 상태는 DB에 있으므로 어느 워커에서든 조회할 수 있습니다.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = False
+        self.client = None
+        self.bucket_name = None
+        self.max_retries = 3
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._worker = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('S3_DELETE_WORKER', True)
+        self.bucket_name = app.config['S3_BUCKET_NAME']
+        self.max_retries = app.config.get('S3_DELETE_MAX_RETRIES', 3)
+        self.poll_interval = app.config.get('S3_DELETE_POLL_INTERVAL', 60)
+        self.stale_after = timedelta(seconds=app.config.get('S3_DELETE_STALE_AFTER', 600))
+        self._aws_options = {
+            'aws_access_key_id': app.config['AWS_ACCESS_KEY_ID'],
+            'aws_secret_access_key': app.config['AWS_SECRET_ACCESS_KEY'],
+            'region_name': app.config['AWS_REGION'],
+        }
+        if self.enabled:
+            # 이전 실행에서 끝내지 못한 작업이 있으면 바로 이어서 처리
+            with app.app_context():
+                try:
+                    pending = S3DeleteJob.query.filter(S3DeleteJob.status.in_(('queued', 'running'))).count()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"S3 삭제 작업 조회 실패 (마이그레이션 전일 수 있음): {e}")
+                    pending = 0
+            if pending:
+                print(f"남은 S3 삭제 작업 {pending}개를 이어서 처리합니다.")
+                self.notify()
+
+    def get_client(self):
+        # 클라이언트는 한 번만 만들고 연결 풀을 재사용
+        if self.client is None:
+            self.client = boto3.client(
+                's3',
+                config=BotoConfig(max_pool_connections=10, retries={'max_attempts': 3}),
+                **self._aws_options
+            )
+        return self.client
+
+    def enqueue(self, keys):
+        """삭제할 키 목록을 현재 트랜잭션에 작업으로 기록하고 작업 ID 반환 (호출한 쪽이 커밋 후 notify() 호출)"""
+        keys = list(dict.fromkeys(key for key in keys if key))
+        job_id = uuid.uuid4().hex
+        db.session.add(S3DeleteJob(id=job_id, status='queued' if keys else 'done', total=len(keys), deleted=0,
+                                   created_at=datetime.utcnow(), finished_at=None if keys else datetime.utcnow()))
+        if keys:
+            db.session.bulk_insert_mappings(S3DeleteKey, [{'job_id': job_id, 'key': key} for key in keys])
+        return job_id
+
+    def notify(self):
+        """커밋된 작업을 처리하도록 워커를 깨움"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+        self._event.set()
+
+    def status(self, job_id):
+        job = S3DeleteJob.query.get(job_id)
+        if job is None:
+            return None
+        return {
+            'id': job.id,
+            'status': job.status,
+            'total': job.total,
+            'deleted': job.deleted,
+            'failed': json.loads(job.failed) if job.failed else [],
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        }
+
+    def process_pending(self):
+        """처리할 작업을 하나씩 가져와(claim) 모두 처리하고 처리한 작업 수 반환"""
+        processed = 0
+        while True:
+            job = self._claim_next()
+            if job is None:
+                return processed
+            try:
+                self._process(job)
+            except Exception as e:
+                # 남은 키는 그대로 두었으므로 진행 기록이 오래되면 다시 처리됨
+                db.session.rollback()
+                print(f"S3 삭제 작업 {job.id} 오류 발생: {e}")
+                return processed
+            processed += 1
+
+    def prune(self, keep_days=JOB_RETENTION_DAYS):
+        """끝난 지 오래된 작업 기록 삭제"""
+        cutoff = datetime.utcnow() - timedelta(days=keep_days)
+        deleted = S3DeleteJob.query.filter(S3DeleteJob.status.in_(('done', 'failed')),
+                                           S3DeleteJob.finished_at < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+    def _run(self):
+        while True:
+            self._event.wait(timeout=self.poll_interval)
+            self._event.clear()
+            try:
+                with self.app.app_context():
+                    self.process_pending()
+                    self.prune()
+                    db.session.remove()
+            except Exception as e:
+                print(f"S3 삭제 작업 처리 오류 발생: {e}")
+
+    def _claimable(self, now):
+        # 대기 중이거나, 처리하던 워커가 종료되어 진행 기록이 멈춘 작업
+        return or_(S3DeleteJob.status == 'queued',
+                   and_(S3DeleteJob.status == 'running', S3DeleteJob.claimed_at < now - self.stale_after))
+
+    def _claim_next(self):
+        """다른 워커와 겹치지 않도록 조건부 UPDATE로 작업 하나를 가져옴"""
+        now = datetime.utcnow()
+        candidates = [job_id for (job_id,) in db.session.query(S3DeleteJob.id).filter(self._claimable(now))
+                      .order_by(S3DeleteJob.created_at).limit(10)]
+        for job_id in candidates:
+            claimed = S3DeleteJob.query.filter(S3DeleteJob.id == job_id, self._claimable(now)).update(
+                {'status': 'running', 'claimed_at': now}, synchronize_session=False)
+            db.session.commit()
+            if claimed:
+                return S3DeleteJob.query.get(job_id)
+        return None
+
+    def _process(self, job):
+        started = time.time()
+        failed = json.loads(job.failed) if job.failed else []
+        while True:
+            rows = db.session.query(S3DeleteKey.id, S3DeleteKey.key).filter(S3DeleteKey.job_id == job.id).order_by(
+                S3DeleteKey.id).limit(MAX_KEYS_PER_REQUEST).all()
+            if not rows:
+                break
+            errors = self._delete_with_retry([key for _, key in rows])
+            failed.extend({'key': error['Key'], 'code': error.get('Code'), 'message': error.get('Message')}
+                          for error in errors)
+            # 처리한 키 삭제와 진행 상황을 함께 커밋해, 중단되면 이 배치부터 다시 처리
+            S3DeleteKey.query.filter(S3DeleteKey.id.in_([id for id, _ in rows])).delete(synchronize_session=False)
+            job.deleted += len(rows) - len(errors)
+            job.failed = json.dumps(failed) if failed else None
+            job.claimed_at = datetime.utcnow()
+            db.session.commit()
+
+        job.status = 'failed' if failed else 'done'
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        print(f"S3 삭제 작업 {job.id}: {job.deleted}/{job.total}개 삭제 ({time.time() - started:.1f}초)")
+
+    def _delete_with_retry(self, keys):
+        """delete_objects 호출 후 일부 실패한 키만 지수 백오프로 재시도하고, 끝까지 실패한 키의 오류 목록 반환"""
+        pending = keys
+        errors = []
+        for attempt in range(self.max_retries + 1):
+            errors = self._delete_batch(pending)
+            if not errors:
+                break
+            pending = [error['Key'] for error in errors]
+            if attempt < self.max_retries:
+                time.sleep(0.5 * (2 ** attempt))
+        return errors
+
+    def _delete_batch(self, keys):
+        """delete_objects 한 번 호출하고 실패한 키의 오류 목록 반환"""
+        try:
+            response = self.get_client().delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True}
+            )
+            return response.get('Errors', [])
+        except Exception as e:
+            return [{'Key': key, 'Code': type(e).__name__, 'Message': str(e)} for key in keys]
+
+s3_deleter = S3DeletionQueue()
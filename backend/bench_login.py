@@ -0,0 +1,144 @@
+# bench_login.py
+# 동시 로그인 중 소켓 푸시 지연 측정
+# 서버(eventlet)를 별도 프로세스로 띄우고, 여러 스레드가 로그인을 반복하는 동안
+# 다른 클라이언트가 /log_event → push_message 수신까지 걸리는 시간을 측정합니다.
+#
+#   python bench_login.py                  # 해시 오프로드 사용
+#   python bench_login.py --compare        # 오프로드 사용/미사용 비교
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import requests
+import socketio
+
+BENCH_USER = {'id': 'bench', 'name': 'bench', 'email': 'bench@example.com', 'phone': '01000000000',
+              'address': 'addr', 'detailed_address': 'detail', 'password': 'bench-password'}
+
+def serve(port, offload, db_path):
+    # 측정 대상 서버 프로세스
+    from config import TestingConfig
+    from app import create_app, db, socketio as server_socketio
+
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        PASSWORD_HASH_OFFLOAD = offload
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+    server_socketio.run(app, host='127.0.0.1', port=port, log_output=False)
+
+def wait_until_ready(base_url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(f"{base_url}/ingest/stats", timeout=1)
+            return
+        except requests.exceptions.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError("서버가 시작되지 않았습니다.")
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)]
+
+def run_benchmark(port, offload, concurrency, duration):
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    server = subprocess.Popen([sys.executable, __file__, '--serve', '--port', str(port), '--db', db_path]
+                              + ([] if offload else ['--no-offload']))
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_ready(base_url)
+        requests.post(f"{base_url}/add_user", json=BENCH_USER)
+
+        # 푸시 수신 클라이언트
+        received = {}
+        client = socketio.Client()
+
+        @client.on('push_message')
+        def on_push(data):
+            received[data['timestamp']] = time.perf_counter()
+
+        client.connect(f"{base_url}?user_id={BENCH_USER['id']}")
+
+        stop = threading.Event()
+        login_counts = []
+
+        def login_worker():
+            session = requests.Session()
+            count = 0
+            while not stop.is_set():
+                session.post(f"{base_url}/login", json={'id': BENCH_USER['id'], 'password': BENCH_USER['password']})
+                count += 1
+            login_counts.append(count)
+
+        workers = [threading.Thread(target=login_worker) for _ in range(concurrency)]
+        for worker in workers:
+            worker.start()
+
+        # 로그인이 진행되는 동안 0.1초마다 이벤트를 기록하고 푸시 수신까지의 지연 측정
+        push_latencies = []
+        started = time.time()
+        second = 0
+        while time.time() - started < duration:
+            second += 1
+            timestamp = f"20240101_{second // 3600:02d}{second // 60 % 60:02d}{second % 60:02d}"
+            sent = time.perf_counter()
+            requests.post(f"{base_url}/log_event", json={'user_id': BENCH_USER['id'], 'timestamp': timestamp,
+                                                          'eventname': 'Fall', 'camera_number': 1})
+            iso = f"2024-01-01T{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+            deadline = time.time() + 5
+            while iso not in received and time.time() < deadline:
+                time.sleep(0.001)
+            if iso in received:
+                push_latencies.append((received[iso] - sent) * 1000)
+            time.sleep(0.1)
+
+        stop.set()
+        for worker in workers:
+            worker.join()
+        elapsed = time.time() - started
+        client.disconnect()
+
+        return {
+            'offload': offload,
+            'logins_per_second': sum(login_counts) / elapsed,
+            'push_p50_ms': percentile(push_latencies, 0.5),
+            'push_p95_ms': percentile(push_latencies, 0.95),
+            'push_max_ms': max(push_latencies) if push_latencies else 0.0,
+            'pushes': len(push_latencies),
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 로그인 중 푸시 지연 벤치마크")
+    parser.add_argument('--concurrency', type=int, default=16, help="동시 로그인 스레드 수")
+    parser.add_argument('--duration', type=float, default=10, help="측정 시간(초)")
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--compare', action='store_true', help="해시 오프로드 미사용과 비교")
+    parser.add_argument('--no-offload', action='store_true', help="해시를 eventlet 허브에서 직접 실행")
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, not args.no_offload, args.db)
+        return
+
+    modes = [False, True] if args.compare else [not args.no_offload]
+    print(f"{'offload':>8} {'logins/s':>10} {'push p50':>10} {'push p95':>10} {'push max':>10} {'pushes':>7}")
+    for offload in modes:
+        result = run_benchmark(args.port, offload, args.concurrency, args.duration)
+        print(f"{str(result['offload']):>8} {result['logins_per_second']:>10.1f} {result['push_p50_ms']:>8.1f}ms "
+              f"{result['push_p95_ms']:>8.1f}ms {result['push_max_ms']:>8.1f}ms {result['pushes']:>7}")
+
+if __name__ == '__main__':
+    main()
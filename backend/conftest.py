@@ -0,0 +1,18 @@
+# conftest.py
+# 테스트 공통 fixture: TestingConfig 앱(메모리 SQLite)에 테이블을 만들고, 테스트가 끝나면 삭제
+# 설정/DB가 다른 테스트(파일 SQLite, 모듈 단위 대량 데이터 등)는 각 파일에서 같은 이름의 fixture로 덮어씀
+import pytest
+from app import create_app, db
+
+@pytest.fixture
+def app():
+    app = create_app('config.TestingConfig')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
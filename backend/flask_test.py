@@ -1,3 +1,7 @@
+# socket만 green으로 바꿔 PyMySQL 쿼리가 eventlet 허브를 막지 않도록 함 (백그라운드 작업 스레드는 그대로 네이티브 스레드)
+import eventlet
+eventlet.monkey_patch(socket=True, select=True)
+
 from app import create_app, db, socketio
 from flask_migrate import Migrate
 from flask_script import Manager
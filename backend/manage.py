@@ -6,5 +6,11 @@ app = create_app()
 manager = Manager(app)
 manager.add_command('db', MigrateCommand)
 
+@manager.option('-u', '--user', dest='user_id', default=None, help="특정 사용자만 재계산")
+def rebuild_stats(user_id=None):
+    """event_logs에서 이벤트 통계 롤업 재계산"""
+    from app.stats import rebuild_event_stats
+    rebuild_event_stats(user_id)
+
 if __name__ == '__main__':
     manager.run()
@@ -0,0 +1,36 @@
+"""hot query indexes
+
+Revision ID: 3b7e9d2c41a5
+Revises: 8144e0030408
+Create Date: 2026-10-19 10:12:31.482913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e9d2c41a5'
+down_revision = '8144e0030408'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_name', 'users', ['name'], unique=False)
+    op.create_index('ix_event_logs_user_id_timestamp', 'event_logs', ['user_id', 'timestamp', 'id'], unique=False)
+    op.create_index('ix_event_logs_timestamp', 'event_logs', ['timestamp', 'id'], unique=False)
+    op.create_index('ix_cameras_user_id_camera_number', 'cameras', ['user_id', 'camera_number'], unique=False)
+    op.create_index('ix_cameras_camera_number', 'cameras', ['camera_number'], unique=False)
+    op.create_index('ix_video_clips_user_id_timestamp', 'video_clips', ['user_id', 'timestamp', 'id'], unique=False)
+    op.create_index('ix_video_clips_timestamp', 'video_clips', ['timestamp', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_video_clips_timestamp', table_name='video_clips')
+    op.drop_index('ix_video_clips_user_id_timestamp', table_name='video_clips')
+    op.drop_index('ix_cameras_camera_number', table_name='cameras')
+    op.drop_index('ix_cameras_user_id_camera_number', table_name='cameras')
+    op.drop_index('ix_event_logs_timestamp', table_name='event_logs')
+    op.drop_index('ix_event_logs_user_id_timestamp', table_name='event_logs')
+    op.drop_index('ix_users_name', table_name='users')
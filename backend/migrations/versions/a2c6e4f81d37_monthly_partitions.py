@@ -0,0 +1,69 @@
+"""monthly partitions for event_logs and video_clips
+
+Revision ID: a2c6e4f81d37
+Revises: 4f8b2d9c6e13
+Create Date: 2026-10-19 19:24:08.113562
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2c6e4f81d37'
+down_revision = '4f8b2d9c6e13'
+branch_labels = None
+depends_on = None
+
+TABLES = ('event_logs', 'video_clips')
+MONTHS_AHEAD = 3
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_clause(first_month, last_month):
+    # pYYYYMM: 해당 월의 행 (상한은 다음 달 1일), p_max: 이후 모든 행
+    definitions = []
+    month = first_month
+    while month <= last_month:
+        definitions.append(f"PARTITION p{month:%Y%m} VALUES LESS THAN ('{add_months(month, 1):%Y-%m-%d %H:%M:%S}')")
+        month = add_months(month, 1)
+    definitions.append("PARTITION p_max VALUES LESS THAN (MAXVALUE)")
+    return f"PARTITION BY RANGE COLUMNS(`timestamp`) ({', '.join(definitions)})"
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'mysql':
+        # SQLite 등 파티션을 지원하지 않는 DB는 일반 테이블 유지 (만료 월 삭제는 DELETE로 대체)
+        return
+
+    inspector = sa.inspect(bind)
+    this_month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    for table in TABLES:
+        # 파티션 테이블은 외래 키를 가질 수 없고, 모든 고유 키(기본 키 포함)에 파티션 키가 포함되어야 함
+        for foreign_key in inspector.get_foreign_keys(table):
+            op.drop_constraint(foreign_key['name'], table, type_='foreignkey')
+        op.execute(f"UPDATE {table} SET `timestamp` = UTC_TIMESTAMP() WHERE `timestamp` IS NULL")
+        op.alter_column(table, 'timestamp', existing_type=sa.DateTime(), nullable=False)
+        op.execute(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id, `timestamp`)")
+
+        oldest = bind.execute(sa.text(f"SELECT MIN(`timestamp`) FROM {table}")).scalar()
+        first_month = oldest.replace(day=1, hour=0, minute=0, second=0, microsecond=0) if oldest else this_month
+        op.execute(f"ALTER TABLE {table} {partition_clause(min(first_month, this_month), add_months(this_month, MONTHS_AHEAD))}")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'mysql':
+        return
+
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} REMOVE PARTITIONING")
+        op.execute(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+        op.alter_column(table, 'timestamp', existing_type=sa.DateTime(), nullable=True)
+        op.create_foreign_key(None, table, 'users', ['user_id'], ['id'])
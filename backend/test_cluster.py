@@ -0,0 +1,139 @@
+# test_cluster.py
+# 멀티 워커 모드: 메시지 큐로 다른 워커의 클라이언트에게 푸시/캐시 무효화가 전달되고, 리더 임대는 한 워커만 얻는지 확인
+import logging
+import os
+import threading
+import time
+import uuid
+import pytest
+from app import create_app, socketio
+from app.cache import camera_config_cache, list_versions
+from app.cluster import LocalQueueManager, FileQueueManager, cluster_bus
+from app.ingest import EventIngestor
+from app.leader import LeaderElection
+from config import TestingConfig
+
+class FakeServer:
+    """관리자가 사용하는 Socket.IO 서버 기능만 흉내 내고, 클라이언트에게 보낸 메시지를 기록"""
+
+    def __init__(self):
+        self.sent = []
+        self.logger = logging.getLogger('socketio')
+
+    def start_background_task(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        return thread
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def _emit_internal(self, sid, event, data, namespace, id):
+        self.sent.append((sid, event, data))
+
+def start_manager(manager):
+    server = FakeServer()
+    manager.set_server(server)
+    manager.initialize()
+    return server
+
+def wait_for(condition, timeout=2):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+@pytest.fixture(params=['memory', 'file'])
+def managers(request, tmp_path):
+    channel = uuid.uuid4().hex
+    if request.param == 'memory':
+        return LocalQueueManager(channel=channel), LocalQueueManager(channel=channel)
+    url = f"file://{tmp_path / 'socketio'}"
+    return FileQueueManager(url, channel=channel), FileQueueManager(url, channel=channel)
+
+def test_emit_reaches_client_on_other_worker(managers):
+    first, second = managers
+    first_server, second_server = start_manager(first), start_manager(second)
+    second.connect('sid-alice', '/')
+    second.enter_room('sid-alice', '/', 'user:alice')
+
+    first.emit('push_message', {'eventname': 'Fall'}, namespace='/', room='user:alice')
+
+    assert wait_for(lambda: second_server.sent)
+    assert second_server.sent == [('sid-alice', 'push_message', {'eventname': 'Fall'})]
+    assert first_server.sent == []
+
+def test_cache_invalidation_is_broadcast(monkeypatch):
+    channel = uuid.uuid4().hex
+    sender, receiver = LocalQueueManager(channel=channel), LocalQueueManager(channel=channel)
+    start_manager(sender)
+    start_manager(receiver)
+    # 수신 측 워커의 캐시에 값이 있는 상태에서 송신 측 워커가 무효화
+    camera_config_cache.get_or_load('alice', lambda: ['stale'])
+    token = list_versions.token('alice')
+
+    monkeypatch.setattr(cluster_bus, 'manager', sender)
+    cluster_bus.publish('camera_config.invalidate', 'alice')
+    cluster_bus.publish('list_versions.bump', 'alice', [('clips', 'reset', None)])
+
+    assert wait_for(lambda: camera_config_cache.get_or_load('alice', lambda: ['fresh']) == ['fresh'])
+    assert wait_for(lambda: list_versions.token('alice') != token)
+
+def test_create_app_with_message_queue():
+    class QueueConfig(TestingConfig):
+        SOCKETIO_MESSAGE_QUEUE = 'memory://'
+        SOCKETIO_CHANNEL = uuid.uuid4().hex
+
+    create_app(QueueConfig)
+    assert isinstance(socketio.server.manager, LocalQueueManager)
+    assert cluster_bus.manager is socketio.server.manager
+
+    # 메시지 큐가 없는 설정으로 다시 만들면 기본 관리자로 돌아감
+    create_app('config.TestingConfig')
+    assert cluster_bus.manager is None
+    assert not isinstance(socketio.server.manager, LocalQueueManager)
+
+@pytest.fixture
+def app(app):
+    app.config['LEADER_ELECTION'] = True
+    return app
+
+def make_worker(app, ttl=60):
+    worker = LeaderElection(app)
+    worker.ttl = ttl
+    return worker
+
+def test_single_leader_and_failover(app):
+    first, second = make_worker(app), make_worker(app)
+    assert first.heartbeat() and first.is_leader
+    assert not second.heartbeat() and not second.is_leader
+    assert first.heartbeat()  # 리더는 임대를 갱신
+
+    first.release()
+    assert second.heartbeat() and second.is_leader
+    assert not first.heartbeat()
+
+def test_job_runs_once_per_interval(app):
+    first, second = make_worker(app), make_worker(app)
+    first.heartbeat()
+    second.heartbeat()
+    assert first.claim('delete_old_logs', 3600)
+    assert not first.claim('delete_old_logs', 3600)  # 같은 주기 안에서는 다시 실행하지 않음
+    assert not second.claim('delete_old_logs', 3600)  # 리더가 아닌 워커는 실행하지 않음
+
+    # 리더가 바뀌어도 이전 리더가 실행한 주기 안에서는 다시 실행하지 않음
+    first.release()
+    second.heartbeat()
+    assert not second.claim('delete_old_logs', 3600)
+    assert second.claim('retention_report', 3600)
+
+def test_async_ingest_requires_worker_id(app, tmp_path):
+    # 멀티 워커에서 WORKER_ID가 없으면 워커들이 같은 저널/체크포인트를 쓰게 되므로 시작하지 않음
+    app.config.update(EVENT_INGEST_ASYNC=True, EVENT_INGEST_JOURNAL_DIR=str(tmp_path))
+    with pytest.raises(RuntimeError):
+        EventIngestor(app)
+    assert not os.listdir(tmp_path)
+
+    app.config['WORKER_ID'] = 'worker-1'
+    ingestor = EventIngestor(app)
+    assert os.path.basename(ingestor.journal_path) == 'events-worker-1.journal'
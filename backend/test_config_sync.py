@@ -0,0 +1,126 @@
+# test_config_sync.py
+# 모델 서버 설정 동기화: 스냅샷/변경 목록의 버전과 누락 복구(410) 동작 확인
+from datetime import datetime, timedelta
+from app import db
+from app.models import CameraConfigChange
+
+def add_camera(client, camera_number, user_id='user1'):
+    response = client.post('/add_camera', json={'user_id': user_id, 'camera_number': camera_number,
+                                                'rtsp_url': f'rtsp://cam/{camera_number}'})
+    assert response.status_code == 200
+
+def test_snapshot_contains_all_cameras(client):
+    for camera_number in range(1, 4):
+        add_camera(client, camera_number)
+
+    snapshot = client.get('/model_sync/snapshot').get_json()
+    assert snapshot['version'] == 3
+    assert sorted(camera['camera_id'] for camera in snapshot['cameras']) == [1, 2, 3]
+    assert snapshot['cameras'][0]['camera_info']['rtsp_url'].startswith('rtsp://cam/')
+
+def test_changes_are_merged_per_camera(client):
+    add_camera(client, 1)
+    add_camera(client, 2)
+    client.post('/receive_event', json={'user_id': 'user1', 'camera_number': 1, 'fall_detection': True})
+    client.delete('/delete_camera/2')
+
+    delta = client.get('/model_sync/changes?since=0').get_json()
+    assert delta['from_version'] == 0 and delta['to_version'] == 4
+    assert [(change['camera_id'], change['op']) for change in delta['changes']] == [(1, 'upsert'), (2, 'remove')]
+    assert delta['changes'][0]['camera_info']['fall_detection_on'] is True
+
+    assert client.get('/model_sync/changes?since=4').get_json()['changes'] == []
+
+def test_changes_load_only_changed_cameras(client):
+    from sqlalchemy import event
+    from app.config_sync import load_changes
+    from app.models import CameraInfo
+    for user_id in ('user1', 'user2', 'user3'):
+        add_camera(client, 1, user_id=user_id)
+    client.post('/receive_event', json={'user_id': 'user2', 'camera_number': 1, 'fall_detection': True})
+
+    # 같은 카메라 번호를 가진 다른 사용자의 카메라는 읽지 않음
+    loaded = []
+    def on_load(camera, context):
+        loaded.append(camera.user_id)
+    db.session.expunge_all()
+    event.listen(CameraInfo, 'load', on_load)
+    try:
+        delta = load_changes(3)
+    finally:
+        event.remove(CameraInfo, 'load', on_load)
+    assert [(change['user_id'], change['camera_id']) for change in delta['changes']] == [('user2', 1)]
+    assert loaded == ['user2']
+
+def test_pruned_history_requires_snapshot(client):
+    for camera_number in range(1, 4):
+        add_camera(client, camera_number)
+    CameraConfigChange.query.update({'created_at': datetime.utcnow() - timedelta(days=30)})
+    db.session.commit()
+
+    from app.config_sync import prune_changes
+    assert prune_changes() == 2
+    assert client.get('/model_sync/changes?since=0').status_code == 410
+    assert client.get('/model_sync/changes?since=2').status_code == 200
+
+def test_bulk_update_detection(client, monkeypatch):
+    from app.config_sync import config_sync
+    for camera_number in range(1, 4):
+        add_camera(client, camera_number)
+    notified = []
+    monkeypatch.setattr(config_sync, 'notify', lambda: notified.append(True))
+
+    response = client.post('/bulk_update_detection', json={
+        'user_id': 'user1', 'settings': {'fire_detection': True},
+        'cameras': [{'camera_number': 1, 'roi_detection': True, 'roi_values': {'roi_x1': 10}},
+                    {'camera_number': 2}]})
+    assert response.status_code == 200 and response.get_json()['camera_numbers'] == [1, 2]
+    assert len(notified) == 1
+
+    delta = client.get('/model_sync/changes?since=3').get_json()
+    assert [change['camera_id'] for change in delta['changes']] == [1, 2]
+    first, second = (change['camera_info'] for change in delta['changes'])
+    assert first['fire_detection_on'] and first['roi_detection_on'] and first['roi_values']['roi_x1'] == 10
+    assert second['fire_detection_on'] and not second['roi_detection_on']
+
+    # cameras를 생략하면 모든 카메라 대상
+    client.post('/bulk_update_detection', json={'user_id': 'user1', 'settings': {'smoke_detection': True}})
+    cameras = client.get('/model_sync/snapshot').get_json()['cameras']
+    assert all(camera['camera_info']['smoke_detection_on'] for camera in cameras)
+
+    # 없는 카메라가 있으면 아무것도 변경하지 않음
+    response = client.post('/bulk_update_detection', json={
+        'user_id': 'user1', 'settings': {'fall_detection': True}, 'cameras': [{'camera_number': 1}, {'camera_number': 9}]})
+    assert response.status_code == 404 and response.get_json()['camera_numbers'] == [9]
+    assert not any(camera['camera_info']['fall_detection_on'] for camera in client.get('/model_sync/snapshot').get_json()['cameras'])
+
+def test_bulk_update_detection_query_count_is_constant(client):
+    # 카메라 수와 관계없이 같은 쿼리 수로 처리 (버전 발급/변경 기록이 카메라마다 반복되지 않음)
+    queries = {}
+    for user_id, count in (('few', 5), ('many', 40)):
+        for camera_number in range(1, count + 1):
+            add_camera(client, camera_number, user_id=user_id)
+        response = client.post('/bulk_update_detection', json={'user_id': user_id, 'settings': {'fire_detection': True}})
+        assert response.status_code == 200 and len(response.get_json()['camera_numbers']) == count
+        queries[user_id] = int(response.headers['X-SQL-Queries'])
+    assert queries['few'] == queries['many'] <= 6
+
+    delta = client.get('/model_sync/changes?since=0').get_json()
+    assert delta['to_version'] == 90 and len(delta['changes']) == 45
+    assert all(change['camera_info']['fire_detection_on'] for change in delta['changes'])
+
+def test_versions_are_issued_from_locked_counter(client):
+    from sqlalchemy.dialects import mysql
+    from app.config_sync import version_counter_query
+    from app.models import CameraConfigVersion
+    add_camera(client, 1)
+    # 버전은 카운터 행을 잠근 채 발급 (앞선 트랜잭션이 커밋되기 전에는 다음 버전을 받을 수 없음)
+    assert 'FOR UPDATE' in str(version_counter_query().statement.compile(dialect=mysql.dialect()))
+    assert CameraConfigVersion.query.one().version == 1
+
+    CameraConfigVersion.query.update({'version': 100})
+    db.session.commit()
+    add_camera(client, 2)
+    client.post('/receive_event', json={'user_id': 'user1', 'camera_number': 2, 'fall_detection': True})
+    assert [change.id for change in CameraConfigChange.query.order_by(CameraConfigChange.id)] == [1, 101, 102]
+    assert client.get('/model_sync/changes?since=1').get_json()['to_version'] == 102
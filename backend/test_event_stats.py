@@ -0,0 +1,84 @@
+# test_event_stats.py
+# 이벤트 저장 시 누적한 통계 롤업이 원본 이벤트 건수와 일치하는지 확인
+import pytest
+from datetime import datetime, timedelta
+from app import db
+from app.models import User, EventLog, EventStat
+from app.stats import rebuild_event_stats
+
+# 시간 단위 롤업 보관 기간 안의 날짜를 사용 (3주 전 월요일)
+TODAY = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+BASE = TODAY - timedelta(days=21 + TODAY.weekday())
+EVENTS = [
+    (BASE + timedelta(hours=1, minutes=5), 'Fall', 1),
+    (BASE + timedelta(hours=1, minutes=40), 'Fall', 2),
+    (BASE + timedelta(hours=23, minutes=59), 'Fire', 1),
+    (BASE + timedelta(days=1, hours=12), 'Fall', 1),
+    (BASE + timedelta(days=2, hours=3), 'Smoke', 2),
+    (BASE + timedelta(days=2, hours=22), 'Fall', 1),
+    (BASE + timedelta(days=8), 'Fire', 1),
+]
+
+@pytest.fixture
+def client(client):
+    user = User(id='user1', name='name', email='user1@example.com', phone='01000000000',
+                address='addr', detailed_address='detail')
+    user.set_password('password')
+    db.session.add(user)
+    db.session.commit()
+    for timestamp, eventname, camera_number in EVENTS:
+        client.post('/log_event', json={'user_id': 'user1', 'timestamp': timestamp.strftime('%Y%m%d_%H%M%S'),
+                                        'eventname': eventname, 'camera_number': camera_number})
+    return client
+
+def raw_count(start, end):
+    return EventLog.query.filter(EventLog.timestamp >= start, EventLog.timestamp < end).count()
+
+def get_stats(client, start, end, **params):
+    response = client.get('/stats/user1', query_string=dict(params, start=start.isoformat(), end=end.isoformat()))
+    assert response.status_code == 200
+    return response.get_json()
+
+@pytest.mark.parametrize('start, end', [
+    (BASE, BASE + timedelta(days=10)),
+    (BASE + timedelta(hours=1), BASE + timedelta(days=2, hours=4)),  # 양 끝이 일부 구간인 경우
+    (BASE + timedelta(hours=2), BASE + timedelta(hours=23)),  # 하루 안의 구간
+])
+def test_range_totals_match_raw_events(client, start, end):
+    stats = get_stats(client, start, end)
+    assert stats['total'] == raw_count(start, end)
+    assert sum(point['count'] for point in stats['series']) == stats['total']
+
+def test_breakdown_and_filters(client):
+    stats = get_stats(client, BASE, BASE + timedelta(days=3))
+    assert stats['by_eventname'] == {'Fall': 4, 'Fire': 1, 'Smoke': 1}
+    assert stats['by_camera'] == {'1': 4, '2': 2}
+    assert [point['count'] for point in stats['series']] == [3, 1, 2]
+
+    assert get_stats(client, BASE, BASE + timedelta(days=3), camera_number=2)['total'] == 2
+    assert get_stats(client, BASE, BASE + timedelta(days=3), eventname='Fall')['total'] == 4
+
+def test_hourly_and_weekly_series(client):
+    hourly = get_stats(client, BASE, BASE + timedelta(hours=3), granularity='hour')
+    assert [point['count'] for point in hourly['series']] == [0, 2, 0]
+
+    weekly = get_stats(client, BASE, BASE + timedelta(days=14), granularity='week')
+    assert [point['count'] for point in weekly['series']] == [6, 1]
+
+    response = client.get('/stats/user1', query_string={'start': BASE.isoformat(),
+                                                        'end': (BASE + timedelta(days=60)).isoformat(),
+                                                        'granularity': 'hour'})
+    assert response.status_code == 400
+
+def test_rebuild_matches_incremental_rollups(client):
+    def snapshot():
+        return sorted((stat.granularity, stat.period_start, stat.camera_number, stat.eventname, stat.count)
+                      for stat in EventStat.query)
+
+    before = snapshot()
+    assert rebuild_event_stats() == len(EVENTS)
+    assert snapshot() == before
+
+def test_delete_user_removes_rollups(client):
+    assert client.delete('/delete_user/user1').status_code == 200
+    assert EventStat.query.count() == 0
@@ -0,0 +1,193 @@
+# test_ingest.py
+# 저널 기록 후 워커가 이벤트를 배치 단위로 저장하고, 재시작 시 체크포인트 이후 항목만 다시 처리하는지 확인
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import pytest
+import requests
+import socketio as socketio_client
+from load_test import user_id_for, wait_until_ready
+from config import TestingConfig
+from app import create_app, db
+from app.ingest import EventIngestor
+from app.models import EventLog, VideoClip, EventStat
+from app.stats import rebuild_event_stats
+
+@pytest.fixture
+def app(tmp_path):
+    # 워커 스레드와 같은 DB를 보도록 파일 SQLite 사용
+    class FileDBConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'ingest.db'}"
+
+    app = create_app(FileDBConfig)
+    app.config.update(EVENT_INGEST_ASYNC=True, EVENT_INGEST_JOURNAL_DIR=str(tmp_path / 'journal'),
+                      EVENT_INGEST_FLUSH_INTERVAL=0.05)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def make_record(i):
+    return {'user_id': 'user1', 'timestamp': f'2024-01-01T00:{i // 60:02d}:{i % 60:02d}', 'eventname': 'Fall',
+            'camera_number': 1, 'event_url': f'https://bucket/saved_clips/Fall_{i}.mp4'}
+
+def wait_for(ingestor, events, timeout=5):
+    deadline = time.time() + timeout
+    while ingestor.stats()['events'] < events and time.time() < deadline:
+        time.sleep(0.02)
+    return ingestor.stats()
+
+def wait_for_checkpoint(journal_dir, seq, timeout=5):
+    # 체크포인트는 배치 저장(통계 기록) 직후에 쓰고, 첫 배치 전에는 파일이 없음
+    checkpoint = journal_dir / 'events.checkpoint'
+    deadline = time.time() + timeout
+    while not checkpoint.exists() or checkpoint.read_text() != seq:
+        assert time.time() < deadline
+        time.sleep(0.02)
+
+def test_events_are_bulk_inserted(app):
+    ingestor = EventIngestor(app)
+    for i in range(200):
+        ingestor.submit(make_record(i))
+
+    stats = wait_for(ingestor, 200)
+    assert stats['events'] == 200
+    assert stats['batches'] < 200
+    assert stats['max_batch_size'] > 1
+    assert EventLog.query.count() == 200
+    assert VideoClip.query.count() == 200
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def test_async_pushes_reach_subscribed_client(tmp_path):
+    # 실제 eventlet 서버(비동기 수집)에 구독한 클라이언트가 수집 워커 스레드가 보낸 푸시를 받는지 확인
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen([sys.executable, 'load_test.py', '--serve', '--port', str(port), '--stub-port', str(free_port()),
+                               '--database-url', f"sqlite:///{tmp_path / 'push.db'}", '--workdir', str(tmp_path),
+                               '--users', '1', '--cameras', '1', '--events', '0'],
+                              cwd=os.path.dirname(os.path.abspath(__file__)),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    client = socketio_client.Client()
+    received = []
+    client.on('push_message', received.append)
+    try:
+        wait_until_ready(f"{base_url}/ingest/stats", timeout=30)
+        client.connect(f"{base_url}?user_id={user_id_for(0)}")
+        for i in range(3):
+            response = requests.post(f"{base_url}/log_event", json={
+                'user_id': user_id_for(0), 'timestamp': f'20240101_00000{i}', 'eventname': 'Fall', 'camera_number': 1})
+            assert response.status_code == 200
+
+        deadline = time.time() + 10
+        while len(received) < 3 and time.time() < deadline:
+            time.sleep(0.05)
+        assert sorted(event['timestamp'] for event in received) == [f'2024-01-01T00:00:0{i}' for i in range(3)]
+    finally:
+        if client.connected:
+            client.disconnect()
+        server.terminate()
+        server.wait()
+
+def test_replay_skips_checkpointed_events(app, tmp_path):
+    journal_dir = tmp_path / 'journal'
+    journal_dir.mkdir()
+    with open(journal_dir / 'events.journal', 'w') as f:
+        for i in range(1, 6):
+            f.write(json.dumps(dict(make_record(i), seq=i, received_at=time.time())) + '\n')
+        f.write('{"seq": 6, "user_id"')  # 기록 도중 종료된 줄
+    (journal_dir / 'events.checkpoint').write_text('3')
+
+    ingestor = EventIngestor(app)
+    assert wait_for(ingestor, 2)['events'] == 2
+    assert sorted(event.timestamp.second for event in EventLog.query) == [4, 5]
+
+    ingestor.submit(make_record(10))
+    wait_for(ingestor, 3)
+    wait_for_checkpoint(journal_dir, '6')
+
+def test_bad_record_is_dead_lettered(app, tmp_path):
+    # 저장할 수 없는 레코드가 섞여도 나머지는 저장되고, 실패한 레코드는 dead letter로 옮겨져 재시작 시 다시 처리하지 않음
+    journal_dir = tmp_path / 'journal'
+    ingestor = EventIngestor(app)
+    ingestor.submit(make_record(1))
+    ingestor.submit(dict(make_record(2), eventname=None))
+    ingestor.submit(make_record(3))
+
+    deadline = time.time() + 5
+    while ingestor.stats()['dead_lettered'] < 1 or ingestor.stats()['events'] < 2:
+        assert time.time() < deadline
+        time.sleep(0.02)
+    wait_for(ingestor, 2)
+    wait_for_checkpoint(journal_dir, '3')
+
+    assert sorted(event.timestamp.second for event in EventLog.query) == [1, 3]
+    dead_letters = [json.loads(line) for line in (journal_dir / 'events.deadletter').read_text().splitlines()]
+    assert [entry['record']['seq'] for entry in dead_letters] == [2]
+    assert 'IntegrityError' in dead_letters[0]['error']
+
+    restarted = EventIngestor(app)
+    assert restarted.stats()['queued'] == 0
+
+def test_log_event_requires_eventname_and_camera_number(app):
+    client = app.test_client()
+    record = {'user_id': 'user1', 'timestamp': '20240101_000000', 'eventname': 'Fall', 'camera_number': 1}
+    for missing in ('eventname', 'camera_number'):
+        response = client.post('/log_event', json={key: value for key, value in record.items() if key != missing})
+        assert response.status_code == 400
+    assert client.post('/log_event', json=dict(record, camera_number='front')).status_code == 400
+    assert EventLog.query.count() == 0
+
+def test_repeated_events_are_coalesced(app, monkeypatch):
+    pushed = []
+    monkeypatch.setattr('app.ingest.emit_to_user', lambda user_id, payload, camera_number=None: pushed.append(payload))
+    app.config.update(EVENT_INGEST_ASYNC=False, EVENT_COALESCE_WINDOW=30, EVENT_COALESCE_MAX_SPAN=120)
+    ingestor = EventIngestor(app)
+
+    # 10초 간격으로 반복된 같은 이벤트는 하나로 합치고, 다른 카메라와 30초 넘게 떨어진 이벤트는 따로 기록
+    for second in (0, 10, 20):
+        ingestor.submit(make_record(second))
+    batch = [make_record(25), dict(make_record(26), camera_number=2), make_record(100)]
+    ingestor.write_batch([dict(record, received_at=time.time()) for record in batch])
+    ingestor.submit(make_record(105))
+
+    events = EventLog.query.order_by(EventLog.camera_number, EventLog.timestamp).all()
+    assert [(event.camera_number, event.timestamp.second + event.timestamp.minute * 60, event.count) for event in events] == [
+        (1, 0, 4), (1, 100, 2), (2, 26, 1)]
+    assert events[0].last_timestamp.second == 25
+    assert VideoClip.query.count() == 7  # 영상은 모두 보관
+    assert len(pushed) == 3
+    assert ingestor.stats()['coalesced'] == 4
+
+    # 합친 기간이 최대 길이를 넘으면 새 이벤트로 기록하고 다시 알림
+    for second in range(125, 240, 25):
+        ingestor.submit(make_record(second))
+    assert [event.count for event in EventLog.query.filter_by(camera_number=1).order_by(EventLog.timestamp)] == [4, 6, 1]
+    assert len(pushed) == 4
+
+def test_coalesced_events_count_once_in_stats(app, monkeypatch):
+    bumps = []
+    monkeypatch.setattr('app.ingest.list_versions.bump', lambda user_id, changes=(): bumps.append((user_id, changes)))
+    app.config.update(EVENT_INGEST_ASYNC=False, EVENT_COALESCE_WINDOW=30, EVENT_COALESCE_MAX_SPAN=120)
+    ingestor = EventIngestor(app)
+    ingestor.write_batch([dict(make_record(second), received_at=time.time()) for second in (0, 10, 20, 100)])
+
+    # 통계는 목록과 같이 합쳐진 이벤트를 1건으로 세고, 재계산해도 같은 값
+    stats = lambda: sorted((stat.granularity, stat.period_start, stat.count) for stat in EventStat.query)
+    day_total = sum(count for granularity, _, count in stats() if granularity == 'day')
+    assert day_total == EventLog.query.count() == 2
+    assert sum(event.count for event in EventLog.query) == 4
+    before = stats()
+    rebuild_event_stats()
+    assert stats() == before
+
+    # 클립은 알림마다 저장하지만 목록 버전은 배치당 한 번만 올림
+    assert VideoClip.query.count() == 4
+    assert len(bumps) == 1 and len(bumps[0][1]) == 8
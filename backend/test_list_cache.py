@@ -0,0 +1,42 @@
+# test_list_cache.py
+# 이벤트/클립 목록의 ETag/304 응답, 버전 기반 캐시 무효화, since_version 변경 조회 확인
+import app.routes as routes
+
+def log_event(client, timestamp, user_id='user1'):
+    response = client.post('/log_event', json={'user_id': user_id, 'timestamp': timestamp, 'eventname': 'Fall',
+                                               'camera_number': 1})
+    assert response.status_code == 200
+
+def test_unchanged_list_returns_304_without_query(client, monkeypatch):
+    log_event(client, '20240101_000000')
+    first = client.get('/get_user_video_clips/user1')
+    assert first.status_code == 200 and len(first.get_json()) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError('DB query on cached list')
+    monkeypatch.setattr(routes, 'list_response', fail)
+
+    assert client.get('/get_user_video_clips/user1', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+    assert client.get('/get_user_video_clips/user1').get_json() == first.get_json()
+
+def test_changes_invalidate_and_since_version(client):
+    log_event(client, '20240101_000000')
+    first = client.get('/get_user_events/user1')
+    version = first.headers['X-List-Version']
+
+    log_event(client, '20240101_000100')
+    log_event(client, '20240101_000200', user_id='user2')
+    second = client.get('/get_user_events/user1', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200 and len(second.get_json()) == 2
+
+    delta = client.get(f'/get_user_events/user1?since_version={version}').get_json()
+    assert delta['reset'] is False
+    assert [(change['op'], change['item']['timestamp']) for change in delta['changes']] == [('add', '2024-01-01T00:01:00')]
+
+    client.post('/delete_log', json={'user_id': 'user1', 'timestamp': '2024-01-01T00:01:00'})
+    clips = client.get(f'/get_user_video_clips/user1?since_version={delta["version"]}').get_json()
+    assert [change['op'] for change in clips['changes']] == ['delete']
+
+    client.post('/delete_user_events', json={'user_id': 'user1'})
+    assert client.get(f'/get_user_video_clips/user1?since_version={clips["version"]}').get_json()['reset'] is True
+    assert client.get('/get_user_events/user1?since_version=bogus').get_json()['reset'] is True
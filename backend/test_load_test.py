@@ -0,0 +1,36 @@
+# test_load_test.py
+# 부하 테스트의 시드 데이터와 결과 요약이 올바른지 확인
+import pytest
+from app.models import User, CameraInfo, DetectionStatus, EventLog, VideoClip
+from load_test import seed, summarize, parse_mix, user_id_for, PASSWORD, DEFAULT_MIX
+
+def test_seed_creates_users_cameras_and_events(app):
+    seed(app, users=3, cameras=2, events=5)
+    with app.app_context():
+        assert User.query.count() == 3
+        assert CameraInfo.query.count() == 6
+        assert DetectionStatus.query.count() == 6
+        assert EventLog.query.count() == 15
+        assert VideoClip.query.filter(VideoClip.poster_url.isnot(None)).count() == 15
+
+    client = app.test_client()
+    response = client.post('/login', json={'id': user_id_for(0), 'password': PASSWORD})
+    assert response.status_code == 200
+    assert len(response.get_json()['cameras']) == 2
+
+def test_summarize_reports_percentiles_per_route():
+    samples = [('GET /a', float(ms), True) for ms in range(1, 101)] + [('POST /b', 5.0, False)]
+    summary = summarize(samples, elapsed=10)
+
+    assert summary['GET /a']['requests'] == 100
+    assert summary['GET /a']['rps'] == 10
+    assert summary['GET /a']['p50_ms'] == 51
+    assert summary['GET /a']['p99_ms'] == 100
+    assert summary['POST /b']['errors'] == 1
+
+def test_parse_mix():
+    assert parse_mix(None) == DEFAULT_MIX
+    mix = parse_mix('login=1,clips=3')
+    assert mix['login'] == 1 and mix['clips'] == 3 and mix['settings'] == 0
+    with pytest.raises(ValueError):
+        parse_mix('unknown=1')
@@ -1,17 +1,64 @@
+# test_model.py
+# 백엔드 테스트용 로컬 모델 서버 스텁
+# STUB_LATENCY(초)만큼 응답을 지연하고, STUB_FAIL_RATE(0~1) 비율로 503을 반환해 재시도/지연 상황을 재현
 from flask import Flask, request, jsonify
 import os
+import random
+import threading
+import time
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your_secret_key'
 
+received = []  # (경로, payload) 수신 기록
+received_lock = threading.Lock()
+
+def handle(path):
+    latency = float(os.getenv('STUB_LATENCY', 0))
+    if latency:
+        time.sleep(latency)
+    if random.random() < float(os.getenv('STUB_FAIL_RATE', 0)):
+        return jsonify({"error": "Stub failure"}), 503
+
+    data = request.get_json()
+    with received_lock:
+        received.append((path, data))
+    return None
+
 @app.route('/event_update', methods=['POST'])
 def event_update():
+    error = handle('/event_update')
+    if error:
+        return error
     data = request.get_json()
-    
+
     print(data['camera_info'])
     print("")
     print("")
     return jsonify({"message": "Event received by model server"}), 200
 
+@app.route('/add_camera', methods=['POST'])
+def add_camera():
+    return handle('/add_camera') or (jsonify({"message": "Camera added to model server"}), 200)
+
+@app.route('/remove_camera', methods=['POST'])
+def remove_camera():
+    return handle('/remove_camera') or (jsonify({"message": "Camera removed from model server"}), 200)
+
+@app.route('/sync/changes', methods=['POST'])
+def sync_changes():
+    error = handle('/sync/changes')
+    if error:
+        return error
+    return jsonify({"version": request.get_json()['to_version']}), 200
+
+@app.route('/received', methods=['GET', 'DELETE'])
+def get_received():
+    with received_lock:
+        items = [{'path': path, 'payload': payload} for path, payload in received]
+        if request.method == 'DELETE':
+            received.clear()
+    return jsonify(items), 200
+
 if __name__ == '__main__':
-    app.run(host="0.0.0.0", port=8000, debug=False)
\ No newline at end of file
+    app.run(host="0.0.0.0", port=int(os.getenv('STUB_PORT', 8000)), debug=False, threaded=True)
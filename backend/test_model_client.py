@@ -0,0 +1,43 @@
+# test_model_client.py
+# 로컬 모델 서버 스텁(test_model.py)을 띄워 요청 전송과 일시적인 오류 재시도, 실패 집계 확인
+import threading
+import pytest
+from flask import Flask
+from werkzeug.serving import make_server
+import test_model
+from app.model_client import ModelServerClient
+
+@pytest.fixture(scope='module')
+def stub_server():
+    server = make_server('127.0.0.1', 0, test_model.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+@pytest.fixture
+def client(stub_server):
+    test_model.received.clear()
+    app = Flask(__name__)
+    app.config.update(DL_MODEL_IP='127.0.0.1', DL_MODEL_PORT=stub_server.server_port, MODEL_SERVER_RETRIES=2)
+    return ModelServerClient(app)
+
+def test_post_retries_unavailable_server(client, monkeypatch):
+    calls = []
+    original = test_model.handle
+
+    def fail_first(path):
+        calls.append(path)
+        if len(calls) == 1:
+            return test_model.jsonify({"error": "Stub failure"}), 503
+        return original(path)
+
+    monkeypatch.setattr(test_model, 'handle', fail_first)
+    assert client.post('/remove_camera', {'user_id': 'user1', 'camera_id': 1})
+    assert calls == ['/remove_camera', '/remove_camera']
+
+def test_unreachable_server_is_reported():
+    app = Flask(__name__)
+    app.config.update(DL_MODEL_IP='127.0.0.1', DL_MODEL_PORT=1, MODEL_SERVER_RETRIES=0)
+    client = ModelServerClient(app)
+    assert not client.post('/event_update', {})
+    assert client.stats()['failed'] == 1
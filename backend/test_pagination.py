@@ -0,0 +1,93 @@
+# test_pagination.py
+# 목록 keyset 페이지네이션: 같은 timestamp가 많아도 next_cursor로 빠짐없이/중복 없이 순회하는지,
+# 필터와 NDJSON 스트림, 잘못된 커서/기간 처리 확인
+from datetime import datetime, timedelta
+import json
+import pytest
+from app import db
+from app.models import EventLog
+from app.pagination import encode_cursor
+
+BASE = datetime(2024, 12, 25, 3, 45)
+
+@pytest.fixture
+def client(client):
+    rows = []
+    # 같은 timestamp 7개 + 서로 다른 timestamp 5개, 카메라/이벤트 종류를 섞음
+    for i in range(12):
+        rows.append({'user_id': 'user1', 'timestamp': BASE if i < 7 else BASE + timedelta(minutes=i),
+                     'eventname': 'Fall' if i % 3 else 'Fire', 'camera_number': i % 2 + 1})
+    rows.append({'user_id': 'user2', 'timestamp': BASE, 'eventname': 'Fall', 'camera_number': 1})
+    db.session.bulk_insert_mappings(EventLog, rows)
+    db.session.commit()
+    return client
+
+def expected_order(user_id='user1', **filters):
+    query = EventLog.query.filter_by(user_id=user_id, **filters)
+    return [(event.timestamp.isoformat(), event.camera_number, event.eventname)
+            for event in query.order_by(EventLog.timestamp.desc(), EventLog.id.desc())]
+
+def keys(items):
+    return [(item['timestamp'], item['camera_number'], item['eventname']) for item in items]
+
+def fetch_all_pages(client, url):
+    items, pages, cursor = [], 0, None
+    while True:
+        response = client.get(url + (f'&cursor={cursor}' if cursor else ''))
+        assert response.status_code == 200
+        body = response.get_json()
+        items.extend(body['items'])
+        pages += 1
+        cursor = body['next_cursor']
+        if cursor is None:
+            return items, pages
+
+def test_cursor_traversal_with_tied_timestamps(client):
+    items, pages = fetch_all_pages(client, '/get_user_events/user1?limit=3')
+
+    # 12개를 3개씩 4페이지, 같은 timestamp 사이에서는 id 순서로 이어짐
+    assert pages == 4
+    assert len(items) == 12
+    assert keys(items) == expected_order()
+    assert all(item['user_id'] == 'user1' for item in items)
+
+def test_page_boundary_inside_tied_timestamps(client):
+    # 같은 timestamp 행 중간에서 끝나는 커서도 남은 행부터 이어서 반환
+    with client.application.app_context():
+        tied = EventLog.query.filter_by(user_id='user1', timestamp=BASE).order_by(EventLog.id.desc()).all()
+        cursor = encode_cursor(BASE, tied[2].id)
+
+    body = client.get(f'/get_user_events/user1?limit=10&cursor={cursor}').get_json()
+    assert len(body['items']) == len(tied) - 3 and body['next_cursor'] is None
+    assert all(item['timestamp'] == BASE.isoformat() for item in body['items'])
+
+def test_filters(client):
+    items, _ = fetch_all_pages(client, '/get_user_events/user1?limit=2&eventname=Fall&camera_number=1')
+    assert keys(items) == expected_order(eventname='Fall', camera_number=1)
+    assert items and all(item['eventname'] == 'Fall' and item['camera_number'] == 1 for item in items)
+
+    since = (BASE + timedelta(minutes=8)).isoformat()
+    until = (BASE + timedelta(minutes=11)).isoformat()
+    body = client.get(f'/get_user_events/user1?limit=50&since={since}&until={until}').get_json()
+    # since 이상 until 미만
+    assert [item['timestamp'] for item in body['items']] == [(BASE + timedelta(minutes=m)).isoformat() for m in (10, 9, 8)]
+
+def test_ndjson_stream(client):
+    response = client.get('/get_user_events/user1?format=ndjson&camera_number=2')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert keys(lines) == expected_order(camera_number=2)
+
+def test_invalid_cursor_and_dates_return_400(client):
+    for query in ('cursor=not-a-cursor', 'cursor=' + 'MjAyNC0xMi0yNQ==', 'since=yesterday', 'until=2024-13-01'):
+        response = client.get(f'/get_user_events/user1?{query}')
+        assert response.status_code == 400, query
+        assert 'error' in response.get_json()
+    assert client.get('/logs?cursor=%%%').status_code == 400
+
+def test_logs_always_paginated(client):
+    items, pages = fetch_all_pages(client, '/logs?limit=5')
+    assert pages == 3 and len(items) == 13
+    # 사용자 목록은 limit/cursor/format이 없으면 기존처럼 전체 목록
+    assert len(client.get('/get_user_events/user1').get_json()) == 12
@@ -0,0 +1,48 @@
+# test_partitions.py
+# 월별 파티션 DDL 생성과, 파티션이 없는 DB(SQLite)에서 만료된 월을 같은 범위로 삭제하는지 확인
+from datetime import datetime, timedelta
+from app import db
+from app.models import EventLog, VideoClip, S3DeleteKey
+from app.partitions import add_months, partition_definitions, reorganize_sql, drop_expired_partitions, month_start
+from app.retention import run_retention
+
+def add_rows(timestamps):
+    for i, timestamp in enumerate(timestamps):
+        row = {'user_id': 'user1', 'timestamp': timestamp, 'eventname': 'Fall', 'camera_number': 1}
+        db.session.bulk_insert_mappings(EventLog, [row])
+        db.session.bulk_insert_mappings(VideoClip, [dict(row, event_url=f'https://bucket/saved_clips/Fall_{i}.mp4')])
+    db.session.commit()
+
+def test_partition_ddl():
+    assert add_months(datetime(2024, 11, 1), 3) == datetime(2025, 2, 1)
+    assert partition_definitions([datetime(2024, 12, 1)]) == [
+        "PARTITION p202412 VALUES LESS THAN ('2025-01-01 00:00:00')"]
+    assert reorganize_sql('event_logs', [datetime(2024, 12, 1), datetime(2025, 1, 1)]) == (
+        "ALTER TABLE event_logs REORGANIZE PARTITION p_max INTO ("
+        "PARTITION p202412 VALUES LESS THAN ('2025-01-01 00:00:00'), "
+        "PARTITION p202501 VALUES LESS THAN ('2025-02-01 00:00:00'), "
+        "PARTITION p_max VALUES LESS THAN (MAXVALUE))")
+
+def test_drop_expired_months_only(app):
+    add_rows([datetime(2024, 1, 15), datetime(2024, 2, 28, 23, 59), datetime(2024, 3, 1), datetime(2024, 3, 20)])
+
+    assert drop_expired_partitions('event_logs', datetime(2024, 3, 10)) == 2
+    assert drop_expired_partitions('video_clips', datetime(2024, 3, 10)) == 2
+
+    # cutoff가 속한 3월의 행은 배치 삭제 대상이므로 남아 있음
+    assert [row.timestamp for row in EventLog.query.order_by(EventLog.timestamp)] == [datetime(2024, 3, 1), datetime(2024, 3, 20)]
+    assert VideoClip.query.count() == 2
+    # 행 삭제와 함께 커밋된 S3 삭제 작업
+    enqueued = [key for (key,) in db.session.query(S3DeleteKey.key)]
+    assert 'saved_clips/Fall_0.mp4' in enqueued and 'saved_clips/Fall_1_thumbs.jpg' in enqueued
+    assert 'saved_clips/Fall_2.mp4' not in enqueued
+
+def test_retention_drops_old_months_then_purges_rest(app):
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=app.config['RETENTION_DAYS']['event_logs'])
+    add_rows([now - timedelta(days=100), month_start(cutoff) - timedelta(seconds=1), cutoff - timedelta(hours=1), now])
+
+    run_retention(app)
+
+    assert [row.timestamp for row in EventLog.query] == [now]
+    assert [row.timestamp for row in VideoClip.query] == [now]
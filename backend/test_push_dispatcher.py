@@ -0,0 +1,62 @@
+# test_push_dispatcher.py
+# 모바일 푸시: 기기 토큰 등록, 멀티캐스트 묶음 전송, 만료 토큰 삭제, 요청 경로에서 큐에만 넣는지 확인
+import pytest
+from app import db
+from app.models import DeviceToken
+from app.push import PushDispatcher, MAX_TOKENS_PER_MULTICAST, push_dispatcher
+
+@pytest.fixture
+def app(app):
+    app.config.update(PUSH_TRANSPORT='recording', PUSH_MAX_QUEUE=2)
+    return app
+
+def register(client, user_id, token):
+    assert client.post('/device_tokens', json={'user_id': user_id, 'token': token, 'platform': 'android'}).status_code == 200
+
+def notification(user_id, title='낙상 감지', data=None):
+    return {'user_id': user_id, 'title': title, 'body': '1번 카메라', 'data': data or {'eventname': 'Fall'},
+            'enqueued_at': 0}
+
+def test_multicast_batches_and_invalid_token_cleanup(app):
+    client = app.test_client()
+    register(client, 'user1', 'token-a')
+    register(client, 'user1', 'token-b')
+    register(client, 'user2', 'token-a')  # 같은 기기로 다른 사용자가 로그인하면 토큰 소유자 변경
+    db.session.bulk_insert_mappings(DeviceToken, [{'user_id': 'user3', 'token': f'bulk-{i}'}
+                                                  for i in range(MAX_TOKENS_PER_MULTICAST + 10)])
+    db.session.commit()
+
+    dispatcher = PushDispatcher(app)
+    dispatcher.transport.invalid_tokens = {'token-b', 'bulk-3'}
+    dispatcher.send_batch([notification('user1'), notification('user2'), notification('user3'),
+                           notification('user1', title='화재 감지'), notification('nobody')])
+
+    sent = dispatcher.transport.sent
+    # 같은 내용의 알림은 사용자 토큰을 합쳐 500개씩 전송
+    assert [len(multicast['tokens']) for multicast in sent] == [MAX_TOKENS_PER_MULTICAST, 12, 1]
+    assert set(sent[0]['tokens'] + sent[1]['tokens']) == {'token-a', 'token-b'} | {
+        f'bulk-{i}' for i in range(MAX_TOKENS_PER_MULTICAST + 10)}
+    assert sent[2] == {'tokens': ['token-b'], 'title': '화재 감지', 'body': '1번 카메라', 'data': {'eventname': 'Fall'}}
+
+    assert DeviceToken.query.filter(DeviceToken.token.in_(['token-b', 'bulk-3'])).count() == 0
+    stats = dispatcher.stats()
+    assert stats['multicasts'] == 3 and stats['invalid_tokens_removed'] == 2 and stats['no_devices'] == 1
+    assert stats['sent'] == MAX_TOKENS_PER_MULTICAST + 12 + 1 - 3
+
+def test_enqueue_never_blocks(app):
+    dispatcher = PushDispatcher()
+    dispatcher.init_app(app)
+    dispatcher._ensure_worker = lambda: None  # 워커 없이 큐 상태만 확인
+    assert dispatcher.enqueue('user1', '낙상 감지', '1번 카메라')
+    assert dispatcher.enqueue('user1', '낙상 감지', '1번 카메라')
+    assert not dispatcher.enqueue('user1', '낙상 감지', '1번 카메라')  # 큐가 가득 차면 버림
+    assert dispatcher.stats()['dropped'] == 1 and dispatcher.stats()['queued'] == 2
+
+def test_log_event_enqueues_push(app, monkeypatch):
+    queued = []
+    monkeypatch.setattr(push_dispatcher, 'enqueue', lambda user_id, title, body, data: queued.append((user_id, title, data)))
+    response = app.test_client().post('/log_event', json={'user_id': 'user1', 'timestamp': '20240101_000000',
+                                                          'eventname': 'Fire', 'camera_number': 2})
+    assert response.status_code == 200
+    assert queued == [('user1', '화재 감지', {'user_id': 'user1', 'timestamp': '2024-01-01T00:00:00', 'eventname': 'Fire',
+                                             'camera_number': '2', 'event_url': queued[0][2]['event_url']})]
@@ -0,0 +1,132 @@
+# test_query_plans.py
+# 대량 데이터를 넣은 뒤 주요 조회/삭제 쿼리가 인덱스를 사용하고 지연 시간 기준을 만족하는지 확인
+import time
+from datetime import datetime, timedelta
+import pytest
+from werkzeug.datastructures import MultiDict
+from app import create_app, db
+from app.models import User, EventLog, CameraInfo, DetectionStatus, VideoClip
+from app.routes import user_lookup_query, load_camera_configs
+from app.pagination import parse_list_args, apply_filters, keyset_query, encode_cursor
+
+NUM_USERS = 200
+CAMERAS_PER_USER = 5
+EVENTS_PER_USER = 500
+LATENCY_BUDGET_MS = 10
+BASE_TIME = datetime(2024, 1, 1)
+
+@pytest.fixture(scope='module')
+def app():
+    app = create_app('config.TestingConfig')
+    with app.app_context():
+        db.create_all()
+        seed()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def seed():
+    users, cameras, statuses, events, clips = [], [], [], [], []
+    for u in range(NUM_USERS):
+        user_id = f'user{u:04d}'
+        users.append({'id': user_id, 'name': f'name{u:04d}', 'email': f'{user_id}@example.com', 'phone': f'010{u:08d}',
+                      'address': 'addr', 'detailed_address': 'detail', 'password_hash': 'x'})
+        for c in range(CAMERAS_PER_USER):
+            camera_number = u * CAMERAS_PER_USER + c
+            cameras.append({'user_id': user_id, 'camera_number': camera_number, 'rtsp_url': f'rtsp://cam/{camera_number}'})
+            statuses.append({'user_id': user_id, 'camera_number': camera_number})
+        for e in range(EVENTS_PER_USER):
+            timestamp = BASE_TIME + timedelta(minutes=e * 7 + u)
+            row = {'user_id': user_id, 'timestamp': timestamp, 'eventname': ['Fall', 'Fire', 'Movement', 'Smoke'][e % 4],
+                   'camera_number': u * CAMERAS_PER_USER + e % CAMERAS_PER_USER}
+            events.append(row)
+            clips.append(dict(row, event_url=f'https://bucket/saved_clips/{user_id}_{e}.mp4'))
+
+    db.session.bulk_insert_mappings(User, users)
+    db.session.bulk_insert_mappings(CameraInfo, cameras)
+    db.session.bulk_insert_mappings(DetectionStatus, statuses)
+    db.session.bulk_insert_mappings(EventLog, events)
+    db.session.bulk_insert_mappings(VideoClip, clips)
+    db.session.commit()
+    db.session.execute('ANALYZE')
+
+def explain(query):
+    """쿼리의 실행 계획을 문자열 목록으로 반환 (SQLite / MySQL)"""
+    statement = query.statement if hasattr(query, 'statement') else query
+    compiled = statement.compile(dialect=db.engine.dialect)
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if db.engine.dialect.name == 'sqlite':
+            params = [compiled.params[name] for name in compiled.positiontup]
+            cursor.execute('EXPLAIN QUERY PLAN ' + str(compiled), params)
+            return [row[-1] for row in cursor.fetchall()]
+        cursor.execute('EXPLAIN ' + str(compiled), compiled.params)
+        columns = [column[0] for column in cursor.description]
+        return [f"table={row[columns.index('table')]} key={row[columns.index('key')]}" for row in cursor.fetchall()]
+    finally:
+        connection.close()
+
+def assert_uses_index(query, index_name):
+    plan = explain(query)
+    assert any(index_name in line for line in plan), plan
+    assert not any(line.startswith('SCAN') and 'INDEX' not in line for line in plan), plan
+
+def assert_within_budget(run, budget_ms=LATENCY_BUDGET_MS, repeat=30):
+    run()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    assert p95 < budget_ms, f"p95 {p95:.2f}ms > {budget_ms}ms"
+
+def user_page(model, user_id, args):
+    """목록 API(list_response)와 같은 경로로 페이지 쿼리 생성"""
+    list_args = parse_list_args(MultiDict(args))
+    query = apply_filters(model.query.filter_by(user_id=user_id), model, list_args['filters'])
+    return keyset_query(query, model, list_args['limit'], list_args['cursor'])
+
+def test_user_events_page_uses_index(app):
+    cursor = encode_cursor(BASE_TIME + timedelta(days=1), 10 ** 9)
+    for args in ({'limit': 50}, {'limit': 50, 'cursor': cursor}, {'limit': 50, 'cursor': cursor, 'since': BASE_TIME.isoformat()}):
+        query = user_page(EventLog, 'user0100', args)
+        assert_uses_index(query, 'ix_event_logs_user_id_timestamp')
+        assert not any('TEMP B-TREE' in line for line in explain(query))  # 정렬도 인덱스 순서로 처리
+        assert_within_budget(query.all)
+
+def test_user_video_clips_page_uses_index(app):
+    query = user_page(VideoClip, 'user0100', {'limit': 50})
+    assert_uses_index(query, 'ix_video_clips_user_id_timestamp')
+    assert_within_budget(query.all)
+
+def test_delete_log_lookup_uses_index(app):
+    query = VideoClip.query.filter_by(user_id='user0100', timestamp=BASE_TIME + timedelta(minutes=100 + 7 * 3))
+    assert_uses_index(query, 'ix_video_clips_user_id_timestamp')
+    assert query.first() is not None
+    assert_within_budget(query.first)
+
+def test_retention_range_uses_index(app):
+    cutoff = BASE_TIME + timedelta(hours=1)
+    for model, index_name in [(EventLog, 'ix_event_logs_timestamp'), (VideoClip, 'ix_video_clips_timestamp')]:
+        query = db.session.query(model.id).filter(model.timestamp < cutoff)
+        assert_uses_index(query, index_name)
+        assert_within_budget(query.all)
+
+def test_camera_lookup_uses_index(app):
+    query = CameraInfo.query.filter_by(user_id='user0100', camera_number=501)
+    assert_uses_index(query, 'ix_cameras_user_id_camera_number')
+    assert_uses_index(CameraInfo.query.filter_by(camera_number=501), 'ix_cameras_camera_number')
+    assert_within_budget(query.first)
+
+def test_login_camera_configs_single_query(app):
+    assert len(load_camera_configs('user0100')) == CAMERAS_PER_USER
+    assert_within_budget(lambda: load_camera_configs('user0100'))
+
+def test_find_user_lookup_uses_index(app):
+    query = user_lookup_query('name0100', 'user0100@example.com')
+    assert_uses_index(query, 'ix_users_name')
+    assert [user.id for user in query] == ['user0100']
+    assert_within_budget(query.all)
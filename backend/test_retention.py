@@ -0,0 +1,68 @@
+# test_retention.py
+# 보관 기간 배치 삭제: 기본 키 범위 단위로 삭제하고, 중단된 뒤에는 저장된 위치부터 이어서 삭제하는지 확인
+from datetime import datetime, timedelta
+import threading
+import time
+import pytest
+from app import db
+from app.models import EventLog, RetentionProgress
+from app.retention import purge_table
+import app.retention as retention
+
+RETENTION_DAYS = 7
+BATCH_SIZE = 10
+
+class Interrupted(Exception):
+    pass
+
+def add_events(timestamps):
+    db.session.bulk_insert_mappings(EventLog, [{'user_id': 'user1', 'timestamp': timestamp, 'eventname': 'Fall',
+                                                'camera_number': 1} for timestamp in timestamps])
+    db.session.commit()
+
+def test_purge_resumes_from_saved_id(app, monkeypatch):
+    now = datetime.utcnow()
+    old = now - timedelta(days=RETENTION_DAYS + 1)
+    # id 31~35는 보관 기간 안의 행 (오래된 행 사이에 섞여 있음)
+    add_events([old] * 30 + [now] * 5 + [old] * 5)
+
+    # 배치 사이 대기에서 두 번째 배치 후 중단 (time.sleep은 전역이므로 다른 테스트의 백그라운드 워커 호출은 그대로 둠)
+    batches = []
+    original_sleep = time.sleep
+    def sleep(seconds):
+        if threading.current_thread() is not threading.main_thread():
+            return original_sleep(seconds)
+        batches.append(seconds)
+        if len(batches) == 2:
+            raise Interrupted()
+    monkeypatch.setattr(retention.time, 'sleep', sleep)
+    with pytest.raises(Interrupted):
+        purge_table('event_logs', RETENTION_DAYS, batch_size=BATCH_SIZE, pause=0.01)
+
+    progress = RetentionProgress.query.get('event_logs')
+    assert progress.last_id == 2 * BATCH_SIZE and progress.max_id == 40 and progress.finished_at is None
+    assert [event.id for event in EventLog.query.order_by(EventLog.id)] == list(range(21, 41))
+
+    # 중단 후 추가된 오래된 행은 이번 실행의 기본 키 범위 밖이므로 다음 실행에서 삭제
+    add_events([old])
+    monkeypatch.setattr(retention.time, 'sleep', lambda seconds: None if threading.current_thread() is threading.main_thread()
+                        else original_sleep(seconds))
+    result = purge_table('event_logs', RETENTION_DAYS, batch_size=BATCH_SIZE, pause=0.01)
+
+    assert result['deleted_rows'] == 35
+    assert [event.id for event in EventLog.query.order_by(EventLog.id)] == [31, 32, 33, 34, 35, 41]
+    assert RetentionProgress.query.get('event_logs').finished_at is not None
+
+    assert purge_table('event_logs', RETENTION_DAYS, batch_size=BATCH_SIZE, pause=0)['deleted_rows'] == 1
+    assert EventLog.query.count() == 5
+
+def test_purge_invalidates_lists_once(app, monkeypatch):
+    # 배치마다가 아니라 테이블 삭제가 끝난 뒤 한 번만 전체 목록 캐시 무효화
+    add_events([datetime.utcnow() - timedelta(days=RETENTION_DAYS + 1)] * 35)
+    bumps = []
+    monkeypatch.setattr(retention.list_versions, 'bump_all', lambda: bumps.append(True))
+    assert purge_table('event_logs', RETENTION_DAYS, batch_size=BATCH_SIZE, pause=0)['deleted_rows'] == 35
+    assert len(bumps) == 1
+
+    assert purge_table('event_logs', RETENTION_DAYS, batch_size=BATCH_SIZE, pause=0)['deleted_rows'] == 0
+    assert len(bumps) == 1
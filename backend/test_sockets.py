@@ -0,0 +1,31 @@
+# test_sockets.py
+# 푸시 메시지가 해당 사용자(카메라) 방에 연결된 클라이언트에게만 전달되는지 확인
+import pytest
+from app import create_app, socketio
+from app.sockets import emit_to_user, fit_payload, MAX_PUSH_PAYLOAD_BYTES
+
+@pytest.fixture(scope='module')
+def app():
+    return create_app('config.TestingConfig')
+
+def received(client):
+    return [message['args'][0] for message in client.get_received() if message['name'] == 'push_message']
+
+def test_emit_only_to_user_room(app):
+    alice = socketio.test_client(app, query_string='user_id=alice')
+    alice_cam = socketio.test_client(app, query_string='user_id=alice&camera_number=3')
+    bob = socketio.test_client(app, query_string='user_id=bob')
+
+    emit_to_user('alice', {'user_id': 'alice', 'eventname': 'Fall', 'camera_number': 3}, camera_number=3)
+    emit_to_user('alice', {'user_id': 'alice', 'eventname': 'Fire', 'camera_number': 4}, camera_number=4)
+
+    assert [event['eventname'] for event in received(alice)] == ['Fall', 'Fire']
+    assert [event['eventname'] for event in received(alice_cam)] == ['Fall']
+    assert received(bob) == []
+
+def test_large_payload_is_trimmed():
+    payload = {'user_id': 'alice', 'timestamp': '2024-01-01T00:00:00', 'eventname': 'Fall', 'camera_number': 1,
+               'event_url': 'x' * MAX_PUSH_PAYLOAD_BYTES}
+    trimmed = fit_payload(payload)
+    assert 'event_url' not in trimmed and trimmed['truncated'] is True
+    assert fit_payload({'user_id': 'alice'}) == {'user_id': 'alice'}
@@ -0,0 +1,61 @@
+# test_sql_metrics.py
+# 요청별 SQL 쿼리 수를 응답 헤더로 확인해 주요 엔드포인트의 N+1 회귀를 잡음
+import pytest
+from app import db
+from app.models import User, CameraInfo, DetectionStatus
+from app.cache import camera_config_cache
+
+CAMERAS = 20
+
+@pytest.fixture
+def client(client):
+    user = User(id='user1', name='name', email='user1@example.com', phone='01000000000',
+                address='addr', detailed_address='detail')
+    user.set_password('password')
+    db.session.add(user)
+    for camera_number in range(1, CAMERAS + 1):
+        db.session.add(CameraInfo(user_id='user1', camera_number=camera_number, rtsp_url=f'rtsp://cam/{camera_number}'))
+        db.session.add(DetectionStatus(user_id='user1', camera_number=camera_number))
+    db.session.commit()
+    camera_config_cache.clear()
+    return client
+
+def query_count(response):
+    return int(response.headers['X-SQL-Queries'])
+
+def test_login_query_count_does_not_grow_with_cameras(client):
+    response = client.post('/login', json={'id': 'user1', 'password': 'password'})
+    assert response.status_code == 200
+    assert len(response.get_json()['cameras']) == CAMERAS
+    assert query_count(response) <= 2  # 사용자 조회 + 카메라/감지 상태 조인 1회
+
+    # 두 번째 로그인은 카메라 설정 캐시 사용
+    assert query_count(client.post('/login', json={'id': 'user1', 'password': 'password'})) <= 1
+
+def test_list_endpoints_use_single_query(client):
+    for i in range(5):
+        client.post('/log_event', json={'user_id': 'user1', 'timestamp': f'20240101_00000{i}', 'eventname': 'Fall',
+                                        'camera_number': 1})
+    assert query_count(client.get('/get_user_events/user1?limit=3')) <= 1
+    assert query_count(client.get('/get_user_video_clips/user1')) <= 1
+
+def test_metrics_route_reports_endpoints(client):
+    client.post('/login', json={'id': 'user1', 'password': 'password'})
+    metrics = client.get('/metrics').get_json()
+    assert metrics['endpoints']['/login']['requests'] >= 1
+    assert metrics['endpoints']['/login']['max_queries'] <= 2
+    assert 'status' in metrics['pool']
+
+def test_login_cache_is_invalidated_by_camera_changes(client):
+    login = lambda: client.post('/login', json={'id': 'user1', 'password': 'password'}).get_json()['cameras']
+    assert len(login()) == CAMERAS
+
+    # 카메라 추가/감지 설정 변경 후 로그인은 캐시된 이전 값이 아니라 변경된 설정을 반환
+    client.post('/add_camera', json={'user_id': 'user1', 'camera_number': CAMERAS + 1, 'rtsp_url': 'rtsp://cam/new'})
+    cameras = login()
+    assert len(cameras) == CAMERAS + 1
+    assert not cameras[0]['fall_detection_on']
+
+    client.post('/receive_event', json={'user_id': 'user1', 'camera_number': cameras[0]['camera_number'],
+                                        'fall_detection': True})
+    assert login()[0]['fall_detection_on']
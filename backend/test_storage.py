@@ -0,0 +1,105 @@
+# test_storage.py
+# S3 일괄 삭제 작업 큐: 1000개 단위로 나눠 호출하고 일부 실패한 키를 재시도하며,
+# 삭제할 키를 DB에 기록해 호출한 트랜잭션과 함께 커밋/취소되고 중단된 작업을 이어서 처리하는지 확인
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models import S3DeleteJob, S3DeleteKey, VideoClip
+from app.storage import S3DeletionQueue, clip_key_from_url, clip_asset_keys, s3_deleter
+
+class FakeS3Client:
+    def __init__(self, fail_once=()):
+        self.calls = []
+        self.fail_once = set(fail_once)
+
+    def delete_objects(self, Bucket, Delete):
+        keys = [obj['Key'] for obj in Delete['Objects']]
+        self.calls.append(keys)
+        errors = [{'Key': key, 'Code': 'SlowDown', 'Message': 'retry'} for key in keys if key in self.fail_once]
+        self.fail_once -= {error['Key'] for error in errors}
+        return {'Errors': errors} if errors else {}
+
+@pytest.fixture
+def deleter(app):
+    deleter = S3DeletionQueue(app)
+    deleter.client = FakeS3Client()
+    return deleter
+
+def run_job(deleter, keys):
+    job_id = deleter.enqueue(keys)
+    db.session.commit()
+    deleter.process_pending()
+    return deleter.status(job_id)
+
+def test_clip_key_from_url():
+    assert clip_key_from_url('https://bucket.s3.ap-northeast-2.amazonaws.com/saved_clips/Fall_20241225_034500.mp4') \
+        == 'saved_clips/Fall_20241225_034500.mp4'
+    assert clip_asset_keys('https://bucket.s3.ap-northeast-2.amazonaws.com/saved_clips/Fall_20241225_034500.mp4') == [
+        'saved_clips/Fall_20241225_034500.mp4',
+        'saved_clips/Fall_20241225_034500_poster.jpg',
+        'saved_clips/Fall_20241225_034500_thumbs.jpg',
+    ]
+
+def test_deletes_in_batches_of_1000(deleter):
+    job = run_job(deleter, [f'saved_clips/{i}.mp4' for i in range(2500)])
+
+    assert [len(call) for call in deleter.client.calls] == [1000, 1000, 500]
+    assert job['status'] == 'done'
+    assert job['deleted'] == 2500
+    assert S3DeleteKey.query.count() == 0
+
+def test_retries_only_failed_keys(deleter, monkeypatch):
+    monkeypatch.setattr('app.storage.time.sleep', lambda seconds: None)
+    deleter.client = FakeS3Client(fail_once={'saved_clips/3.mp4'})
+    job = run_job(deleter, [f'saved_clips/{i}.mp4' for i in range(5)])
+
+    assert deleter.client.calls[1] == ['saved_clips/3.mp4']
+    assert job['status'] == 'done'
+    assert job['deleted'] == 5
+    assert job['failed'] == []
+
+def test_rolled_back_delete_leaves_no_job(deleter):
+    # 행 삭제가 취소되면 S3 삭제 작업도 함께 취소
+    job_id = deleter.enqueue(['saved_clips/1.mp4'])
+    db.session.rollback()
+
+    assert deleter.status(job_id) is None
+    assert deleter.process_pending() == 0
+    assert deleter.client.calls == []
+
+def test_resumes_stale_running_job(deleter):
+    # 처리하던 워커가 종료되어 진행 기록이 멈춘 작업은 남은 키부터 이어서 삭제
+    job_id = deleter.enqueue([f'saved_clips/{i}.mp4' for i in range(5)])
+    job = S3DeleteJob.query.get(job_id)
+    job.status = 'running'
+    job.claimed_at = datetime.utcnow()
+    job.deleted = 2
+    db.session.commit()
+    S3DeleteKey.query.filter(S3DeleteKey.key.in_(['saved_clips/0.mp4', 'saved_clips/1.mp4'])).delete(synchronize_session=False)
+    db.session.commit()
+
+    # 최근까지 진행 중이던 작업은 다른 워커가 가져가지 않음
+    assert deleter.process_pending() == 0
+
+    job.claimed_at = datetime.utcnow() - deleter.stale_after - timedelta(seconds=1)
+    db.session.commit()
+    assert deleter.process_pending() == 1
+    assert deleter.client.calls == [['saved_clips/2.mp4', 'saved_clips/3.mp4', 'saved_clips/4.mp4']]
+    assert deleter.status(job_id)['status'] == 'done' and deleter.status(job_id)['deleted'] == 5
+
+def test_delete_job_status_route(app, monkeypatch):
+    monkeypatch.setattr(s3_deleter, 'client', FakeS3Client())
+    client = app.test_client()
+    db.session.add(VideoClip(user_id='user1', timestamp=datetime(2024, 12, 25, 3, 45), eventname='Fall', camera_number=1,
+                             event_url='https://bucket/saved_clips/Fall_20241225_034500.mp4'))
+    db.session.commit()
+
+    response = client.post('/delete_user_events', json={'user_id': 'user1'})
+    job_id = response.get_json()['job_id']
+    # 작업 상태는 DB에 있으므로 처리 전후 어느 워커에서나 조회 가능
+    assert client.get(f'/delete_jobs/{job_id}').get_json()['status'] == 'queued'
+
+    s3_deleter.process_pending()
+    job = client.get(f'/delete_jobs/{job_id}').get_json()
+    assert job['status'] == 'done' and job['total'] == 3 and job['deleted'] == 3
+    assert client.get('/delete_jobs/unknown').status_code == 404
@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+import zipfile
+import numpy as np
+import tensorflow as tf
+
+# 샤드 디렉터리 구성 정보 파일
+manifest_name = 'manifest.json'
+splits = ['train', 'valid']
+
+
+def _read_npy_header(f):
+    """npz 내부 .npy 파일 헤더를 읽어 (shape, fortran_order, dtype) 반환"""
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        return np.lib.format.read_array_header_1_0(f)
+    return np.lib.format.read_array_header_2_0(f)
+
+
+def _iter_npz_rows(archive, name, chunk_rows):
+    """npz 배열 전체를 메모리에 올리지 않고 chunk_rows 행씩 읽기"""
+    with archive.open(f'{name}.npy') as f:
+        shape, fortran_order, dtype = _read_npy_header(f)
+        if fortran_order:
+            raise ValueError(f"{name}: Fortran 순서 배열은 행 단위로 나눌 수 없습니다.")
+        row_shape = shape[1:]
+        row_bytes = int(np.prod(row_shape, dtype=np.int64)) * dtype.itemsize
+        remaining = shape[0]
+        while remaining > 0:
+            rows = min(chunk_rows, remaining)
+            buffer = f.read(rows * row_bytes)
+            yield np.frombuffer(buffer, dtype=dtype).reshape((rows,) + row_shape)
+            remaining -= rows
+
+
+def write_shards(output_dir, split, data_chunks, label_chunks, manifest):
+    """(데이터, 라벨) 청크를 split_data_00000.npy 형식의 샤드로 저장하고 manifest에 기록"""
+    entries = manifest['splits'].setdefault(split, [])
+    for data, labels in zip(data_chunks, label_chunks):
+        index = len(entries)
+        data_file = f'{split}_data_{index:05d}.npy'
+        label_file = f'{split}_labels_{index:05d}.npy'
+        np.save(os.path.join(output_dir, data_file), np.ascontiguousarray(data, dtype=np.float32))
+        np.save(os.path.join(output_dir, label_file), np.ascontiguousarray(labels, dtype=np.int64))
+        entries.append({'data': data_file, 'labels': label_file, 'rows': int(len(labels))})
+        manifest['row_shape'] = list(data.shape[1:])
+
+
+def convert_npz(npz_path, output_dir, shard_size=10000):
+    """기존 keypoints_data_*.npz 파일을 메모리 매핑용 .npy 샤드로 변환"""
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {'source': os.path.basename(npz_path), 'splits': {}}
+
+    with zipfile.ZipFile(npz_path) as archive:
+        for split in splits:
+            write_shards(
+                output_dir, split,
+                _iter_npz_rows(archive, f'{split}_data', shard_size),
+                _iter_npz_rows(archive, f'{split}_labels', shard_size),
+                manifest,
+            )
+            rows = sum(entry['rows'] for entry in manifest['splits'][split])
+            print(f"{split}: {len(manifest['splits'][split])}개 샤드, {rows}개 샘플 저장")
+
+    with open(os.path.join(output_dir, manifest_name), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_manifest(shard_dir):
+    with open(os.path.join(shard_dir, manifest_name)) as f:
+        return json.load(f)
+
+
+def is_shard_dir(path):
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, manifest_name))
+
+
+def _read_shard_blocks(data_path, label_path, block_rows):
+    """샤드를 메모리 매핑으로 열고 block_rows 행씩 반환 (tf.data 생성기)"""
+    data = np.load(data_path.decode(), mmap_mode='r')
+    labels = np.load(label_path.decode(), mmap_mode='r')
+    for start in range(0, len(labels), block_rows):
+        yield np.asarray(data[start:start + block_rows], dtype=np.float32), np.asarray(labels[start:start + block_rows], dtype=np.int64)
+
+
+def make_dataset(shard_dir, split, batch_size=32, training=True, shuffle_buffer=10000,
+                 cycle_length=4, block_rows=1024, sequence_length=None):
+    """샤드 디렉터리에서 tf.data 입력 파이프라인 생성
+
+    각 행은 (키포인트 수 * 3) 형식(x, y, 신뢰도)이며, train.load_data와 동일하게 x, y 값만 남겨
+    (키포인트 수, 2) 형태로 변환합니다. sequence_length를 주면 (프레임, 키포인트*2) 시퀀스로 변환합니다.
+    """
+    manifest = load_manifest(shard_dir)
+    shards = manifest['splits'][split]
+    row_shape = tuple(manifest['row_shape'])
+    num_keypoints = row_shape[0] // 3
+
+    data_paths = [os.path.join(shard_dir, shard['data']) for shard in shards]
+    label_paths = [os.path.join(shard_dir, shard['labels']) for shard in shards]
+    files = tf.data.Dataset.from_tensor_slices((data_paths, label_paths))
+    if training:
+        files = files.shuffle(len(data_paths), reshuffle_each_iteration=True)
+
+    def read_shard(data_path, label_path):
+        return tf.data.Dataset.from_generator(
+            _read_shard_blocks,
+            args=(data_path, label_path, block_rows),
+            output_signature=(
+                tf.TensorSpec(shape=(None,) + row_shape, dtype=tf.float32),
+                tf.TensorSpec(shape=(None,), dtype=tf.int64),
+            ),
+        )
+
+    # 여러 샤드를 병렬로 읽어 섞음 (학습 시에는 순서 보장 불필요)
+    dataset = files.interleave(
+        read_shard,
+        cycle_length=max(1, min(cycle_length, len(data_paths))),
+        num_parallel_calls=tf.data.AUTOTUNE,
+        deterministic=not training,
+    ).unbatch()
+
+    if training:
+        dataset = dataset.shuffle(shuffle_buffer, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size)
+
+    def select_xy(data, labels):
+        data = tf.reshape(data, (-1, num_keypoints, 3))[:, :, :2]
+        if sequence_length:
+            data = tf.reshape(data, (-1, sequence_length, num_keypoints * 2 // sequence_length))
+        return data, labels
+
+    return dataset.map(select_xy, num_parallel_calls=tf.data.AUTOTUNE).prefetch(tf.data.AUTOTUNE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='keypoints_data_*.npz 파일을 .npy 샤드로 변환')
+    parser.add_argument('npz_path')
+    parser.add_argument('output_dir')
+    parser.add_argument('--shard-size', type=int, default=10000, help='샤드당 샘플 수')
+    args = parser.parse_args()
+    convert_npz(args.npz_path, args.output_dir, args.shard_size)
+
+
+if __name__ == '__main__':
+    main()
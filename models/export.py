@@ -0,0 +1,155 @@
+import datetime
+import json
+import os
+import time
+import numpy as np
+import tensorflow as tf
+
+# 서빙에 사용하는 모델 형식과 벤치마크 배치 크기
+export_formats = ['saved_model', 'tflite', 'onnx']
+benchmark_batch_sizes = [1, 8, 32]
+
+
+def _input_shape(model, sequence_length):
+    """배치 차원을 제외한 고정 입력 크기 (시간 축이 None이면 sequence_length 사용)"""
+    return tuple(sequence_length if dim is None else dim for dim in model.input_shape[1:])
+
+
+def export_saved_model(model, path):
+    if hasattr(model, 'export'):
+        model.export(path)
+    else:
+        tf.saved_model.save(model, path)
+    return path
+
+
+def export_tflite(model, path):
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    # LSTM 레이어 변환을 위해 TF 연산도 허용
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS, tf.lite.OpsSet.SELECT_TF_OPS]
+    converter._experimental_lower_tensor_list_ops = False
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+    return path
+
+
+def export_onnx(model, path, input_shape):
+    import tf2onnx
+
+    spec = (tf.TensorSpec((None,) + input_shape, tf.float32, name='input'),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, output_path=path)
+    return path
+
+
+def _saved_model_runner(path):
+    serving_fn = tf.saved_model.load(path).signatures['serving_default']
+    input_name = list(serving_fn.structured_input_signature[1].keys())[0]
+    return lambda batch: serving_fn(**{input_name: tf.constant(batch)})
+
+
+def _tflite_runner(path):
+    interpreter = tf.lite.Interpreter(model_path=path)
+    input_index = interpreter.get_input_details()[0]['index']
+    output_index = interpreter.get_output_details()[0]['index']
+
+    def run(batch):
+        if tuple(interpreter.get_input_details()[0]['shape']) != batch.shape:
+            interpreter.resize_tensor_input(input_index, batch.shape)
+            interpreter.allocate_tensors()
+        interpreter.set_tensor(input_index, batch)
+        interpreter.invoke()
+        return interpreter.get_tensor(output_index)
+
+    return run
+
+
+def _onnx_runner(path):
+    import onnxruntime
+
+    session = onnxruntime.InferenceSession(path, providers=['CPUExecutionProvider'])
+    input_name = session.get_inputs()[0].name
+    return lambda batch: session.run(None, {input_name: batch})
+
+
+def benchmark(run, input_shape, batch_sizes=benchmark_batch_sizes, warmup=5, runs=50):
+    """배치 크기별 CPU 추론 지연 시간(ms) 측정"""
+    results = {}
+    for batch_size in batch_sizes:
+        batch = np.random.rand(batch_size, *input_shape).astype(np.float32)
+        for _ in range(warmup):
+            run(batch)
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            run(batch)
+            timings.append((time.perf_counter() - start) * 1000)
+        results[str(batch_size)] = {
+            'mean_ms': float(np.mean(timings)),
+            'p50_ms': float(np.percentile(timings, 50)),
+            'p95_ms': float(np.percentile(timings, 95)),
+            'per_sample_ms': float(np.mean(timings) / batch_size),
+        }
+    return results
+
+
+def _size_bytes(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+    return os.path.getsize(path)
+
+
+def export_and_benchmark(model, artifact_path, accuracy, formats=export_formats, sequence_length=20, runs=50):
+    """학습된 모델을 서빙 형식으로 내보내고 CPU 벤치마크 후 모델 카드(JSON)를 artifact 옆에 저장"""
+    export_dir = os.path.splitext(artifact_path)[0] + '_export'
+    os.makedirs(export_dir, exist_ok=True)
+    input_shape = _input_shape(model, sequence_length)
+
+    card = {
+        'model': os.path.basename(artifact_path),
+        'created_at': datetime.datetime.now().isoformat(),
+        'tensorflow_version': tf.__version__,
+        'input_shape': list(input_shape),
+        'validation_accuracy': float(accuracy),
+        'formats': {},
+    }
+
+    with tf.device('/CPU:0'):
+        card['formats']['keras'] = {
+            'path': artifact_path,
+            'size_bytes': _size_bytes(artifact_path),
+            'latency': benchmark(lambda batch: model(batch, training=False), input_shape, runs=runs),
+        }
+
+        for export_format in formats:
+            try:
+                if export_format == 'saved_model':
+                    path = export_saved_model(model, os.path.join(export_dir, 'saved_model'))
+                    run = _saved_model_runner(path)
+                elif export_format == 'tflite':
+                    path = export_tflite(model, os.path.join(export_dir, 'model.tflite'))
+                    run = _tflite_runner(path)
+                elif export_format == 'onnx':
+                    path = export_onnx(model, os.path.join(export_dir, 'model.onnx'), input_shape)
+                    run = _onnx_runner(path)
+                else:
+                    raise ValueError(f"지원하지 않는 형식: {export_format}")
+
+                card['formats'][export_format] = {
+                    'path': path,
+                    'size_bytes': _size_bytes(path),
+                    'latency': benchmark(run, input_shape, runs=runs),
+                }
+                print(f"{export_format} 내보내기 및 벤치마크 완료: {path}")
+            except ImportError as e:
+                # tf2onnx, onnxruntime은 선택 의존성
+                print(f"{export_format} 건너뜀 (패키지 없음): {e}")
+                card['formats'][export_format] = {'error': f"missing dependency: {e.name}"}
+            except Exception as e:
+                print(f"{export_format} 내보내기 중 오류 발생: {e}")
+                card['formats'][export_format] = {'error': str(e)}
+
+    card_path = os.path.splitext(artifact_path)[0] + '.card.json'
+    with open(card_path, 'w') as f:
+        json.dump(card, f, indent=2)
+    print(f"모델 카드 저장: {card_path}")
+    return card
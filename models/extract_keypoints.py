@@ -0,0 +1,183 @@
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cv2
+import numpy as np
+from keypoints import sequence_length, keypoint_count, preprocess_version, resize_frame, append_to_sequence, classes
+from tracking import CameraTracker
+
+# 레이블 영상 디렉터리 구조: <input_dir>/<클래스 이름>/*.mp4 (라벨은 keypoints.classes의 순서)
+video_extensions = ('.mp4', '.avi', '.mov', '.mkv')
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """파일 내용의 sha256 해시"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def model_version(model_path, stride):
+    """포즈 모델 가중치와 추출 설정으로 캐시 버전 문자열 생성"""
+    settings = f"{file_hash(model_path)}:{preprocess_version}:{sequence_length}:{keypoint_count}:{stride}"
+    return hashlib.sha256(settings.encode()).hexdigest()[:16]
+
+
+def find_videos(input_dir, class_dirs):
+    """클래스 디렉터리별 영상 목록 (경로, 라벨) 반환"""
+    videos = []
+    for label, class_name in enumerate(class_dirs):
+        class_dir = os.path.join(input_dir, class_name)
+        if not os.path.isdir(class_dir):
+            print(f"클래스 디렉터리가 없습니다: {class_dir}")
+            continue
+        for root, _, files in os.walk(class_dir):
+            for name in sorted(files):
+                if name.lower().endswith(video_extensions):
+                    videos.append((os.path.join(root, name), label))
+    return videos
+
+
+def extract_video(video_path, model_path, stride):
+    """영상 하나에서 트랙별 20프레임 시퀀스 추출 (서빙과 동일한 추적기와 전처리 사용)
+
+    반환값: (시퀀스 수, sequence_length, keypoint_count * 2) 배열
+    """
+    cap = cv2.VideoCapture(video_path)
+    tracker = CameraTracker(model_path)  # 영상마다 새 추적기를 사용해 트랙 ID가 섞이지 않도록 함
+    sequences = {}
+    frames_since_window = {}
+    windows = []
+
+    while cap.isOpened():
+        success, frame = cap.read()
+        if not success:
+            break
+
+        keypoints_list, _, track_ids, sequence_updates, lost_ids = tracker.update(resize_frame(frame))
+        for track_id in lost_ids:
+            sequences.pop(track_id, None)
+            frames_since_window.pop(track_id, None)
+
+        for track_id in track_ids:
+            sequence = sequences.setdefault(track_id, [])
+            for keypoints in sequence_updates.get(track_id, []):
+                append_to_sequence(sequence, keypoints)
+                frames_since_window[track_id] = frames_since_window.get(track_id, stride) + 1
+                # 시퀀스가 가득 찼고 마지막 저장 후 stride 프레임이 지났으면 저장
+                if len(sequence) == sequence_length and frames_since_window[track_id] >= stride:
+                    windows.append(np.array(sequence, dtype=np.float32))
+                    frames_since_window[track_id] = 0
+
+    cap.release()
+    if not windows:
+        return np.empty((0, sequence_length, keypoint_count * 2), dtype=np.float32)
+    return np.stack(windows)
+
+
+def _extract_worker(video_path, video_hash, cache_path, model_path, stride):
+    """프로세스 풀 작업: 영상 추출 후 캐시에 저장"""
+    import torch
+    torch.set_num_threads(1)  # 프로세스 간 CPU 과점유 방지
+
+    sequences = extract_video(video_path, model_path, stride)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp.npy"
+    np.save(temp_path, sequences)
+    os.replace(temp_path, cache_path)
+    return video_path, video_hash, len(sequences)
+
+
+def to_training_rows(sequences):
+    """(N, 프레임, 키포인트*2) 시퀀스를 keypoints_data_*.npz 형식 (N, 프레임*키포인트*3)으로 변환
+
+    학습 코드는 세 번째 값(신뢰도)을 버리고 x, y만 사용하므로 신뢰도 자리는 1로 채웁니다.
+    """
+    xy = sequences.reshape((len(sequences), -1, 2))
+    confidence = np.ones(xy.shape[:2] + (1,), dtype=np.float32)
+    return np.concatenate([xy, confidence], axis=2).reshape((len(sequences), -1))
+
+
+def is_validation(video_hash, valid_ratio):
+    """영상 해시로 학습/검증 분할 (같은 영상의 시퀀스가 양쪽에 섞이지 않도록 영상 단위로 분할)"""
+    return int(video_hash[:8], 16) / 0xFFFFFFFF < valid_ratio
+
+
+def build_dataset(input_dir, output_path, cache_dir, model_path, class_dirs=classes,
+                  workers=None, stride=5, valid_ratio=0.2, shard_dir=None):
+    """class_dirs는 keypoints.classes 순서대로 각 클래스의 영상 디렉터리 이름"""
+    if len(class_dirs) != len(classes):
+        raise ValueError(f"클래스 디렉터리는 {classes} 순서로 {len(classes)}개를 지정해야 합니다: {class_dirs}")
+    os.makedirs(cache_dir, exist_ok=True)
+    version = model_version(model_path, stride)
+    videos = find_videos(input_dir, class_dirs)
+    print(f"영상 {len(videos)}개, 캐시 버전 {version}")
+
+    entries = []
+    pending = []
+    for video_path, label in videos:
+        video_hash = file_hash(video_path)
+        cache_path = os.path.join(cache_dir, f"{video_hash}_{version}.npy")
+        entries.append((video_path, video_hash, cache_path, label))
+        if not os.path.exists(cache_path):
+            pending.append((video_path, video_hash, cache_path))
+
+    print(f"캐시 사용 {len(videos) - len(pending)}개, 새로 추출 {len(pending)}개")
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_extract_worker, video_path, video_hash, cache_path, model_path, stride)
+                       for video_path, video_hash, cache_path in pending]
+            for done, future in enumerate(as_completed(futures), 1):
+                video_path, _, count = future.result()
+                print(f"[{done}/{len(pending)}] {video_path}: 시퀀스 {count}개")
+
+    split_rows = {'train': ([], []), 'valid': ([], [])}
+    for video_path, video_hash, cache_path, label in entries:
+        sequences = np.load(cache_path)
+        if len(sequences) == 0:
+            continue
+        split = 'valid' if is_validation(video_hash, valid_ratio) else 'train'
+        split_rows[split][0].append(to_training_rows(sequences))
+        split_rows[split][1].append(np.full(len(sequences), label, dtype=np.int64))
+
+    row_size = sequence_length * keypoint_count * 3
+    arrays = {}
+    for split, (rows, labels) in split_rows.items():
+        arrays[f'{split}_data'] = np.concatenate(rows) if rows else np.empty((0, row_size), dtype=np.float32)
+        arrays[f'{split}_labels'] = np.concatenate(labels) if labels else np.empty((0,), dtype=np.int64)
+        print(f"{split}: {len(arrays[f'{split}_labels'])}개 시퀀스")
+
+    np.savez(output_path, **arrays)
+    print(f"데이터셋 저장 완료: {output_path}")
+
+    if shard_dir:
+        from dataset import convert_npz
+        convert_npz(output_path, shard_dir)
+
+    with open(os.path.splitext(output_path)[0] + '_info.json', 'w') as f:
+        json.dump({'model_version': version, 'classes': classes, 'class_dirs': list(class_dirs), 'stride': stride,
+                   'valid_ratio': valid_ratio, 'videos': len(videos)}, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='레이블된 영상에서 LSTM 학습용 키포인트 데이터셋 추출')
+    parser.add_argument('input_dir', help='<input_dir>/<클래스 이름>/*.mp4 구조의 영상 디렉터리')
+    parser.add_argument('--output', default='keypoints_data.npz')
+    parser.add_argument('--cache-dir', default='dataset/keypoint_cache')
+    parser.add_argument('--model', default='model/yolo11n-pose.pt')
+    parser.add_argument('--classes', nargs='+', default=classes, help=f'{classes} 순서대로 나열한 클래스 디렉터리 이름')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--stride', type=int, default=5, help='같은 트랙에서 시퀀스를 저장하는 프레임 간격')
+    parser.add_argument('--valid-ratio', type=float, default=0.2)
+    parser.add_argument('--shards', default=None, help='지정하면 dataset.py 형식 샤드도 함께 생성')
+    args = parser.parse_args()
+
+    build_dataset(args.input_dir, args.output, args.cache_dir, args.model, args.classes,
+                  args.workers, args.stride, args.valid_ratio, args.shards)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+import cv2
+import numpy as np
+
+# 서빙(main.py)과 학습 데이터 추출(extract_keypoints.py)이 함께 사용하는 전처리 설정
+frame_width, frame_height = 1920, 1080
+sequence_length = 20  # 시퀀스 길이
+keypoint_count = 13   # 각 프레임당 키포인트 수 (YOLOv11 Pose 모델이 출력하는 점 수)
+feature_dim = keypoint_count * 2  # x, y 좌표만 포함
+body_keypoints_indices = [0, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16]
+
+# 전처리 방식이 바뀌면 올려서 추출 캐시를 무효화
+preprocess_version = 1
+
+# 넘어짐 분류 모델의 클래스 (라벨 = 모델 출력 인덱스). 데이터셋 추출, 학습, 서빙이 모두 이 순서를 사용
+classes = ['Fall', 'Normal']
+fall_class = classes.index('Fall')
+assert fall_class == 0, "학습된 모델은 0번 출력을 넘어짐으로 학습했으므로 순서를 바꾸면 다시 학습해야 합니다."
+
+def check_classes(dataset_classes):
+    """데이터셋이 classes와 같은 라벨 순서로 만들어졌는지 확인"""
+    if list(dataset_classes) != classes:
+        raise ValueError(f"데이터셋 클래스 순서 {list(dataset_classes)}가 모델 클래스 순서 {classes}와 다릅니다.")
+
+def resize_frame(frame):
+    """포즈 모델 입력 전 프레임 크기 조정"""
+    return cv2.resize(frame, (frame_width, frame_height), interpolation=cv2.INTER_CUBIC)
+
+def preprocess_keypoints(keypoints):
+    """키포인트 전처리"""
+    filtered_keypoints = keypoints[body_keypoints_indices, :2]
+    return filtered_keypoints
+
+def append_to_sequence(sequence, keypoints):
+    """키포인트를 전처리해 시퀀스에 추가하고, 시퀀스 길이를 넘으면 가장 오래된 키포인트 제거"""
+    selected_keypoints = preprocess_keypoints(np.array(keypoints))
+    flattened_keypoints = selected_keypoints.flatten()  # x, y 좌표만 사용
+    sequence.append(flattened_keypoints)
+    while len(sequence) > sequence_length:
+        sequence.pop(0)
+    return flattened_keypoints
@@ -14,6 +14,9 @@ import requests
 import threading
 from concurrent.futures import ThreadPoolExecutor
 import time
+from tracking import CameraTracker
+from keypoints import frame_width, frame_height, sequence_length, feature_dim, resize_frame, append_to_sequence, classes
+from train import build_streaming_step_model, initial_streaming_states
 
 # 환경 변수 로드 및 전역 상수 설정
 load_dotenv()
@@ -25,6 +28,13 @@ camera_threads = {}
 detection_status = {}
 thread_lock = threading.Lock()
 
+# 백엔드 설정 동기화 상태 (마지막으로 반영한 설정 변경 버전)
+BACKEND_URL = f"http://{os.getenv('FLASK_APP_IP', '127.0.0.1')}:{os.getenv('FLASK_APP_PORT', '5000')}"
+SYNC_POLL_INTERVAL = float(os.getenv("MODEL_SYNC_POLL_INTERVAL", "60"))
+sync_version = 0
+sync_lock = threading.Lock()
+backend_session = requests.Session()
+
 # 스레드 풀 생성
 executor = ThreadPoolExecutor()
 
@@ -32,22 +42,24 @@ executor = ThreadPoolExecutor()
 bg_subtractor = cv2.createBackgroundSubtractorMOG2()
 GREEN = (0, 255, 0)
 WHITE = (255, 255, 255)
-output_width, output_height = 1920, 1080
+output_width, output_height = frame_width, frame_height
 fourcc = cv2.VideoWriter_fourcc(*'mp4v')
 fps = 15
 buffer_length, post_event_length = 10 * fps, 30 * fps  # 10초 버퍼와 10초 후 이벤트
 
 # 모델 불러오기 (LSTM 모델과 YOLO 모델)
 lstm_model = load_model('model/model.h5')
-yolo_model = YOLO("model/yolo11n-pose.pt")
+# 넘어짐 분류 방식 (window: 20프레임 양방향 LSTM 재실행, streaming: 트랙별 상태를 이어가며 프레임당 1스텝 실행)
+fall_model_mode = os.getenv("FALL_MODEL_MODE", "window")
+if fall_model_mode == 'streaming':
+    streaming_step_model = build_streaming_step_model(load_model(os.getenv("STREAMING_MODEL_PATH", "model/streaming_lstm_model.h5")))
+pose_model_path = "model/yolo11n-pose.pt"  # 카메라 스레드마다 별도 인스턴스로 불러옴
 fire_detect_model = YOLO("model/yolo11n-fire.pt")
-classes = ['Fall', 'Normal']
 
 # 파라미터 설정
-sequence_length = 20  # 시퀀스 길이
-keypoint_count = 13   # 각 프레임당 키포인트 수 (YOLOv11 Pose 모델이 출력하는 점 수)
-feature_dim = keypoint_count * 2  # x, y 좌표만 포함
 default_class = 'Noraml'
+# 포즈 모델 실행 간격 (1이면 매 프레임, N이면 N프레임마다 실행하고 사이 프레임은 IoU 추적기로 예측)
+pose_keyframe_interval = int(os.getenv("POSE_KEYFRAME_INTERVAL", "1"))
 
 # AWS S3 설정 (S3 저장소 및 폴더명)
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
@@ -56,9 +68,11 @@ AWS_REGION_NAME = os.getenv("AWS_REGION_NAME")
 S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
 S3_FOLDER_NAME = "saved_clips"
 
-# 객체 추적 및 예측 상태 관리
-track_history = defaultdict(list)
-object_predictions = {}
+# 클립 목록에 표시할 대표 이미지와 썸네일 스트립 설정 (클립 옆에 같은 이름으로 업로드)
+POSTER_WIDTH = 480
+THUMBNAIL_WIDTH = 160
+THUMBNAIL_COUNT = 8
+JPEG_QUALITY = 75
 
 # 클립 저장을 위한 출력 디렉터리 설정
 output_dir = "saved_clips"
@@ -102,6 +116,9 @@ class EventDetector:
         self.executor = ThreadPoolExecutor()
         self.detected_in_roi = []  # 여러 객체가 ROI 내에서 감지되었는지 확인하기 위한 리스트
         self.predictions = {}  # 각 객체의 예측을 저장할 딕셔너리
+        self.object_predictions = {}  # 트랙 ID별 최근 예측 라벨
+        self.recurrent_states = {}  # 스트리밍 모드에서 트랙 ID별 LSTM 상태
+        self.streaming_steps = {}  # 스트리밍 모드에서 트랙 ID별 처리한 프레임 수
         self.event_timestamps = {
             'Fall': None,
             'Movement': None,
@@ -115,6 +132,15 @@ class EventDetector:
             'Smoke': False
         }
 
+    def reset_track(self, track_id):
+        """사라진 트랙의 시퀀스와 예측 상태 초기화"""
+        self.keypoint_sequence.pop(track_id, None)
+        self.object_predictions.pop(track_id, None)
+        self.recurrent_states.pop(track_id, None)
+        self.streaming_steps.pop(track_id, None)
+        if track_id in self.detected_in_roi:
+            self.detected_in_roi.remove(track_id)
+
     def create_s3(self):
         """S3 클라이언트 생성"""
         try:
@@ -170,6 +196,37 @@ class EventDetector:
         except Exception as e:
             print(f"S3 업로드 중 오류 발생: {e}")
 
+    def upload_image_to_s3(self, image_bytes, s3_bucket_name, s3_key):
+        """인코딩된 JPEG 이미지를 S3에 업로드 (작은 파일이므로 한 번에 업로드)"""
+        try:
+            s3_client = self.create_s3()
+            if s3_client:
+                s3_client.put_object(Bucket=s3_bucket_name, Key=s3_key, Body=image_bytes, ContentType='image/jpeg')
+                print(f"이미지 업로드 완료: {s3_key} ({len(image_bytes) // 1024}KB)")
+        except Exception as e:
+            print(f"이미지 업로드 중 오류 발생: {e}")
+
+    def create_clip_images(self, frames):
+        """클립 프레임에서 대표 이미지(이벤트 발생 시점)와 썸네일 스트립(균등 간격 프레임 가로 연결)을 JPEG로 생성"""
+        frames = list(frames)
+        if not frames:
+            return None, None
+
+        def resize_to_width(frame, width):
+            height = int(frame.shape[0] * width / frame.shape[1])
+            return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+        encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), JPEG_QUALITY]
+        # 버퍼 앞부분은 이벤트 이전 프레임이므로 그 다음 프레임이 감지 시점
+        poster_frame = frames[min(len(self.pre_event_buffer), len(frames) - 1)]
+        _, poster = cv2.imencode('.jpg', resize_to_width(poster_frame, POSTER_WIDTH), encode_params)
+
+        count = min(THUMBNAIL_COUNT, len(frames))
+        indices = np.linspace(0, len(frames) - 1, count).astype(int)
+        strip = cv2.hconcat([resize_to_width(frames[i], THUMBNAIL_WIDTH) for i in indices])
+        _, thumbnails = cv2.imencode('.jpg', strip, encode_params)
+        return poster.tobytes(), thumbnails.tobytes()
+
     def send_alert(self, user_id, camera_number, event_name, timestamp):
         """이벤트 발생 시 알림을 보내는 함수"""
         print(f"경고: {event_name} 발생! 알림 전송 중...")
@@ -228,6 +285,16 @@ class EventDetector:
         self.out.release()
         print("이벤트 클립 저장 완료 및 파일 닫기")
 
+        # 대표 이미지와 썸네일 스트립을 만들어 클립 옆에 업로드 (앱 목록은 영상 대신 이미지만 받음)
+        try:
+            poster, thumbnails = self.create_clip_images(self.event_buffers[event_name])
+            clip_key_base = self.s3_key[:-len('.mp4')]
+            if poster is not None:
+                self.executor.submit(self.upload_image_to_s3, poster, self.s3_bucket_name, f"{clip_key_base}_poster.jpg")
+                self.executor.submit(self.upload_image_to_s3, thumbnails, self.s3_bucket_name, f"{clip_key_base}_thumbs.jpg")
+        except Exception as e:
+            print(f"클립 이미지 생성 중 오류 발생: {e}")
+
         # 이벤트 후 클립 저장이 완료되면 S3에 업로드
         try:
             # S3 업로드를 백그라운드 스레드로 수행
@@ -263,33 +330,36 @@ class EventDetector:
         self.event_detected[event_name] = False
         self.saved_clip[event_name] = False
 
-def preprocess_keypoints(keypoints):
-    """키포인트 전처리"""
-    body_keypoints_indices = [0, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16]
-    filtered_keypoints = keypoints[body_keypoints_indices, :2]
-    return filtered_keypoints
+def predict_streaming(event_detector, streaming_inputs):
+    """트랙별 새 키포인트를 단일 스텝 모델에 배치로 넣고 LSTM 상태 갱신
 
-def detect_people_and_keypoints(frame):
-    """주어진 프레임에서 사람 및 키포인트 탐지"""
-    track_ids, keypoints_list = [], []
-    
-    try:
-        results = yolo_model.track(frame, persist=True, verbose=False)
-        keypoints = results[0].keypoints
-        boxes = results[0].boxes.xyxy.cpu().numpy()
-        if results[0].boxes.id is not None:
-            track_ids = results[0].boxes.id.int().cpu().tolist()
-        else:
-            track_ids = []  # None일 경우 기본값으로 빈 리스트 할당
-        
-        update_track_history(boxes, track_ids)
-        if keypoints is not None:
-            for kp in keypoints:
-                keypoints_list.append(kp.xy[0].cpu().numpy())
-    except AttributeError as e:
-        print(e)
-    
-    return keypoints_list, boxes, track_ids
+    streaming_inputs: {track_id: [flattened_keypoints, ...]} (키프레임 보간 시 여러 프레임일 수 있음)
+    """
+    for track_id in streaming_inputs:
+        if track_id not in event_detector.recurrent_states:
+            event_detector.recurrent_states[track_id] = initial_streaming_states(streaming_step_model)
+            event_detector.streaming_steps[track_id] = 0
+
+    step = 0
+    while True:
+        # step번째 프레임이 남아있는 트랙들을 한 배치로 처리
+        track_ids = [track_id for track_id, frames in streaming_inputs.items() if len(frames) > step]
+        if not track_ids:
+            break
+        frames = np.array([streaming_inputs[track_id][step] for track_id in track_ids], dtype=np.float32).reshape(len(track_ids), 1, feature_dim)
+        states = [np.concatenate([event_detector.recurrent_states[track_id][i] for track_id in track_ids]) for i in range(4)]
+        outputs = streaming_step_model([frames] + states, training=False)
+        probabilities = np.asarray(outputs[0])
+        new_states = [np.asarray(state) for state in outputs[1:]]
+
+        for index, track_id in enumerate(track_ids):
+            event_detector.recurrent_states[track_id] = [state[index:index + 1] for state in new_states]
+            event_detector.streaming_steps[track_id] += 1
+            # 윈도우 방식과 동일하게 시퀀스 길이만큼 관측한 후부터 예측 사용
+            if event_detector.streaming_steps[track_id] >= sequence_length:
+                predicted_class = np.argmax(probabilities[index])
+                event_detector.object_predictions[track_id] = classes[predicted_class]
+        step += 1
 
 def detect_movement(frame, roi_coords, min_contour_area=10000):
     """영상처리를 이용한 움직임 감지 (ROI 안에 있을 때만 표시)"""
@@ -333,14 +403,6 @@ def detect_movement(frame, roi_coords, min_contour_area=10000):
 
     return frame, motion_detected
 
-def update_track_history(boxes, track_ids):
-    """경계 상자와 트랙 ID를 사용하여 추적 이력 업데이트"""
-    for box, track_id in zip(boxes, track_ids):
-        x, y, _, _ = box
-        track_history[track_id].append((float(x), float(y)))
-        if len(track_history[track_id]) > 30:
-            track_history[track_id].pop(0)
-
 def draw_skeletons_and_boxes(frame, keypoint, box):
     """프레임에 스켈레톤과 경계 상자 그리기"""
     if box is not None:
@@ -389,6 +451,8 @@ def process_video(user_id, camera_id, rtsp_url):
     
     # 이벤트 감지 객체 생성
     event_detector = EventDetector(output_dir, fourcc, fps, post_event_length, S3_BUCKET_NAME, S3_FOLDER_NAME)
+    # 카메라별 추적기 생성 (트랙 ID가 다른 카메라와 섞이지 않도록 분리)
+    camera_tracker = CameraTracker(pose_model_path, keyframe_interval=pose_keyframe_interval)
     
     while cap.isOpened():
         success, frame = cap.read()
@@ -396,49 +460,52 @@ def process_video(user_id, camera_id, rtsp_url):
             print(f"Camera {camera_id} stream ended.")
             break
 
-        camera_settings = detection_status[user_id]['camera_info'][camera_id]
+        camera_settings = detection_status.get(user_id, {}).get('camera_info', {}).get(camera_id)
+        if camera_settings is None:
+            print(f"Camera {camera_id} removed, stopping thread.")
+            break
         roi_coords, roi_apply_signal = load_camera_settings(camera_settings)
         # 프레임 크기 조정
-        frame = cv2.resize(frame, (output_width, output_height), interpolation=cv2.INTER_CUBIC)
+        frame = resize_frame(frame)
     
         if roi_apply_signal:
             draw_detection_area(frame, roi_coords)
 
         # 넘어짐 감지
         if camera_settings['fall_detection_on']:
-            keypoints_list, boxes, track_ids = detect_people_and_keypoints(frame)
+            keypoints_list, boxes, track_ids, sequence_updates, lost_ids = camera_tracker.update(frame)
             detected_in_roi = event_detector.detected_in_roi  # 여러 객체가 ROI 내에서 감지되었는지 확인하기 위한 리스트
+
+            streaming_inputs = {}  # 스트리밍 모드에서 이번 프레임에 추가된 트랙별 키포인트
+
+            # 사라진 트랙의 시퀀스와 LSTM 상태 초기화
+            for track_id in lost_ids:
+                event_detector.reset_track(track_id)
     
             for keypoints, track_id in zip(keypoints_list, track_ids):
-                # 키포인트가 기본값일 때의 처리 (예: 이벤트 감지 건너뛰기)
+                # 키프레임이 아닌 경우 시퀀스 추가분이 비어 있음 (박스만 예측)
+                new_keypoints = sequence_updates.get(track_id, [])
                 
                 for (x, y) in keypoints:
                     if is_in_detection_area(x, y, roi_coords):  # ROI 내에 있는지 확인
-                        if any(kp.size > 0 for kp in keypoints):
-                            selected_keypoints = preprocess_keypoints(np.array(keypoints))
-                            flattened_keypoints = selected_keypoints.flatten()  # x, y 좌표만 사용
-                            # track_id가 keypoint_sequence에 없으면 빈 리스트로 초기화
-                            if track_id not in event_detector.keypoint_sequence:
-                                event_detector.keypoint_sequence[track_id] = []
-                            event_detector.keypoint_sequence[track_id].append(flattened_keypoints)
-                        else:
-                            # 키포인트가 감지되지 않을 경우 이전 프레임의 키포인트 사용
-                            if event_detector.keypoint_sequence[track_id]:
-                                event_detector.keypoint_sequence[track_id].append(event_detector.keypoint_sequence[track_id][-1])
-                        
-                        # 시퀀스 길이 초과 시, 가장 오래된 키포인트 제거
-                        if len(event_detector.keypoint_sequence[track_id]) > sequence_length:
-                            event_detector.keypoint_sequence[track_id].pop(0)
-
-                        # 시퀀스가 충분히 쌓였을 때 예측
-                        if len(event_detector.keypoint_sequence[track_id]) == sequence_length:
+                        # track_id가 keypoint_sequence에 없으면 빈 리스트로 초기화
+                        if track_id not in event_detector.keypoint_sequence:
+                            event_detector.keypoint_sequence[track_id] = []
+                        # 전처리 후 시퀀스에 추가 (시퀀스 길이 초과 시 가장 오래된 키포인트 제거)
+                        for tracked_keypoints in new_keypoints:
+                            flattened_keypoints = append_to_sequence(event_detector.keypoint_sequence[track_id], tracked_keypoints)
+                            if fall_model_mode == 'streaming':
+                                streaming_inputs.setdefault(track_id, []).append(flattened_keypoints)
+
+                        # 새 키포인트가 추가되었고 시퀀스가 충분히 쌓였을 때 예측
+                        if fall_model_mode != 'streaming' and new_keypoints and len(event_detector.keypoint_sequence[track_id]) == sequence_length:
                             # 모델 입력 형태에 맞게 배열 전처리
                             input_sequence = np.array(event_detector.keypoint_sequence[track_id]).reshape(1, sequence_length, feature_dim)
                             
                             # 모델 예측
                             event_detector.predictions = lstm_model.predict(input_sequence, verbose=0)
                             predicted_class = np.argmax(event_detector.predictions, axis=1)[0]
-                            object_predictions[track_id] = "Fall" if predicted_class == 1 else "Normal"
+                            event_detector.object_predictions[track_id] = classes[predicted_class]
 
                         if track_id not in detected_in_roi:
                             detected_in_roi.append(track_id)  # ROI 내에서 감지된 track_id를 추가
@@ -446,23 +513,26 @@ def process_video(user_id, camera_id, rtsp_url):
                     else:
                         if track_id in detected_in_roi:
                             detected_in_roi.remove(track_id)  # track_id가 리스트에 있는 경우에만 제거
+
+            if streaming_inputs:
+                predict_streaming(event_detector, streaming_inputs)
                                         
             # ROI 내에서 감지된 객체에 대해 이벤트 감지 및 시각화
             for track_id in detected_in_roi:                
                 # 해당 객체에 대한 박스 및 키포인트 그리기
-                if track_id in track_ids and track_id in object_predictions:
+                if track_id in track_ids and track_id in event_detector.object_predictions:
                     index = track_ids.index(track_id)
                     box = boxes[index]  # 현재 track_id에 해당하는 경계 상자를 찾음
                     x1, y1, _, _ = map(int, box)  # 좌상단 좌표 사용
                     
                     # 라벨을 박스의 왼쪽 위에 표시
-                    cv2.putText(frame, object_predictions[track_id], (x1, y1 - 10), 
+                    cv2.putText(frame, event_detector.object_predictions[track_id], (x1, y1 - 10), 
                                 cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2, cv2.LINE_AA)
                     
                     # 해당 객체의 키포인트 그리기
                     draw_skeletons_and_boxes(frame, keypoints_list[index], box)
 
-            for track_id, event in object_predictions.items():
+            for track_id, event in event_detector.object_predictions.items():
                 # 이벤트 발생 처리 함수
                 if event == 'Fall':
                     event_detector.handle_event_detection('Fall', user_id, camera_id)
@@ -555,6 +625,107 @@ def process_video(user_id, camera_id, rtsp_url):
     cap.release()
     cv2.destroyAllWindows()
 
+def apply_camera_config(user_id, camera_id, camera_data):
+    """카메라 설정을 저장하고, RTSP URL이 있는데 실행 중인 스레드가 없으면 시작"""
+    with thread_lock:
+        if user_id not in detection_status:
+            detection_status[user_id] = {'camera_info': {}}
+
+        detection_status[user_id]['camera_info'][camera_id] = {
+            'rtsp_url': camera_data.get('rtsp_url'),
+            'fall_detection_on': camera_data.get('fall_detection_on', False),
+            'fire_detection_on': camera_data.get('fire_detection_on', False),
+            'smoke_detection_on': camera_data.get('smoke_detection_on', False),
+            'movement_detection_on': camera_data.get('movement_detection_on', False),
+            'roi_detection_on': camera_data.get('roi_detection_on', False),
+            'roi_values': camera_data.get('roi_values', {})
+        }
+
+        rtsp_url = camera_data.get('rtsp_url')
+        thread = camera_threads.setdefault(user_id, {}).get(camera_id)
+        if rtsp_url and (thread is None or not thread.is_alive()):
+            print(f"Starting thread for {camera_id} with RTSP URL: {rtsp_url}")
+            thread = threading.Thread(target=process_video, args=(user_id, camera_id, rtsp_url))
+            camera_threads[user_id][camera_id] = thread
+            thread.start()
+
+def remove_camera_config(user_id, camera_id):
+    """카메라 설정 삭제 (스레드는 다음 프레임에서 설정이 없음을 확인하고 종료). 스레드 반환"""
+    with thread_lock:
+        detection_status.get(user_id, {}).get('camera_info', {}).pop(camera_id, None)
+        return camera_threads.get(user_id, {}).pop(camera_id, None)
+
+def apply_changes(changes):
+    for change in changes:
+        camera_id = int(change['camera_id'])
+        if change['op'] == 'remove':
+            remove_camera_config(change['user_id'], camera_id)
+        else:
+            apply_camera_config(change['user_id'], camera_id, change['camera_info'])
+
+def apply_snapshot(snapshot):
+    """전체 설정으로 교체: 스냅샷에 없는 카메라는 중지하고 나머지는 반영"""
+    cameras = {(camera['user_id'], int(camera['camera_id'])): camera for camera in snapshot['cameras']}
+    running = [(user_id, camera_id) for user_id, info in list(detection_status.items()) for camera_id in list(info['camera_info'])]
+    for user_id, camera_id in running:
+        if (user_id, camera_id) not in cameras:
+            remove_camera_config(user_id, camera_id)
+    for (user_id, camera_id), camera in cameras.items():
+        apply_camera_config(user_id, camera_id, camera['camera_info'])
+
+def sync_from_backend():
+    """마지막 반영 버전 이후 변경을 백엔드에서 가져옴. 이어 받을 수 없으면 전체 스냅샷으로 복구"""
+    global sync_version
+    with sync_lock:
+        if sync_version > 0:
+            while True:
+                response = backend_session.get(f"{BACKEND_URL}/model_sync/changes", params={'since': sync_version}, timeout=(3, 30))
+                if response.status_code == 410:
+                    break
+                response.raise_for_status()
+                delta = response.json()
+                apply_changes(delta['changes'])
+                sync_version = delta['to_version']
+                if not delta['has_more']:
+                    return
+
+        response = backend_session.get(f"{BACKEND_URL}/model_sync/snapshot", timeout=(3, 60))
+        response.raise_for_status()
+        snapshot = response.json()
+        apply_snapshot(snapshot)
+        sync_version = snapshot['version']
+        print(f"백엔드 설정 스냅샷 반영 완료: 카메라 {len(snapshot['cameras'])}대, 버전 {sync_version}")
+
+def sync_loop():
+    """시작 시 스냅샷을 가져오고, 이후 주기적으로 누락된 변경이 없는지 확인"""
+    while True:
+        try:
+            sync_from_backend()
+        except Exception as e:
+            print(f"백엔드 설정 동기화 실패: {e}")
+        time.sleep(SYNC_POLL_INTERVAL)
+
+@app.route('/sync/changes', methods=['POST'])
+def sync_changes():
+    """백엔드에서 버전 범위가 붙은 설정 변경 묶음 수신"""
+    global sync_version
+    data = request.get_json()
+    if data is None:
+        return jsonify({"error": "No JSON received"}), 400
+
+    with sync_lock:
+        if data['to_version'] <= sync_version:
+            return jsonify({"version": sync_version}), 200  # 이미 반영된 변경
+        if data['from_version'] == sync_version:
+            apply_changes(data['changes'])
+            sync_version = data['to_version']
+            return jsonify({"version": sync_version}), 200
+
+    # 버전이 이어지지 않으면 누락된 변경이 있으므로 백엔드에서 직접 가져와 복구
+    print(f"설정 버전 누락 감지 (현재 {sync_version}, 수신 {data['from_version']}~{data['to_version']}), 복구 시작")
+    executor.submit(sync_from_backend)
+    return jsonify({"error": "Version gap", "version": sync_version}), 409
+
 @app.route('/add_camera', methods=['POST'])
 def add_camera():
     """카메라 추가시 스레드 시작"""
@@ -568,35 +739,14 @@ def add_camera():
 
     # camera_settings에서 rtsp_url 가져오기
     rtsp_url = camera_settings.get('rtsp_url')
-    # 유저별 카메라 정보를 저장하기 위해 detection_status 딕셔너리에서 user_id 확인
-    if user_id not in detection_status:
-        detection_status[user_id] = {'camera_info': {}}
-
     # 특정 카메라 ID가 이미 존재하는지 확인
-    if camera_id in detection_status[user_id]['camera_info']:
+    if camera_id in detection_status.get(user_id, {}).get('camera_info', {}):
         return jsonify({"message": f"Camera {camera_id} already exists for user {user_id}."}), 400
 
-    # detection_status에 해당 카메라 설정 저장
-    detection_status[user_id]['camera_info'][camera_id] = {
-        'rtsp_url': rtsp_url,
-        'fall_detection_on': camera_settings.get('fall_detection_on', False),
-        'fire_detection_on': camera_settings.get('fire_detection_on', False),
-        'smoke_detection_on': camera_settings.get('smoke_detection_on', False),
-        'movement_detection_on': camera_settings.get('movement_detection_on', False),
-        'roi_detection_on': camera_settings.get('roi_detection_on', False),
-        'roi_values': camera_settings.get('roi_values', {})
-    }
+    # detection_status에 해당 카메라 설정 저장 후 스레드 시작
     print(f"Adding camera: {camera_id} with RTSP: {rtsp_url}")
+    apply_camera_config(user_id, camera_id, dict(camera_settings, rtsp_url=rtsp_url))
 
-    # 새로운 카메라에 대해 스레드 시작
-    if user_id not in camera_threads:
-        camera_threads[user_id] = {}  # 새로운 사용자 ID 생성
-
-    # 카메라 ID별로 쓰레드를 시작하여 사용자별로 저장
-    thread = threading.Thread(target=process_video, args=(user_id, camera_id, rtsp_url))
-    camera_threads[user_id][camera_id] = thread  # 사용자 ID별 카메라 ID에 쓰레드 저장
-    thread.start()
-    
     return jsonify({"message": "Camera added successfully."}), 200
 
 @app.route('/event_update', methods=['POST'])
@@ -622,29 +772,8 @@ def event_update():
         if not camera_data:
             return jsonify({"error": f"camera_info for camera_id {camera_id} is required"}), 400
         
-        # 사용자가 없을 때 camera_info 초기화
-        if user_id not in detection_status:
-            detection_status[user_id] = {'camera_info': {}}
-
-        # 특정 카메라에 대한 탐지 상태 업데이트
-        detection_status[user_id]['camera_info'][camera_id] = {
-            'rtsp_url': camera_data.get('rtsp_url'),
-            'fall_detection_on': camera_data.get('fall_detection_on', False),
-            'fire_detection_on': camera_data.get('fire_detection_on', False),
-            'smoke_detection_on': camera_data.get('smoke_detection_on', False),
-            'movement_detection_on': camera_data.get('movement_detection_on', False),
-            'roi_detection_on': camera_data.get('roi_detection_on', False),
-            'roi_values': camera_data.get('roi_values', {})
-        }
-
-        # 카메라에 대한 스레드 실행
-        rtsp_url = camera_data.get('rtsp_url')
-        if rtsp_url:  # RTSP URL이 존재할 경우에만 스레드 시작
-            if camera_id not in camera_threads[user_id]:  # 스레드가 존재하지 않을 경우
-                print(f"Starting thread for {camera_id} with RTSP URL: {rtsp_url}")
-                thread = threading.Thread(target=process_video, args=(user_id, camera_id, rtsp_url))
-                camera_threads[user_id][camera_id] = thread  # 스레드를 딕셔너리에 추가
-                thread.start()  # 스레드 시작
+        # 특정 카메라에 대한 탐지 상태 업데이트 (RTSP URL이 있으면 스레드 실행)
+        apply_camera_config(user_id, camera_id, camera_data)
 
         # 상태 확인을 위한 로그 출력
         print(f"User ID: {user_id}, Camera ID: {camera_id}")
@@ -678,19 +807,22 @@ def remove_camera():
         return jsonify({"message": f"Camera {camera_id} not found for user {user_id}."}), 404
 
     # 카메라 정보 삭제
-    del detection_status[user_id]['camera_info'][camera_id]
+    thread = remove_camera_config(user_id, camera_id)
     print(f"Removing camera: {camera_id} for user: {user_id}")
 
     # 스레드 종료
-    if camera_id in camera_threads[user_id]:
-        camera_threads[user_id][camera_id].join()  # 해당 카메라의 스레드 종료
-        del camera_threads[user_id][camera_id]  # 스레드 딕셔너리에서 제거
+    if thread:
+        thread.join()  # 해당 카메라의 스레드 종료
 
     return jsonify({"message": f"Camera {camera_id} removed successfully."}), 200
 
 def main():
+    debug = True
+    # 백엔드에서 전체 카메라 설정을 가져와 카메라 스레드 재시작 (debug 리로더의 감시 프로세스에서는 실행하지 않음)
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        threading.Thread(target=sync_loop, daemon=True).start()
     # Flask 서버 실행
-    app.run(host="0.0.0.0", port=8000, threaded=True, debug=True)
+    app.run(host="0.0.0.0", port=8000, threaded=True, debug=debug)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,208 @@
+from ultralytics import YOLO
+import numpy as np
+
+# 트랙이 사라졌다고 판단하기까지 허용하는 프레임 수
+lost_track_frames = 30
+
+
+def box_iou(boxes_a, boxes_b):
+    """두 경계 상자 집합 사이의 IoU 행렬 계산 (xyxy 형식)"""
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return intersection / np.maximum(union, 1e-6)
+
+
+class Track:
+    """키프레임 사이에서 등속 모델로 위치를 예측하는 단일 트랙"""
+
+    def __init__(self, track_id, box, keypoints, frame_index):
+        self.track_id = track_id
+        self.box = np.asarray(box, dtype=np.float32)
+        self.velocity = np.zeros(4, dtype=np.float32)  # 프레임당 박스 이동량
+        self.keypoints = np.asarray(keypoints, dtype=np.float32)
+        self.keyframe_keypoints = self.keypoints.copy()  # 마지막 키프레임의 실제 키포인트
+        self.keyframe_index = frame_index
+        self.missed = 0
+
+    def predict(self):
+        """다음 프레임의 박스와 키포인트 위치를 예측"""
+        self.box = self.box + self.velocity
+        # 키포인트는 박스 중심 이동량만큼 평행 이동
+        shift = (self.velocity[:2] + self.velocity[2:]) / 2
+        self.keypoints = self.keypoints + shift
+
+    def correct(self, box, keypoints, frame_index, alpha=0.6, beta=0.2):
+        """키프레임 검출 결과로 상태 보정 (고정 이득 칼만 필터)
+
+        이전 키프레임과 현재 키프레임 사이의 프레임에 대한 보간 키포인트 목록을 반환합니다.
+        """
+        gap = max(1, frame_index - self.keyframe_index)
+        residual = np.asarray(box, dtype=np.float32) - self.box
+        self.box = self.box + alpha * residual
+        self.velocity = self.velocity + beta * residual / gap
+
+        keypoints = np.asarray(keypoints, dtype=np.float32)
+        interpolated = [
+            self.keyframe_keypoints + (keypoints - self.keyframe_keypoints) * (step / gap)
+            for step in range(1, gap + 1)
+        ]
+
+        self.keypoints = keypoints
+        self.keyframe_keypoints = keypoints.copy()
+        self.keyframe_index = frame_index
+        self.missed = 0
+        return interpolated
+
+
+class IoUTracker:
+    """IoU 기반 경량 추적기 (키프레임에서만 검출 결과와 매칭)"""
+
+    def __init__(self, iou_threshold=0.3, max_missed=3):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed  # 매칭에 실패해도 유지할 키프레임 수
+        self.tracks = {}
+        self.next_id = 1
+
+    def predict(self):
+        for track in self.tracks.values():
+            track.predict()
+
+    def update(self, boxes, keypoints_list, frame_index):
+        """검출 결과와 기존 트랙을 매칭하고 (보간 키포인트, 사라진 트랙 ID) 반환"""
+        sequence_updates = {}
+        track_ids = list(self.tracks.keys())
+        unmatched_tracks = set(track_ids)
+        unmatched_detections = set(range(len(boxes)))
+
+        if track_ids and len(boxes):
+            iou = box_iou([self.tracks[t].box for t in track_ids], boxes)
+            # IoU가 높은 쌍부터 탐욕적으로 매칭
+            for flat_index in np.argsort(-iou, axis=None):
+                row, col = np.unravel_index(flat_index, iou.shape)
+                if iou[row, col] < self.iou_threshold:
+                    break
+                track_id = track_ids[row]
+                if track_id not in unmatched_tracks or col not in unmatched_detections:
+                    continue
+                sequence_updates[track_id] = self.tracks[track_id].correct(boxes[col], keypoints_list[col], frame_index)
+                unmatched_tracks.discard(track_id)
+                unmatched_detections.discard(col)
+
+        lost_ids = []
+        for track_id in unmatched_tracks:
+            track = self.tracks[track_id]
+            track.missed += 1
+            if track.missed > self.max_missed:
+                del self.tracks[track_id]
+                lost_ids.append(track_id)
+
+        for col in sorted(unmatched_detections):
+            track = Track(self.next_id, boxes[col], keypoints_list[col], frame_index)
+            self.tracks[track.track_id] = track
+            sequence_updates[track.track_id] = [track.keypoints.copy()]
+            self.next_id += 1
+
+        return sequence_updates, lost_ids
+
+
+class CameraTracker:
+    """카메라 한 대 전용 포즈 추적기
+
+    카메라마다 별도의 YOLO 인스턴스를 사용하므로 추적 상태(트랙 ID)가 카메라 간에 섞이지 않습니다.
+    keyframe_interval이 1이면 매 프레임 YOLO 추적기를 사용하고, N(>1)이면 N프레임마다 포즈 모델을 실행하고
+    그 사이 프레임은 IoUTracker로 박스를 예측합니다.
+    """
+
+    def __init__(self, model_path, keyframe_interval=1, iou_threshold=0.3, max_missed=3):
+        self.model = YOLO(model_path)
+        self.keyframe_interval = max(1, int(keyframe_interval))
+        self.iou_tracker = IoUTracker(iou_threshold, max_missed)
+        self.frame_index = 0
+        self.last_seen = {}  # YOLO 추적기 모드에서 트랙별 마지막 관측 프레임
+        self.track_history = {}  # 트랙별 박스 좌상단 좌표 이력
+
+    def update(self, frame):
+        """프레임을 처리하고 (키포인트 목록, 박스, 트랙 ID, 시퀀스 추가분, 사라진 트랙 ID) 반환
+
+        시퀀스 추가분은 트랙 ID별로 LSTM 시퀀스에 추가할 키포인트 목록이며, 키프레임이 아니면 비어 있습니다.
+        """
+        if self.keyframe_interval == 1:
+            result = self._update_with_yolo_tracker(frame)
+        elif self.frame_index % self.keyframe_interval == 0:
+            result = self._update_keyframe(frame)
+        else:
+            self.iou_tracker.predict()
+            result = self._active_tracks() + ({}, [])
+
+        self.frame_index += 1
+        keypoints_list, boxes, track_ids, sequence_updates, lost_ids = result
+        self._update_track_history(boxes, track_ids, lost_ids)
+        return keypoints_list, boxes, track_ids, sequence_updates, lost_ids
+
+    def _update_with_yolo_tracker(self, frame):
+        keypoints_list, boxes, track_ids = self._detect(frame, track=True)
+        sequence_updates = {track_id: [keypoints] for keypoints, track_id in zip(keypoints_list, track_ids)}
+
+        for track_id in track_ids:
+            self.last_seen[track_id] = self.frame_index
+        lost_ids = [track_id for track_id, seen in self.last_seen.items()
+                    if self.frame_index - seen > lost_track_frames]
+        for track_id in lost_ids:
+            del self.last_seen[track_id]
+
+        return keypoints_list, boxes, track_ids, sequence_updates, lost_ids
+
+    def _update_keyframe(self, frame):
+        keypoints_list, boxes, _ = self._detect(frame, track=False)
+        self.iou_tracker.predict()
+        sequence_updates, lost_ids = self.iou_tracker.update(boxes, keypoints_list, self.frame_index)
+        return self._active_tracks() + (sequence_updates, lost_ids)
+
+    def _active_tracks(self):
+        tracks = list(self.iou_tracker.tracks.values())
+        keypoints_list = [track.keypoints for track in tracks]
+        boxes = np.array([track.box for track in tracks], dtype=np.float32).reshape(-1, 4)
+        track_ids = [track.track_id for track in tracks]
+        return keypoints_list, boxes, track_ids
+
+    def _detect(self, frame, track):
+        """포즈 모델로 사람과 키포인트 탐지"""
+        keypoints_list, boxes, track_ids = [], np.empty((0, 4), dtype=np.float32), []
+
+        try:
+            if track:
+                results = self.model.track(frame, persist=True, verbose=False)
+            else:
+                results = self.model.predict(frame, verbose=False)
+            keypoints = results[0].keypoints
+            boxes = results[0].boxes.xyxy.cpu().numpy()
+            if results[0].boxes.id is not None:
+                track_ids = results[0].boxes.id.int().cpu().tolist()
+            if keypoints is not None:
+                for kp in keypoints:
+                    keypoints_list.append(kp.xy[0].cpu().numpy())
+        except AttributeError as e:
+            print(e)
+
+        return keypoints_list, boxes, track_ids
+
+    def _update_track_history(self, boxes, track_ids, lost_ids):
+        """경계 상자와 트랙 ID를 사용하여 추적 이력 업데이트"""
+        for box, track_id in zip(boxes, track_ids):
+            x, y, _, _ = box
+            history = self.track_history.setdefault(track_id, [])
+            history.append((float(x), float(y)))
+            if len(history) > 30:
+                history.pop(0)
+        for track_id in lost_ids:
+            self.track_history.pop(track_id, None)
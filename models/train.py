@@ -1,90 +1,272 @@
+import argparse
+import json
+import os
+import time
 import numpy as np
 import tensorflow as tf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout, Bidirectional, Conv1D, MaxPooling1D
+from tensorflow.keras.models import Sequential, Model
+from tensorflow.keras.layers import LSTM, Dense, Dropout, Bidirectional, Conv1D, MaxPooling1D, Input
 from tensorflow.keras.regularizers import l2
 from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
-import matplotlib.pyplot as plt
+from dataset import is_shard_dir, load_manifest, make_dataset
+from keypoints import classes, check_classes
+from export import export_formats, export_and_benchmark
 
 # GPU 사용 여부 확인
 physical_devices = tf.config.list_physical_devices('GPU')
 if physical_devices:
     tf.config.experimental.set_memory_growth(physical_devices[0], True)
 
-# 클래스 레이블 설정
-classes = ['넘어짐', '정상']
-
-# 넘파이 파일 로드
-data = np.load('keypoints_data_1.npz')
-
-train_data = data['train_data']
-train_labels = data['train_labels']
-valid_data = data['valid_data']
-valid_labels = data['valid_labels']
-
-# 데이터를 LSTM에 맞게 reshape (x, y 값만 사용)
-num_keypoints = train_data.shape[1] // 3
-train_data = train_data.reshape((train_data.shape[0], num_keypoints, 3))[:, :, :2]
-valid_data = valid_data.reshape((valid_data.shape[0], num_keypoints, 3))[:, :, :2]
-
-# LSTM 입력 크기 설정 (x, y 값만 사용하므로 2로 설정)
-input_shape = (num_keypoints, 2)
-
-# 모델 구축
-model = Sequential()
-model.add(Conv1D(64, kernel_size=3, activation='relu', input_shape=input_shape))
-model.add(MaxPooling1D(pool_size=2))
-model.add(Bidirectional(LSTM(128, return_sequences=True, kernel_regularizer=l2(0.002))))
-model.add(Dropout(0.5))  # 드롭아웃 비율 증가
-model.add(Bidirectional(LSTM(64, return_sequences=False, kernel_regularizer=l2(0.002))))
-model.add(Dropout(0.5))  # 드롭아웃 비율 증가
-model.add(Dense(128, activation='relu'))  # 추가 Dense 레이어
-model.add(Dense(len(classes), activation='softmax'))  # 최종 클래스 수에 맞춰 조정
-
-# 옵티마이저 설정
-optimizer = tf.keras.optimizers.AdamW(learning_rate=0.0001)
-
-# 모델 컴파일
-model.compile(optimizer=optimizer, loss='sparse_categorical_crossentropy', metrics=['accuracy'])
-
-# 모델 요약 출력
-model.summary()
-
-# EarlyStopping 콜백 설정
-early_stopping = EarlyStopping(monitor='val_loss', patience=20, restore_best_weights=True)
-
-# ReduceLROnPlateau 콜백 설정
-reduce_lr = ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5, min_lr=0.00001)
-
-# 모델 학습
-history = model.fit(train_data, train_labels, epochs=100, validation_data=(valid_data, valid_labels), callbacks=[early_stopping, reduce_lr])
-
-# 학습 손실과 정확도 시각화
-plt.figure(figsize=(12, 5))
-
-# 손실 시각화
-plt.subplot(1, 2, 1)
-plt.plot(history.history['loss'], label='Train Loss')
-plt.plot(history.history['val_loss'], label='Validation Loss')
-plt.xlabel('Epoch')
-plt.ylabel('Loss')
-plt.legend()
-plt.title('Loss over Epochs')
-
-# 정확도 시각화
-plt.subplot(1, 2, 2)
-plt.plot(history.history['accuracy'], label='Train Accuracy')
-plt.plot(history.history['val_accuracy'], label='Validation Accuracy')
-plt.xlabel('Epoch')
-plt.ylabel('Accuracy')
-plt.legend()
-plt.title('Accuracy over Epochs')
-
-# 이미지 저장
-plt.savefig('lstm_11633_history.png')
-
-# 이미지 표시
-plt.show()
-
-# 모델 저장
-model.save('lstm_model_11633.h5')
+# 스트리밍 모델 설정 (한 프레임 = 13개 키포인트의 x, y 좌표)
+sequence_length = 20
+
+def load_data(path):
+    """npz 파일을 불러와 LSTM 입력 형태로 변환 (x, y 값만 사용)"""
+    data = np.load(path)
+
+    train_data = data['train_data']
+    train_labels = data['train_labels']
+    valid_data = data['valid_data']
+    valid_labels = data['valid_labels']
+
+    # 데이터를 LSTM에 맞게 reshape (x, y 값만 사용)
+    num_keypoints = train_data.shape[1] // 3
+    train_data = train_data.reshape((train_data.shape[0], num_keypoints, 3))[:, :, :2]
+    valid_data = valid_data.reshape((valid_data.shape[0], num_keypoints, 3))[:, :, :2]
+
+    return train_data, train_labels, valid_data, valid_labels
+
+def to_frame_sequences(data, sequence_length=sequence_length):
+    """(샘플, 키포인트, 2) 배열을 프레임 단위 시퀀스 (샘플, 프레임, 키포인트*2)로 변환"""
+    num_keypoints = data.shape[1]
+    if num_keypoints % sequence_length != 0:
+        raise ValueError(f"키포인트 수({num_keypoints})가 시퀀스 길이({sequence_length})로 나누어떨어지지 않습니다.")
+    return data.reshape((data.shape[0], sequence_length, -1))
+
+def build_model(input_shape):
+    """기존 양방향 LSTM 모델"""
+    model = Sequential()
+    model.add(Conv1D(64, kernel_size=3, activation='relu', input_shape=input_shape))
+    model.add(MaxPooling1D(pool_size=2))
+    model.add(Bidirectional(LSTM(128, return_sequences=True, kernel_regularizer=l2(0.002))))
+    model.add(Dropout(0.5))  # 드롭아웃 비율 증가
+    model.add(Bidirectional(LSTM(64, return_sequences=False, kernel_regularizer=l2(0.002))))
+    model.add(Dropout(0.5))  # 드롭아웃 비율 증가
+    model.add(Dense(128, activation='relu'))  # 추가 Dense 레이어
+    model.add(Dense(len(classes), activation='softmax'))  # 최종 클래스 수에 맞춰 조정
+    return model
+
+def build_streaming_model(feature_dim):
+    """프레임 단위로 상태를 이어갈 수 있는 단방향(인과적) LSTM 모델
+
+    학습은 시퀀스 전체로 하고, 서빙은 build_streaming_step_model로 만든 단일 스텝 모델을 사용합니다.
+    시간 축을 섞는 Conv1D/MaxPooling/양방향 레이어를 사용하지 않으므로 t번째 출력은 t번째 프레임까지만 본 결과입니다.
+    """
+    frames = Input(shape=(None, feature_dim), name='frames')
+    x = Dense(64, activation='relu', name='frame_dense')(frames)  # 프레임별 특징 추출
+    x = LSTM(128, return_sequences=True, kernel_regularizer=l2(0.002), name='causal_lstm_1')(x)
+    x = Dropout(0.5)(x)
+    x = LSTM(64, kernel_regularizer=l2(0.002), name='causal_lstm_2')(x)
+    x = Dropout(0.5)(x)
+    x = Dense(128, activation='relu', name='head_dense')(x)
+    outputs = Dense(len(classes), activation='softmax', name='output')(x)
+    return Model(frames, outputs, name='streaming_lstm')
+
+def build_streaming_step_model(streaming_model):
+    """학습된 스트리밍 모델에서 한 프레임씩 처리하는 단일 스텝 모델 생성
+
+    입력: [프레임 (배치, 1, feature_dim), h1, c1, h2, c2]
+    출력: [클래스 확률, h1, c1, h2, c2] (반환된 상태를 다음 프레임 입력으로 사용)
+    """
+    feature_dim = streaming_model.input_shape[-1]
+    units_1 = streaming_model.get_layer('causal_lstm_1').units
+    units_2 = streaming_model.get_layer('causal_lstm_2').units
+
+    frame = Input(shape=(1, feature_dim), name='frame')
+    state_inputs = [
+        Input(shape=(units_1,), name='h1'), Input(shape=(units_1,), name='c1'),
+        Input(shape=(units_2,), name='h2'), Input(shape=(units_2,), name='c2'),
+    ]
+
+    x = Dense(64, activation='relu', name='frame_dense')(frame)
+    x, h1, c1 = LSTM(units_1, return_sequences=True, return_state=True, name='causal_lstm_1')(x, initial_state=state_inputs[:2])
+    x, h2, c2 = LSTM(units_2, return_state=True, name='causal_lstm_2')(x, initial_state=state_inputs[2:])
+    x = Dense(128, activation='relu', name='head_dense')(x)
+    outputs = Dense(len(classes), activation='softmax', name='output')(x)
+    step_model = Model([frame] + state_inputs, [outputs, h1, c1, h2, c2], name='streaming_lstm_step')
+
+    # 학습된 가중치 복사
+    for name in ['frame_dense', 'causal_lstm_1', 'causal_lstm_2', 'head_dense', 'output']:
+        step_model.get_layer(name).set_weights(streaming_model.get_layer(name).get_weights())
+    return step_model
+
+def initial_streaming_states(step_model, batch_size=1):
+    """트랙 시작 시 사용할 0 상태"""
+    return [np.zeros((batch_size,) + tuple(state.shape[1:]), dtype=np.float32) for state in step_model.inputs[1:]]
+
+def load_datasets(path, batch_size=32, frame_sequences=False):
+    """npz 파일 또는 샤드 디렉터리에서 (학습, 검증) tf.data 데이터셋과 입력 크기 반환
+
+    샤드 디렉터리는 메모리 매핑으로 읽으므로 메모리보다 큰 데이터셋도 학습할 수 있습니다.
+    """
+    seq_len = sequence_length if frame_sequences else None
+    if is_shard_dir(path):
+        num_keypoints = load_manifest(path)['row_shape'][0] // 3
+        train_set = make_dataset(path, 'train', batch_size, training=True, sequence_length=seq_len)
+        valid_set = make_dataset(path, 'valid', batch_size, training=False, sequence_length=seq_len)
+    else:
+        # extract_keypoints.py가 남긴 정보 파일이 있으면 라벨 순서 확인
+        info_path = os.path.splitext(path)[0] + '_info.json'
+        if os.path.exists(info_path):
+            with open(info_path) as f:
+                check_classes(json.load(f)['classes'])
+        train_data, train_labels, valid_data, valid_labels = load_data(path)
+        num_keypoints = train_data.shape[1]
+        if frame_sequences:
+            train_data, valid_data = to_frame_sequences(train_data), to_frame_sequences(valid_data)
+        train_set = tf.data.Dataset.from_tensor_slices((train_data, train_labels)).shuffle(len(train_labels)).batch(batch_size)
+        valid_set = tf.data.Dataset.from_tensor_slices((valid_data, valid_labels)).batch(batch_size)
+
+    if frame_sequences:
+        input_shape = (sequence_length, num_keypoints * 2 // sequence_length)
+    else:
+        input_shape = (num_keypoints, 2)
+    return train_set.prefetch(tf.data.AUTOTUNE), valid_set.prefetch(tf.data.AUTOTUNE), input_shape
+
+def train(model, train_set, valid_set, epochs=100):
+    # 옵티마이저 설정
+    optimizer = tf.keras.optimizers.AdamW(learning_rate=0.0001)
+
+    # 모델 컴파일
+    model.compile(optimizer=optimizer, loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+
+    # 모델 요약 출력
+    model.summary()
+
+    # EarlyStopping 콜백 설정
+    early_stopping = EarlyStopping(monitor='val_loss', patience=20, restore_best_weights=True)
+
+    # ReduceLROnPlateau 콜백 설정
+    reduce_lr = ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5, min_lr=0.00001)
+
+    # 모델 학습
+    return model.fit(train_set, epochs=epochs, validation_data=valid_set, callbacks=[early_stopping, reduce_lr])
+
+def plot_history(history, path, show=True):
+    import matplotlib.pyplot as plt
+
+    # 학습 손실과 정확도 시각화
+    plt.figure(figsize=(12, 5))
+
+    # 손실 시각화
+    plt.subplot(1, 2, 1)
+    plt.plot(history.history['loss'], label='Train Loss')
+    plt.plot(history.history['val_loss'], label='Validation Loss')
+    plt.xlabel('Epoch')
+    plt.ylabel('Loss')
+    plt.legend()
+    plt.title('Loss over Epochs')
+
+    # 정확도 시각화
+    plt.subplot(1, 2, 2)
+    plt.plot(history.history['accuracy'], label='Train Accuracy')
+    plt.plot(history.history['val_accuracy'], label='Validation Accuracy')
+    plt.xlabel('Epoch')
+    plt.ylabel('Accuracy')
+    plt.legend()
+    plt.title('Accuracy over Epochs')
+
+    # 이미지 저장
+    plt.savefig(path)
+
+    # 이미지 표시
+    if show:
+        plt.show()
+
+def compare_models(bilstm_model, streaming_model, bilstm_valid_set, streaming_valid_set, output_path):
+    """검증 데이터에서 양방향 모델과 스트리밍 모델의 정확도 및 프레임당 추론 비용 비교
+
+    두 검증 데이터셋은 같은 샘플을 각각 (키포인트, 2), (프레임, 키포인트*2) 형태로 담고 있어야 합니다.
+    """
+    _, bilstm_accuracy = bilstm_model.evaluate(bilstm_valid_set, verbose=0)
+    _, streaming_accuracy = streaming_model.evaluate(streaming_valid_set, verbose=0)
+    validation_samples = sum(int(tf.shape(labels)[0]) for _, labels in streaming_valid_set)
+
+    # 단일 스텝 모델을 프레임마다 호출한 결과가 전체 시퀀스 결과와 같은지 확인
+    step_model = build_streaming_step_model(streaming_model)
+    sample = np.asarray(next(iter(streaming_valid_set.unbatch().batch(256)))[0], dtype=np.float32)
+    states = initial_streaming_states(step_model, len(sample))
+    start = time.perf_counter()
+    for t in range(sample.shape[1]):
+        probabilities, *states = step_model([sample[:, t:t + 1]] + states, training=False)
+    step_seconds = (time.perf_counter() - start) / sample.shape[1]
+    full_probabilities = streaming_model(sample, training=False)
+    max_step_difference = float(np.max(np.abs(np.asarray(probabilities) - np.asarray(full_probabilities))))
+
+    window_sample = next(iter(bilstm_valid_set.unbatch().batch(256)))[0]
+    start = time.perf_counter()
+    bilstm_model(window_sample, training=False)
+    window_seconds = time.perf_counter() - start
+
+    report = {
+        'validation_samples': validation_samples,
+        'bilstm_accuracy': float(bilstm_accuracy),
+        'streaming_accuracy': float(streaming_accuracy),
+        'accuracy_difference': float(streaming_accuracy - bilstm_accuracy),
+        'streaming_step_vs_full_max_abs_diff': max_step_difference,
+        # 새 프레임 1개가 들어왔을 때 드는 비용 (256개 트랙 배치 기준)
+        'bilstm_window_ms_per_frame': window_seconds * 1000,
+        'streaming_step_ms_per_frame': step_seconds * 1000,
+    }
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"양방향 모델 검증 정확도: {bilstm_accuracy:.4f}")
+    print(f"스트리밍 모델 검증 정확도: {streaming_accuracy:.4f}")
+    print(f"단일 스텝/전체 시퀀스 출력 최대 차이: {max_step_difference:.2e}")
+    print(f"프레임당 추론 시간: 양방향 {report['bilstm_window_ms_per_frame']:.2f}ms, 스트리밍 {report['streaming_step_ms_per_frame']:.2f}ms")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='넘어짐 감지 LSTM 모델 학습')
+    parser.add_argument('--data', default='keypoints_data_1.npz', help='npz 파일 또는 dataset.py로 변환한 샤드 디렉터리')
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--model', choices=['bilstm', 'streaming'], default='bilstm')
+    parser.add_argument('--epochs', type=int, default=100)
+    parser.add_argument('--output', default=None, help='모델 저장 경로')
+    parser.add_argument('--compare', default=None, metavar='BILSTM_MODEL',
+                        help='학습한 스트리밍 모델과 비교할 양방향 모델 경로')
+    parser.add_argument('--export', nargs='*', default=None, choices=export_formats, metavar='FORMAT',
+                        help='학습 후 서빙 형식(saved_model, tflite, onnx)으로 내보내고 CPU 벤치마크 및 모델 카드 작성 (형식 생략 시 전체)')
+    parser.add_argument('--no-show', action='store_true', help='학습 그래프 창을 띄우지 않음')
+    args = parser.parse_args()
+
+    frame_sequences = args.model == 'streaming'
+    train_set, valid_set, input_shape = load_datasets(args.data, args.batch_size, frame_sequences)
+
+    if args.model == 'bilstm':
+        # LSTM 입력 크기 설정 (x, y 값만 사용하므로 2로 설정)
+        model = build_model(input_shape)
+        history = train(model, train_set, valid_set, args.epochs)
+        plot_history(history, 'lstm_11633_history.png', show=not args.no_show)
+        # 모델 저장
+        artifact_path = args.output or 'lstm_model_11633.h5'
+        model.save(artifact_path)
+    else:
+        model = build_streaming_model(feature_dim=input_shape[1])
+        history = train(model, train_set, valid_set, args.epochs)
+        plot_history(history, 'streaming_lstm_history.png', show=not args.no_show)
+        artifact_path = args.output or 'streaming_lstm_model.h5'
+        model.save(artifact_path)
+
+        if args.compare:
+            bilstm_model = tf.keras.models.load_model(args.compare)
+            _, bilstm_valid_set, _ = load_datasets(args.data, args.batch_size, frame_sequences=False)
+            compare_models(bilstm_model, model, bilstm_valid_set, valid_set, 'streaming_comparison.json')
+
+    if args.export is not None:
+        _, accuracy = model.evaluate(valid_set, verbose=0)
+        export_and_benchmark(model, artifact_path, accuracy, args.export or export_formats, sequence_length)
+
+if __name__ == '__main__':
+    main()